@@ -0,0 +1,13 @@
+"""Benchmarks of pew² hot paths.
+
+Benchmarks are written in the style of `asv <https://asv.readthedocs.io>`_,
+classes in the ``bench_*`` modules with optional ``params`` and ``setup`` and
+methods prefixed with ``time_``. They can be run by asv or by the included
+runner, which stores results for comparison between commits.
+
+.. code-block:: bash
+
+    python -m benchmarks                      # run, save to benchmarks/results
+    python -m benchmarks --filter Filter      # only matching benchmarks
+    python -m benchmarks --compare benchmarks/results/<commit>.json
+"""
@@ -0,0 +1,212 @@
+import argparse
+import datetime
+import importlib
+import inspect
+import itertools
+import json
+import os
+from pathlib import Path
+import pkgutil
+import platform
+import subprocess
+import sys
+import timeit
+
+import numpy as np
+
+from typing import Callable, Dict, Iterator, List, Tuple
+
+
+results_dir = Path(__file__).parent.joinpath("results")
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="benchmarks", description="Run the pew² benchmark suite."
+    )
+    parser.add_argument(
+        "--filter", default="", help="Only run benchmarks whose name contains FILTER."
+    )
+    parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="Run each benchmark once, with only the first set of params.",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="Number of timing repeats."
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=results_dir,
+        help="Directory to save results, named by commit.",
+    )
+    parser.add_argument(
+        "--no-save", action="store_true", help="Do not save the results."
+    )
+    parser.add_argument(
+        "--compare", type=Path, help="Compare to results from a previous run."
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="Ratio above which a benchmark is a regression, default 1.2.",
+    )
+    return parser.parse_args(argv)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).parent,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True,
+            universal_newlines=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):  # pragma: no cover
+        return "unknown"
+
+
+def param_sets(cls: type, quick: bool = False) -> List[tuple]:
+    """The product of a benchmark's params, asv style."""
+    params = getattr(cls, "params", [])
+    if len(params) == 0:
+        return [()]
+    if not isinstance(params[0], (list, tuple)):
+        params = [params]
+    sets = list(itertools.product(*params))
+    return sets[:1] if quick else sets
+
+
+def discover(filter: str = "") -> Iterator[Tuple[str, type, str]]:
+    """Yields the name, class and method of each benchmark."""
+    package = Path(__file__).parent
+    for module_info in pkgutil.iter_modules([str(package)]):
+        if not module_info.name.startswith("bench_"):
+            continue
+        module = importlib.import_module(f"benchmarks.{module_info.name}")
+        for cls_name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            for method in sorted(vars(cls)):
+                if not method.startswith("time_"):
+                    continue
+                name = f"{module_info.name}.{cls_name}.{method}"
+                if filter in name:
+                    yield name, cls, method
+
+
+def time_benchmark(
+    func: Callable, quick: bool = False, repeat: int = 5
+) -> Dict[str, float]:
+    timer = timeit.Timer(func)
+    if quick:
+        number, times = 1, timer.repeat(repeat=1, number=1)
+    else:
+        number, _ = timer.autorange()
+        times = timer.repeat(repeat=repeat, number=number)
+    times = np.array(times) / number
+    return {"min": float(times.min()), "median": float(np.median(times))}
+
+
+def run(
+    filter: str = "", quick: bool = False, repeat: int = 5
+) -> Dict[str, Dict[str, float]]:
+    """Runs all benchmarks matching `filter`.
+
+    Args:
+        filter: only run benchmarks containing this string
+        quick: run each benchmark once, with the first params
+        repeat: number of timing repeats
+
+    Returns:
+        dict of 'module.Class.method(params)' and timings in seconds
+    """
+    results = {}
+    for name, cls, method in discover(filter):
+        for params in param_sets(cls, quick):
+            key = f"{name}({', '.join(str(p) for p in params)})"
+            bench = cls()
+            try:
+                if hasattr(bench, "setup"):
+                    bench.setup(*params)
+                func = getattr(bench, method)
+                results[key] = time_benchmark(lambda: func(*params), quick, repeat)
+            finally:
+                if hasattr(bench, "teardown"):
+                    bench.teardown(*params)
+            print(f"{key:<72} {results[key]['min'] * 1e3:>10.3f} ms", flush=True)
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    previous: Dict[str, Dict[str, float]],
+    threshold: float = 1.2,
+) -> List[str]:
+    """Prints the ratio of each result to a previous run.
+
+    Returns:
+        names of benchmarks slower than `threshold`
+    """
+    regressions = []
+    for key, result in results.items():
+        if key not in previous:
+            continue
+        ratio = result["min"] / previous[key]["min"]
+        flag = ""
+        if ratio > threshold:
+            flag = "slower"
+            regressions.append(key)
+        elif ratio < 1.0 / threshold:
+            flag = "faster"
+        print(f"{key:<72} {ratio:>8.2f}x {flag}")
+    return regressions
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide2 import QtWidgets
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+    commit = git_commit()
+    results = run(args.filter, args.quick, args.repeat)
+    app.processEvents()  # Deletes any widgets
+
+    if not args.no_save:
+        args.output.mkdir(parents=True, exist_ok=True)
+        path = args.output.joinpath(f"{commit}.json")
+        with path.open("w") as fp:
+            json.dump(
+                {
+                    "commit": commit,
+                    "date": datetime.datetime.now().isoformat(timespec="seconds"),
+                    "machine": platform.node(),
+                    "platform": platform.platform(),
+                    "python": platform.python_version(),
+                    "numpy": np.__version__,
+                    "quick": args.quick,
+                    "results": results,
+                },
+                fp,
+                indent=1,
+            )
+        print(f"Results saved to '{path}'.")
+
+    if args.compare is not None:
+        with args.compare.open() as fp:
+            previous = json.load(fp)
+        print(f"Comparing to {previous['commit']}:")
+        if len(compare(results, previous["results"], args.threshold)) > 0:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+import numpy as np
+
+from PySide2 import QtCore, QtGui
+
+from pewlib.calibration import Calibration
+from pewlib.laser import Laser
+
+from pewpew.graphics import colortable
+from pewpew.graphics.lasergraphicsview import LaserGraphicsView
+from pewpew.graphics.options import GraphicsOptions
+from pewpew.graphics.util import colortable_image, polygonf_contains_points
+from pewpew.lib.numpyqt import array_to_image
+from pewpew.lib.planecache import PlaneCache
+from pewpew.lib.selection import RunMask
+
+from benchmarks.generators import synthetic_data
+
+
+class ArrayToImage(object):
+    params = [256, 1024]
+    param_names = ["size"]
+
+    def setup(self, size: int) -> None:
+        self.data = synthetic_data((size, size), 1)["P31"]
+        self.normalised = self.data / self.data.max()
+        self.table = colortable.get_table("viridis")
+
+    def time_array_to_image(self, size: int) -> None:
+        array_to_image(self.normalised)
+
+    def time_colortable_image(self, size: int) -> None:
+        colortable_image(self.data, 0.0, np.percentile(self.data, 99), self.table)
+
+
+class DrawImage(object):
+    params = [256, 1024]
+    param_names = ["size"]
+
+    def setup(self, size: int) -> None:
+        self.data = synthetic_data((size, size), 1)["P31"]
+        self.rect = QtCore.QRectF(0.0, 0.0, size * 10.0, size * 10.0)
+        self.graphics = LaserGraphicsView(GraphicsOptions())
+
+    def teardown(self, size: int) -> None:
+        self.graphics.deleteLater()
+
+    def time_draw_image(self, size: int) -> None:
+        self.graphics.drawImage(self.data, self.rect, "P31")
+
+
+class DrawLaser(object):
+    params = ([256, 1024], [False, True])
+    param_names = ["size", "cached"]
+
+    def setup(self, size: int, cached: bool) -> None:
+        self.laser = Laser(
+            synthetic_data((size, size), 1),
+            calibration={"P31": Calibration(10.0, 2.0)},
+        )
+        options = GraphicsOptions()
+        options.calibrate = True
+        self.graphics = LaserGraphicsView(options)
+        self.planes = PlaneCache() if cached else None
+        self.graphics.drawLaser(self.laser, "P31", planes=self.planes)
+
+    def teardown(self, size: int, cached: bool) -> None:
+        self.graphics.deleteLater()
+
+    def time_draw_laser(self, size: int, cached: bool) -> None:
+        self.graphics.drawLaser(self.laser, "P31", planes=self.planes)
+
+
+class SelectionMask(object):
+    params = [[1024, 4096], ["array", "runs"]]
+    param_names = ["size", "mask"]
+
+    def setup(self, size: int, mask: str) -> None:
+        # Overlapping bands of whole rows and a square
+        self.a = RunMask.from_rect((size, size), (size // 8, size * 5 // 8), (0, size))
+        self.b = RunMask.from_rect(
+            (size, size), (size * 3 // 8, size * 7 // 8), (size // 4, size * 3 // 4)
+        )
+        if mask == "array":
+            self.a, self.b = self.a.to_array(), self.b.to_array()
+
+    def time_combine(self, size: int, mask: str) -> None:
+        (self.a | self.b) ^ self.b
+
+    def time_rasterise(self, size: int, mask: str) -> None:
+        np.asarray(self.a, dtype=np.uint8)
+
+
+class LassoSelection(object):
+    params = [[256, 1024], [16, 256]]
+    param_names = ["size", "vertices"]
+
+    def setup(self, size: int, vertices: int) -> None:
+        # A star shaped lasso
+        t = np.linspace(0.0, 2.0 * np.pi, vertices, endpoint=False)
+        r = size / 2.0 * (0.6 + 0.3 * np.cos(7.0 * t))
+        self.polygon = QtGui.QPolygonF(
+            [
+                QtCore.QPointF(
+                    size / 2.0 + ri * np.cos(ti), size / 2.0 + ri * np.sin(ti)
+                )
+                for ri, ti in zip(r, t)
+            ]
+        )
+        X, Y = np.meshgrid(np.arange(size) + 0.5, np.arange(size) + 0.5)
+        self.pixels = np.stack((X.flat, Y.flat), axis=1)
+
+    def time_polygon_contains_points(self, size: int, vertices: int) -> None:
+        polygonf_contains_points(self.polygon, self.pixels)
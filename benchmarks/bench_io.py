@@ -0,0 +1,73 @@
+from pathlib import Path
+import shutil
+import tempfile
+
+from pewlib import io
+
+from pewpew.graphics.options import GraphicsOptions
+from pewpew.lib import store
+from pewpew.threads import ExportJob
+
+from benchmarks.generators import synthetic_laser
+
+
+class Npz(object):
+    params = [[256, 1024], [1, 8]]
+    param_names = ["size", "elements"]
+
+    def setup(self, size: int, elements: int) -> None:
+        self.tempdir = tempfile.mkdtemp()
+        self.laser = synthetic_laser((size, size), elements)
+        self.path = Path(self.tempdir, "saved.npz")
+        io.npz.save(self.path, self.laser)
+
+    def teardown(self, size: int, elements: int) -> None:
+        shutil.rmtree(self.tempdir)
+
+    def time_load(self, size: int, elements: int) -> None:
+        io.npz.load(self.path)
+
+    def time_save(self, size: int, elements: int) -> None:
+        io.npz.save(Path(self.tempdir, "out.npz"), self.laser)
+
+
+class Store(object):
+    params = [[256, 1024], [1, 8]]
+    param_names = ["size", "elements"]
+
+    def setup(self, size: int, elements: int) -> None:
+        self.tempdir = tempfile.mkdtemp()
+        self.laser = synthetic_laser((size, size), elements)
+        self.path = Path(self.tempdir, "saved.pew")
+        store.save(self.path, self.laser)
+
+    def teardown(self, size: int, elements: int) -> None:
+        shutil.rmtree(self.tempdir)
+
+    def time_load(self, size: int, elements: int) -> None:
+        store.load(self.path)
+
+    def time_save_modified(self, size: int, elements: int) -> None:
+        store.save(self.path, self.laser, modified=self.laser.isotopes[:1])
+
+
+class Export(object):
+    params = [[256, 1024], [".csv", ".png", ".vti"]]
+    param_names = ["size", "format"]
+
+    def setup(self, size: int, format: str) -> None:
+        self.tempdir = tempfile.mkdtemp()
+        self.laser = synthetic_laser((size, size), 8)
+        self.options = GraphicsOptions()
+
+    def teardown(self, size: int, format: str) -> None:
+        shutil.rmtree(self.tempdir)
+
+    def time_export(self, size: int, format: str) -> None:
+        ExportJob(
+            self.laser,
+            Path(self.tempdir, "export" + format),
+            isotope="P31",
+            spacing=(10.0, 10.0, 10.0),
+            options=self.options,
+        ).run()
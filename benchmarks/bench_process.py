@@ -0,0 +1,117 @@
+import numpy as np
+
+from pewlib.process import colocal
+from pewlib.process.calc import normalise
+
+from pewpew.lib import filters, kmeans
+from pewpew.lib.columnar import ColumnarData
+from pewpew.lib.calculator import parser_functions, reducer_functions
+from pewpew.lib.pratt import Parser, Reducer
+from pewpew.widgets.dialogs import StatsDialog
+
+from benchmarks.generators import synthetic_data
+
+
+class Calculator(object):
+    params = [256, 1024]
+    param_names = ["size"]
+    formula = "if P31 > mean(P31) then Zn66 / (Ca44 + 1.0) else nan"
+
+    def setup(self, size: int) -> None:
+        data = synthetic_data((size, size), 8)
+        self.parser = Parser(list(data.dtype.names))
+        self.parser.nulls.update({k: v[0] for k, v in parser_functions.items()})
+        self.reducer = Reducer({name: data[name] for name in data.dtype.names})
+        self.reducer.operations.update(reducer_functions)
+        self.expr = self.parser.parse(self.formula)
+
+    def time_parse(self, size: int) -> None:
+        self.parser.parse(self.formula)
+
+    def time_reduce(self, size: int) -> None:
+        self.reducer.reduce(self.expr)
+
+
+class Colocalisation(object):
+    params = [128, 512]
+    param_names = ["size"]
+
+    def setup(self, size: int) -> None:
+        data = synthetic_data((size, size), 2)
+        self.x = normalise(data["P31"]).ravel()
+        self.y = normalise(data["Ca44"]).ravel()
+
+    def time_pearsonr(self, size: int) -> None:
+        colocal.pearsonr(self.x, self.y)
+
+    def time_li_icq(self, size: int) -> None:
+        colocal.li_icq(self.x, self.y)
+
+    def time_costes_manders(self, size: int) -> None:
+        t1, a, b = colocal.costes_threshold(self.x, self.y)
+        colocal.manders(self.x, self.y, a * t1 + b, t1)
+
+
+class ElementStorage(object):
+    params = ["structured", "columnar"]
+    param_names = ["storage"]
+
+    def setup(self, storage: str) -> None:
+        self.data = synthetic_data((1024, 1024), 16)
+        if storage == "columnar":
+            self.data = ColumnarData.from_structured(self.data)
+
+    def time_copy(self, storage: str) -> None:
+        self.data.copy()
+
+    def time_percentile(self, storage: str) -> None:
+        np.nanpercentile(self.data["P31"], 99)
+
+
+class Filters(object):
+    params = [[256, 1024], list(filters.methods.keys())]
+    param_names = ["size", "method"]
+
+    def setup(self, size: int, method: str) -> None:
+        self.data = synthetic_data((size, size), 1)["P31"]
+        self.filter = filters.methods[method]["filter"]
+        self.filter_params = [p[1] for p in filters.methods[method]["params"]]
+
+    def time_filter(self, size: int, method: str) -> None:
+        self.filter(self.data, *self.filter_params)
+
+
+class KMeans(object):
+    params = [[256, 1024], [3, 5]]
+    param_names = ["size", "k"]
+
+    def setup(self, size: int, k: int) -> None:
+        data = synthetic_data((size, size), 2)
+        self.x = data["P31"].ravel()
+        self.xy = np.stack((data["P31"].ravel(), data["Ca44"].ravel()), axis=1)
+
+    def time_kmeans(self, size: int, k: int) -> None:
+        np.random.seed(0)
+        kmeans.kmeans(self.xy, k)
+
+    def time_kmeans1d(self, size: int, k: int) -> None:
+        np.random.seed(0)
+        kmeans.kmeans1d(self.x, k)
+
+
+class Statistics(object):
+    params = [256, 1024]
+    param_names = ["size"]
+
+    def setup(self, size: int) -> None:
+        self.data = synthetic_data((size, size), 8)
+        self.mask = np.zeros((size, size), dtype=bool)
+        self.mask[size // 4 : size * 3 // 4, size // 4 : size * 3 // 4] = True
+
+    def time_stats_dialog(self, size: int) -> None:
+        dlg = StatsDialog(self.data, None, {}, "P31", pixel_size=(10.0, 10.0))
+        dlg.deleteLater()
+
+    def time_stats_dialog_selection(self, size: int) -> None:
+        dlg = StatsDialog(self.data, self.mask, {}, "P31", pixel_size=(10.0, 10.0))
+        dlg.deleteLater()
@@ -0,0 +1,64 @@
+"""Synthetic laser data for benchmarks."""
+import numpy as np
+
+from pewlib.config import Config
+from pewlib.laser import Laser
+
+from typing import List, Tuple
+
+
+isotopes = ["P31", "Ca44", "Fe56", "Cu63", "Zn66", "Sr88", "Ba137", "Pb208"]
+
+
+def element_names(elements: int) -> List[str]:
+    """Isotope like names, suffixed once the list of isotopes is exhausted."""
+    names = []
+    for i in range(elements):
+        name = isotopes[i % len(isotopes)]
+        if i >= len(isotopes):
+            name += f"_{i // len(isotopes)}"
+        names.append(name)
+    return names
+
+
+def synthetic_data(
+    shape: Tuple[int, int] = (256, 256), elements: int = 8, seed: int = 0
+) -> np.ndarray:
+    """Structured array of noisy gaussian features.
+
+    Each element is a sum of randomly placed gaussians on a low background,
+    with Poisson noise as from an ICP-MS.
+
+    Args:
+        shape: shape of the image
+        elements: number of elements
+        seed: random seed, the same seed gives the same data
+
+    Returns:
+        structured array of float64
+    """
+    rng = np.random.RandomState(seed)
+    y, x = np.mgrid[0.0 : 1.0 : shape[0] * 1j, 0.0 : 1.0 : shape[1] * 1j]
+
+    names = element_names(elements)
+    data = np.empty(shape, dtype=[(name, np.float64) for name in names])
+    for name in names:
+        image = np.full(shape, rng.uniform(1.0, 10.0))
+        for _ in range(5):
+            cx, cy = rng.uniform(0.0, 1.0, size=2)
+            width = rng.uniform(0.02, 0.2)
+            height = rng.uniform(10.0, 1000.0)
+            image += height * np.exp(-((x - cx) ** 2 + (y - cy) ** 2) / width ** 2)
+        data[name] = rng.poisson(image).astype(np.float64)
+    return data
+
+
+def synthetic_laser(
+    shape: Tuple[int, int] = (256, 256), elements: int = 8, seed: int = 0
+) -> Laser:
+    """A :class:`pewlib.laser.Laser` of :func:`synthetic_data`."""
+    return Laser(
+        synthetic_data(shape, elements, seed),
+        config=Config(spotsize=10.0, speed=40.0, scantime=0.25),
+        name=f"synthetic_{shape[0]}x{shape[1]}",
+    )
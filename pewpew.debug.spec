@@ -1,14 +1,18 @@
 # vim: set ft=python:
 from pathlib import Path
 
+from scripts.build_rcc import build_rcc
+
+
+rcc_paths = build_rcc()
 
 block_cipher = None
 
 a = Analysis(
     [Path("pewpew", "__main__.py")],
     binaries=None,
-    datas=None,
-    hiddenimports=[],
+    datas=[(str(path), "pewpew/resources") for path in rcc_paths],
+    hiddenimports=["pewpew.resources.app_icon", "pewpew.resources.icons"],
     hookspath=None,
     runtime_hooks=None,
     excludes=["FixTk", "tcl", "tk", "_tkinter", "tkinter", "Tkinter"],
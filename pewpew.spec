@@ -1,18 +1,22 @@
 # vim: set ft=python:
 from pathlib import Path
 
+from scripts.build_rcc import build_rcc
+
 with Path("pewpew", "__init__.py").open() as fp:
     for line in fp:
         if line.startswith("__version__"):
             version = line.split("=")[1].strip().strip('"')
 
+rcc_paths = build_rcc()
+
 block_cipher = None
 
 a = Analysis(
     [Path("pewpew", "__main__.py")],
     binaries=None,
-    datas=None,
-    hiddenimports=[],
+    datas=[(str(path), "pewpew/resources") for path in rcc_paths],
+    hiddenimports=["pewpew.resources.app_icon", "pewpew.resources.icons"],
     hookspath=None,
     runtime_hooks=None,
     win_no_prefer_redirects=False,
@@ -1,36 +1,74 @@
 import argparse
 import logging
+import logging.handlers
 import multiprocessing
 from pathlib import Path
 import sys
+import time
 
 from PySide2 import QtCore, QtGui, QtWidgets
 
 import pewlib
 from pewpew import __version__
+from pewpew import resources
 
-from pewpew.mainwindow import MainWindow
-from pewpew.resources import app_icon  # noqa: F401
-from pewpew.resources import icons  # noqa: F401
-
-from typing import List
+from typing import List, Tuple
 
 
 logger = logging.getLogger()
 
 
+class StartupProfile(object):
+    """Records the time taken by each stage of startup."""
+
+    def __init__(self):
+        self.times: List[Tuple[str, float]] = [("start", time.perf_counter())]
+
+    def mark(self, stage: str) -> None:
+        """Marks the end of `stage`."""
+        self.times.append((stage, time.perf_counter()))
+
+    def report(self) -> str:
+        lines = [
+            f"{(t1 - t0) * 1000.0:8.1f} ms  {stage}"
+            for (_, t0), (stage, t1) in zip(self.times[:-1], self.times[1:])
+        ]
+        total = self.times[-1][1] - self.times[0][1]
+        lines.append(f"{total * 1000.0:8.1f} ms  total")
+        lines.append(f"{len(sys.modules)} modules loaded")
+        return "\n".join(lines)
+
+
 def parse_args(argv: List[str]) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         prog="pew²",
         description="GUI for visualisation and manipulation of LA-ICP-MS data.",
+        epilog="Use 'batch' as the first argument to process data without the GUI, "
+        "see 'batch --help'.",
     )
 
     parser.add_argument(
         "--open", "-i", type=Path, nargs="+", help="Open file(s) on startup."
     )
+    parser.add_argument(
+        "--logfile",
+        type=Path,
+        help="Also write the log to a file, rotated every 1 MB with 3 backups.",
+    )
     parser.add_argument(
         "--nohook", action="store_true", help="Don't install the execption hook."
     )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Record the time taken by drawing, tools and exports, "
+        "see Help -> Show Performance.",
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Print the time taken by each stage of startup and exit.",
+    )
     parser.add_argument(
         "qtargs", nargs=argparse.REMAINDER, help="Arguments to pass to Qt."
     )
@@ -45,21 +83,63 @@ def parse_args(argv: List[str]) -> argparse.Namespace:
 
 
 def main(argv: List[str] = None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+    if len(argv) > 0 and argv[0] == "batch":
+        from pewpew import batch
+
+        return batch.main(argv[1:])
+
+    profile = StartupProfile()
     args = parse_args(argv)
 
     app = QtWidgets.QApplication(args.qtargs)
     app.setApplicationName("pew²")
     app.setApplicationVersion(__version__)
+    profile.mark("create application")
+
+    # Imported here so it is included in the profile
+    from pewpew.mainwindow import MainWindow
+
+    profile.mark("import main window")
+
+    resources.register("icons")
+    profile.mark("register icons")
+
+    if args.profile:
+        from pewpew.lib.profiler import profiler
+
+        profiler.enable()
 
     window = MainWindow()
     if not args.nohook:
         sys.excepthook = window.exceptHook
     logger.addHandler(window.log.handler)
+    if args.logfile is not None:
+        file_handler = logging.handlers.RotatingFileHandler(
+            args.logfile, maxBytes=2 ** 20, backupCount=3, encoding="utf-8"
+        )
+        file_handler.setFormatter(
+            logging.Formatter("[%(asctime)s] %(levelname)8s - %(name)s : %(message)s")
+        )
+        logger.addHandler(file_handler)
     logger.info(f"Pew² {__version__} started.")
     logger.info(f"Using Pewlib {pewlib.__version__}.")
+    profile.mark("create main window")
 
     window.show()
+    resources.register("app_icon")
     window.setWindowIcon(QtGui.QIcon(":/app.ico"))
+    profile.mark("show main window")
+
+    if args.profile_startup:
+
+        def report() -> None:
+            profile.mark("first event")
+            print(profile.report())
+            app.quit()
+
+        QtCore.QTimer.singleShot(0, report)
 
     # Arguments
     if args.open is not None:
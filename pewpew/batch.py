@@ -0,0 +1,337 @@
+"""Headless batch processing of laser data.
+
+A pipeline describes the import config, the processing steps and the exports
+to perform for every input. Pipelines are JSON or TOML documents, e.g.
+
+.. code-block:: json
+
+    {
+        "config": {"spotsize": 30.0, "speed": 120.0, "scantime": 0.25},
+        "steps": [
+            {"type": "calibration", "path": "standards.npz"},
+            {"type": "filter", "method": "Rolling Median", "params": [5, 3.0]},
+            {"type": "drift", "isotope": "P31", "region": [0, 10], "degree": 3},
+            {"type": "calculator", "name": "ZndivP", "formula": "Zn66 / P31"}
+        ],
+        "exports": [
+            {"format": "npz"},
+            {"format": "csv", "calibrate": true, "isotopes": ["ZndivP"]},
+            {"format": "png", "colortable": "magma", "colorrange": [0.0, "99%"]},
+            {"format": "vti", "calibrate": false, "compression": "zlib"}
+        ]
+    }
+
+Steps use the same code as their respective tools and are applied in order.
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import copy
+import json
+import logging
+import os
+from pathlib import Path
+
+import numpy as np
+
+from pewlib import io
+from pewlib.calibration import Calibration
+from pewlib.config import Config
+from pewlib.laser import Laser
+
+from pewpew.graphics import colortable
+from pewpew.graphics.options import GraphicsOptions
+from pewpew.graphics.util import colortable_image
+from pewpew.lib import calculator, filenames, filters, store, vti
+from pewpew.lib.drift import fit_drift
+from pewpew.lib.pratt import Parser, Reducer
+from pewpew.threads import import_path
+
+from typing import Callable, Dict, List, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+def load_pipeline(path: Path) -> dict:
+    """Reads a JSON or TOML pipeline.
+
+    Reading TOML requires Python 3.11 or the ``toml`` package.
+    """
+    if path.suffix.lower() == ".toml":
+        try:
+            import tomllib
+
+            with path.open("rb") as fp:
+                return tomllib.load(fp)
+        except ImportError:
+            try:
+                import toml
+
+                with path.open("r") as fp:
+                    return toml.load(fp)
+            except ImportError:
+                raise ValueError("Reading TOML pipelines requires 'toml' package.")
+
+    with path.open("r") as fp:
+        return json.load(fp)
+
+
+# Steps
+def step_calibration(laser: Laser, step: dict) -> None:
+    """Applies calibrations from a numpy archive or a mapping of parameters."""
+    if "path" in step:
+        calibrations = io.npz.load(Path(step["path"])).calibration
+    else:
+        calibrations = {k: Calibration(**v) for k, v in step["calibration"].items()}
+    for isotope in calibrations:
+        if isotope in laser.calibration:
+            laser.calibration[isotope] = copy.copy(calibrations[isotope])
+
+
+def step_calculator(laser: Laser, step: dict) -> None:
+    """Adds, or replaces, element `name` with the result of `formula`."""
+    parser = Parser(laser.isotopes)
+    parser.nulls.update({k: v[0] for k, v in calculator.parser_functions.items()})
+    reducer = Reducer({})
+    reducer.operations.update(calculator.reducer_functions)
+
+    data = laser.get(flat=True)
+    reducer.variables = {name: data[name] for name in data.dtype.names}
+    result = reducer.reduce(parser.parse(step["formula"]))
+    if not isinstance(result, np.ndarray) or result.shape != laser.shape:
+        raise ValueError(f"Formula '{step['formula']}' does not produce an image.")
+
+    if step["name"] in laser.isotopes:
+        laser.data[step["name"]] = result
+    else:
+        laser.add(step["name"], result)
+
+
+def step_drift(laser: Laser, step: dict) -> None:
+    """Corrects drift measured in the columns `region` of element `isotope`.
+
+    The optional `trim` removes rows from the drift region.
+    """
+    x0, x1 = step["region"]
+    drift = laser.get(step["isotope"], flat=True)[:, x0:x1].copy()
+    if "trim" in step:
+        y0, y1 = step["trim"]
+        drift[y0:y1] = np.nan
+
+    drift = fit_drift(np.nanmean(drift, axis=1), step.get("degree", 3))
+    if step.get("normalise", "Minimum") == "Maximum":
+        value = np.amax(drift)
+    else:
+        value = np.amin(drift)
+
+    for name in step.get("isotopes", [step["isotope"]]):
+        transpose = laser.data[name].T
+        transpose /= drift / value
+
+
+def step_filter(laser: Laser, step: dict) -> None:
+    """Filters elements using one of the :data:`pewpew.lib.filters.methods`."""
+    method = filters.methods[step.get("method", "Rolling Median")]
+    params = step.get("params", [p[1] for p in method["params"]])
+    for name in step.get("isotopes", laser.isotopes):
+        laser.data[name] = method["filter"](laser.get(name, flat=True), *params)
+
+
+steps: Dict[str, Callable[[Laser, dict], None]] = {
+    "calibration": step_calibration,
+    "calculator": step_calculator,
+    "drift": step_drift,
+    "filter": step_filter,
+}
+
+
+# Exports
+def save_png(path: Path, data: np.ndarray, export: dict) -> None:
+    """Saves colortable mapped image data."""
+    options = GraphicsOptions()
+    if "colorrange" in export:
+        options.colorrange_default = tuple(export["colorrange"])
+    vmin, vmax = options.get_colorrange_as_float("", data)
+
+    table = colortable.get_table(export.get("colortable", "viridis"))
+    image = colortable_image(data, vmin, vmax, table)
+    if not image.save(str(path.absolute())):  # pragma: no cover
+        raise IOError(f"Unable to save image '{path.name}'.")
+
+
+def export_laser(
+    laser: Laser, output: Path, export: dict, suffix: str = ""
+) -> List[Path]:
+    ext = "." + export["format"].lower().lstrip(".")
+    path = output.joinpath(laser.name + suffix + ext)
+    calibrate = export.get("calibrate", True)
+    isotopes = export.get("isotopes", laser.isotopes)
+
+    paths = []
+    if ext == ".npz":
+        io.npz.save(path, laser)
+        paths.append(path)
+    elif ext == ".pew":
+        store.save(path, laser)
+        paths.append(path)
+    elif ext == ".vti":
+        spacing = export.get(
+            "spacing",
+            (
+                laser.config.get_pixel_width(),
+                laser.config.get_pixel_height(),
+                laser.config.spotsize / 2.0,
+            ),
+        )
+        # Last axis (z) is negative for layer order
+        spacing = spacing[0], spacing[1], -spacing[2]
+        vti.save(
+            path,
+            laser,
+            spacing,
+            calibrate=calibrate,
+            compression=export.get("compression"),
+        )
+        paths.append(path)
+    elif ext in [".csv", ".png"]:
+        for isotope in isotopes:
+            if isotope not in laser.isotopes:  # pragma: no cover
+                continue
+            data = laser.get(isotope, calibrate=calibrate, flat=True)
+            isopath = filenames.path_for_isotope(path, isotope)
+            if ext == ".csv":
+                io.textimage.save(isopath, data)
+            else:
+                save_png(isopath, data, export)
+            paths.append(isopath)
+    else:
+        raise ValueError(f"Unable to export file as '{ext}'.")
+
+    return paths
+
+
+def process(path: Path, pipeline: dict, output: Path, suffix: str = "") -> List[Path]:
+    """Imports, processes and exports a single input.
+
+    Args:
+        path: input file or directory
+        pipeline: the pipeline
+        output: directory for exports
+        suffix: appended to the laser name for exported files
+
+    Returns:
+        paths of the exported files
+    """
+    config = Config(**pipeline.get("config", {}))
+    laser = import_path(path, config)
+
+    for step in pipeline.get("steps", []):
+        if step["type"] not in steps:
+            raise ValueError(f"Unknown step type '{step['type']}'.")
+        steps[step["type"]](laser, step)
+
+    paths = []
+    for export in pipeline.get("exports", [{"format": "npz"}]):
+        paths.extend(export_laser(laser, output, export, suffix))
+    return paths
+
+
+def unique_suffixes(paths: List[Path]) -> List[str]:
+    """Suffixes that keep the exports of inputs with the same name apart.
+
+    The first input with a name has no suffix, following ones are numbered
+    from '_2'.
+    """
+    counts: Dict[str, int] = {}
+    suffixes = []
+    for path in paths:
+        stem = path.stem.lower()
+        counts[stem] = counts.get(stem, 0) + 1
+        suffixes.append(f"_{counts[stem]}" if counts[stem] > 1 else "")
+    return suffixes
+
+
+def run(
+    paths: List[Path], pipeline: dict, output: Path, processes: int = None
+) -> Tuple[List[Path], List[Path]]:
+    """Runs a pipeline on multiple inputs.
+
+    Inputs are processed in parallel using `processes` worker processes,
+    a value of 1 processes every input in the current process.
+
+    Returns:
+        paths of exported files
+        inputs that failed
+    """
+    output.mkdir(parents=True, exist_ok=True)
+
+    exported: List[Path] = []
+    failed: List[Path] = []
+    suffixes = unique_suffixes(paths)
+
+    if processes == 1:
+        results = []
+        for path, suffix in zip(paths, suffixes):
+            try:
+                results.append(process(path, pipeline, output, suffix))
+            except Exception as e:
+                results.append(e)
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = [
+                executor.submit(process, path, pipeline, output, suffix)
+                for path, suffix in zip(paths, suffixes)
+            ]
+            results = [future.exception() or future.result() for future in futures]
+
+    for path, result in zip(paths, results):
+        if isinstance(result, Exception):
+            logger.error(f"Unable to process {path.name}: {result}")
+            failed.append(path)
+        else:
+            logger.info(f"Processed {path.name}.")
+            exported.extend(result)
+
+    return exported, failed
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="pew² batch",
+        description="Process LA-ICP-MS data without the GUI.",
+    )
+    parser.add_argument("pipeline", type=Path, help="JSON or TOML pipeline.")
+    parser.add_argument("inputs", type=Path, nargs="+", help="Files to process.")
+    parser.add_argument(
+        "--output", "-o", type=Path, default=Path("."), help="Output directory."
+    )
+    parser.add_argument(
+        "--processes",
+        "-p",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of worker processes.",
+    )
+    args = parser.parse_args(argv)
+
+    if not args.pipeline.exists():
+        parser.error(f"[pipeline]: File '{args.pipeline}' not found.")
+    for path in args.inputs:
+        if not path.exists():
+            parser.error(f"[inputs]: File '{path}' not found.")
+
+    return args
+
+
+def main(argv: List[str] = None) -> int:
+    args = parse_args(argv)
+
+    # Does nothing if the root logger already has a handler
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    pipeline = load_pipeline(args.pipeline)
+    exported, failed = run(args.inputs, pipeline, args.output, args.processes)
+
+    logger.info(f"Exported {len(exported)} files, {len(failed)} inputs failed.")
+    return 0 if len(failed) == 0 else 1
@@ -6,6 +6,9 @@ import numpy as np
 from pewpew.charts.base import BaseChart
 from pewpew.charts.colors import light_theme, sequential
 
+from pewpew.lib.histogram import histogram
+from pewpew.lib.numpyqt import array_to_polygonf
+
 from typing import Union
 
 
@@ -20,24 +23,24 @@ class HistogramChart(BaseChart):
 
         self.chart().legend().hide()
 
-        self._xaxis = QtCharts.QValueAxis()  # Alignment axis
-        self._xaxis.setVisible(False)
-        self.xaxis = QtCharts.QValueAxis()  # Value axis
+        self.xaxis = QtCharts.QValueAxis()
         self.xaxis.setGridLineVisible(False)
 
         self.yaxis = QtCharts.QValueAxis()
         self.yaxis.setGridLineVisible(False)
         self.yaxis.setLabelFormat("%d")
 
-        self.addAxis(self._xaxis, QtCore.Qt.AlignBottom)
         self.addAxis(self.xaxis, QtCore.Qt.AlignBottom)
         self.addAxis(self.yaxis, QtCore.Qt.AlignLeft)
 
-        self.series = QtCharts.QBarSeries()
-        self.series.setBarWidth(1.0)
+        # Bars are drawn as the outline of a single area
+        self.bars = QtCharts.QLineSeries()
+        self.series = QtCharts.QAreaSeries(self.bars)
+        self.series.setColor(sequential[1])
+        self.series.setBorderColor(light_theme["background"])
 
         self.chart().addSeries(self.series)
-        self.series.attachAxis(self._xaxis)
+        self.series.attachAxis(self.xaxis)
         self.series.attachAxis(self.yaxis)
 
     def setHistogram(
@@ -47,25 +50,16 @@ class HistogramChart(BaseChart):
         min_bins: int = 16,
         max_bins: int = 128,
     ) -> None:
-        vmin, vmax = np.percentile(data, 5), np.percentile(data, 95)
-
-        barset = QtCharts.QBarSet("histogram")
-        barset.setColor(sequential[1])
-        barset.setLabelColor(light_theme["text"])
-
-        bin_edges = np.histogram_bin_edges(data, bins=bins, range=(vmin, vmax))
-        if bin_edges.size > max_bins:
-            bin_edges = np.histogram_bin_edges(data, bins=max_bins, range=(vmin, vmax))
-        elif bin_edges.size < min_bins:
-            bin_edges = np.histogram_bin_edges(data, bins=min_bins, range=(vmin, vmax))
+        hist, edges = histogram(data, bins=bins, min_bins=min_bins, max_bins=max_bins)
 
-        hist, edges = np.histogram(data, bins=bin_edges)
-        barset.append(list(hist))
+        # Each bar is 4 points, starting and ending at 0
+        xs = np.stack((edges[:-1], edges[:-1], edges[1:], edges[1:]), axis=1)
+        ys = np.zeros(xs.shape)
+        ys[:, 1:3] = hist[:, None]
 
-        self.series.clear()
-        self.series.append(barset)
+        points = np.stack((xs.ravel(), ys.ravel()), axis=1)
+        self.bars.replace(array_to_polygonf(points))
 
-        self._xaxis.setRange(-0.5, hist.size - 0.5)
         self.xaxis.setRange(edges[0], edges[-1])
         self.yaxis.setRange(0, np.amax(hist))
         self.yaxis.applyNiceNumbers()
@@ -6,7 +6,7 @@ from pewlib.process.calc import normalise
 
 from pewpew.actions import qAction
 
-from pewpew.lib.numpyqt import array_to_image, array_to_polygonf
+from pewpew.lib.numpyqt import array_to_image, array_to_mimedata, array_to_polygonf
 
 
 class ScaledImageItem(QtWidgets.QGraphicsItem):
@@ -246,19 +246,7 @@ class ImageSliceWidgetItem(ImageWidgetItem):
     def actionCopyToClipboard(self):
         if self.sliced is None:
             return
-        html = (
-            '<meta http-equiv="content-type" content="text/html; charset=utf-8"/>'
-            "<table>"
-        )
-        text = ""
-        for x in self.sliced:
-            html += f"<tr><td>{x:.10g}</td></tr>"
-            text += f"{x:.10g}\n"
-        html += "</table>"
-
-        mime = QtCore.QMimeData()
-        mime.setHtml(html)
-        mime.setText(text)
+        mime = array_to_mimedata(self.sliced)
         QtWidgets.QApplication.clipboard().setMimeData(mime)
 
     def createSlicePoly(self) -> QtGui.QPolygonF:
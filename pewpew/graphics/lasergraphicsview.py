@@ -15,6 +15,7 @@ from pewpew.graphics.selectionitems import (
     RectImageSelectionItem,
 )
 from pewpew.graphics.options import GraphicsOptions
+from pewpew.graphics.util import colortable_image
 from pewpew.graphics.overlaygraphics import OverlayScene, OverlayView
 from pewpew.graphics.overlayitems import (
     ColorBarOverlay,
@@ -22,9 +23,12 @@ from pewpew.graphics.overlayitems import (
     LabelOverlay,
 )
 
-from pewpew.lib.numpyqt import array_to_image
+from pewpew.lib.colorize import ColorizeBuffers
+from pewpew.lib.planecache import PlaneCache
+from pewpew.lib.profiler import timed
+from pewpew.lib.selection import RunMask
 
-from typing import List
+from typing import List, Optional, Union
 
 
 class LaserGraphicsView(OverlayView):
@@ -33,7 +37,8 @@ class LaserGraphicsView(OverlayView):
     def __init__(self, options: GraphicsOptions, parent: QtWidgets.QWidget = None):
         self.options = options
         self.data: np.ndarray = None
-        self.mask: np.ndarray = None
+        self.selection: RunMask = None
+        self.buffers = ColorizeBuffers()
 
         self._scene = OverlayScene(0, 0, 640, 480)
         self._scene.setBackgroundBrush(QtGui.QBrush(QtCore.Qt.black))
@@ -74,6 +79,17 @@ class LaserGraphicsView(OverlayView):
             QtCore.Qt.AlignBottom | QtCore.Qt.AlignLeft,
         )
 
+    @property
+    def mask(self) -> Optional[np.ndarray]:
+        """The selection as a boolean array, a new array on each access."""
+        if self.selection is None:
+            return None
+        return self.selection.to_array()
+
+    @mask.setter
+    def mask(self, mask: Optional[np.ndarray]) -> None:
+        self.selection = None if mask is None else RunMask.from_array(mask)
+
     def mapToData(self, pos: QtCore.QPointF) -> QtCore.QPoint:
         if self.image is None:
             return QtCore.QPoint(0, 0)
@@ -123,14 +139,14 @@ class LaserGraphicsView(OverlayView):
             self.scene().removeItem(self.selection_image)
             self.selection_image = None
 
-        self.mask = np.zeros(self.data.shape, dtype=np.bool)
+        self.selection = RunMask(self.data.shape)
         self.setInteractionFlag("selection", False)
 
     def posInSelection(self, pos: QtCore.QPointF) -> bool:
-        if self.mask is None:
+        if self.selection is None:
             return False
         pos = self.mapToData(self.mapToScene(pos))
-        return self.mask[pos.y(), pos.x()]
+        return self.selection.contains(pos.y(), pos.x())
 
     def startRulerWidget(self) -> None:
         if self.widget is not None:
@@ -158,6 +174,7 @@ class LaserGraphicsView(OverlayView):
         self.widget = None
         self.setInteractionFlag("widget", False)
 
+    @timed(category="draw")
     def drawImage(self, data: np.ndarray, rect: QtCore.QRectF, name: str) -> None:
         if self.image is not None:
             self.scene().removeItem(self.image)
@@ -167,12 +184,7 @@ class LaserGraphicsView(OverlayView):
         vmin, vmax = self.options.get_colorrange_as_float(name, self.data)
         table = colortable.get_table(self.options.colortable)
 
-        data = np.clip(self.data, vmin, vmax)
-        if vmin != vmax:  # Avoid div 0
-            data = (data - vmin) / (vmax - vmin)
-
-        image = array_to_image(data)
-        image.setColorTable(table)
+        image = colortable_image(self.data, vmin, vmax, table, self.buffers)
         self.image = ScaledImageItem(image, rect, smooth=self.options.smoothing)
         self.scene().addItem(self.image)
 
@@ -182,37 +194,73 @@ class LaserGraphicsView(OverlayView):
             self.setSceneRect(rect)
             self.fitInView(rect, QtCore.Qt.KeepAspectRatio)
 
-    def drawSelectionImage(self, mask: np.ndarray, modes: List[str] = None) -> None:
+    def imageBytes(self) -> int:
+        """Memory used by the image, its buffers and data."""
+        if self.image is None:
+            return 0
+        nbytes = self.buffers.nbytes + self.data.nbytes
+        # Unless smoothed, the image is a view of the indexed buffer
+        array = getattr(self.image.image, "_array", None)
+        if (
+            array is None
+            or self.buffers.out is None
+            or not np.shares_memory(array, self.buffers.out)
+        ):
+            nbytes += self.image.image.sizeInBytes()
+        return nbytes
+
+    def releaseImage(self) -> None:
+        """Removes the image and its data, they are recreated on the next draw."""
+        if self.image is not None:
+            self.scene().removeItem(self.image)
+            self.image = None
+        self.data = None
+        self.buffers.clear()
+
+    def drawSelectionImage(
+        self, mask: Union[np.ndarray, RunMask], modes: List[str] = None
+    ) -> None:
         if self.selection_image is not None:
             self.scene().removeItem(self.selection_image)
 
-        if self.mask is None:
-            self.mask = np.zeros(self.data.shape, dtype=np.bool)
+        if self.selection is None:
+            self.selection = RunMask(self.data.shape)
 
-        mask = mask.astype(np.bool)
+        mask = RunMask.from_array(mask)
         if "add" in modes:
-            self.mask = np.logical_or(self.mask, mask)
+            self.selection = self.selection.union(mask)
         elif "subtract" in modes:
-            self.mask = np.logical_and(self.mask, ~mask)
+            self.selection = self.selection.difference(mask)
         elif "intersect" in modes:
-            self.mask = np.logical_and(self.mask, mask)
+            self.selection = self.selection.intersection(mask)
         elif "difference" in modes:
-            self.mask = np.logical_xor(self.mask, mask)
+            self.selection = self.selection.symmetric_difference(mask)
         else:
-            self.mask = mask
+            self.selection = mask
 
         color = QtGui.QColor(255, 255, 255, a=128)
 
         self.selection_image = ScaledImageItem.fromArray(
-            self.mask.astype(np.uint8), self.image.rect, colortable=[0, color.rgba()]
+            self.selection.to_array(np.uint8),
+            self.image.rect,
+            colortable=[0, color.rgba()],
         )
         self.selection_image.setZValue(self.image.zValue() + 1.0)
         self.scene().addItem(self.selection_image)
 
-    def drawLaser(self, laser: _Laser, name: str, layer: int = None) -> None:
-        kwargs = {"calibrate": self.options.calibrate, "layer": layer, "flat": True}
+    @timed(category="draw")
+    def drawLaser(
+        self, laser: _Laser, name: str, layer: int = None, planes: PlaneCache = None
+    ) -> None:
+        """Draws element `name` of `laser`.
 
-        data = laser.get(name, **kwargs)
+        If `planes` is passed the calibrated data is taken from it.
+        """
+        if planes is not None:
+            data = planes.get(laser, name, self.options.calibrate, layer=layer)
+        else:
+            kwargs = {"calibrate": self.options.calibrate, "layer": layer, "flat": True}
+            data = laser.get(name, **kwargs)
         unit = laser.calibration[name].unit if self.options.calibrate else ""
 
         # Get extent
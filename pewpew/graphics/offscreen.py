@@ -0,0 +1,124 @@
+"""Offscreen rendering of lasers and their overlays.
+
+Rendering only uses QImage and QPainter, no view or scene is required and
+the functions here can be called from worker threads.
+"""
+from PySide2 import QtCore, QtGui
+
+from pewlib.laser import _Laser
+
+from pewpew.graphics import colortable
+from pewpew.graphics.options import GraphicsOptions
+from pewpew.graphics.overlaygraphics import OverlayItem, paint_overlay_items
+from pewpew.graphics.overlayitems import (
+    ColorBarOverlay,
+    MetricScaleBarOverlay,
+    LabelOverlay,
+)
+from pewpew.graphics.util import colortable_image
+
+from typing import List
+
+
+def overlay_items(name: str, unit: str, options: GraphicsOptions) -> List[OverlayItem]:
+    """Creates the overlay items of a LaserGraphicsView.
+
+    Args:
+        name: text of label
+        unit: unit of colorbar
+        options: font, color and visibility of items
+
+    Returns:
+        label, scalebar and colorbar
+    """
+    font = QtGui.QFont(options.font)
+    label = LabelOverlay(name, font=font, color=options.font_color)
+    label.setPos(10, 10)
+    scalebar = MetricScaleBarOverlay(font=font, color=options.font_color)
+    scalebar.setPos(0, 10)
+    colorbar = ColorBarOverlay([], 0, 1, unit=unit, font=font, color=options.font_color)
+
+    label.setVisible(options.items["label"])
+    scalebar.setVisible(options.items["scalebar"])
+    colorbar.setVisible(options.items["colorbar"])
+
+    return [
+        OverlayItem(
+            label, QtCore.Qt.TopLeftCorner, QtCore.Qt.AlignTop | QtCore.Qt.AlignLeft
+        ),
+        OverlayItem(
+            scalebar,
+            QtCore.Qt.TopRightCorner,
+            QtCore.Qt.AlignTop | QtCore.Qt.AlignRight,
+        ),
+        OverlayItem(
+            colorbar,
+            QtCore.Qt.BottomLeftCorner,
+            QtCore.Qt.AlignBottom | QtCore.Qt.AlignLeft,
+        ),
+    ]
+
+
+def render_laser(
+    laser: _Laser,
+    name: str,
+    options: GraphicsOptions,
+    size: QtCore.QSize = None,
+    layer: int = None,
+    raw: bool = False,
+) -> QtGui.QImage:
+    """Renders an element as it would appear in a LaserGraphicsView.
+
+    The image is fit to `size`, keeping its aspect ratio, and the label,
+    scalebar and colorbar drawn over it.
+
+    Args:
+        laser: laser to render
+        name: element name
+        options: graphics options
+        size: size of the output image, defaults to 640x480
+        layer: layer of SRR lasers
+        raw: only render the colortable mapped data, `size` is ignored
+
+    Returns:
+        the rendered image
+    """
+    if size is None:
+        size = QtCore.QSize(640, 480)
+
+    data = laser.get(name, calibrate=options.calibrate, layer=layer, flat=True)
+    unit = laser.calibration[name].unit if options.calibrate else ""
+
+    vmin, vmax = options.get_colorrange_as_float(name, data)
+    table = colortable.get_table(options.colortable)
+    image = colortable_image(data, vmin, vmax, table)
+
+    if raw:
+        return image
+
+    if laser.layers > 1:
+        x0, x1, y0, y1 = laser.config.data_extent(data.shape, layer=layer)
+    else:
+        x0, x1, y0, y1 = laser.config.data_extent(data.shape)
+
+    # Fit the extent to the output, centered
+    scale = min(size.width() / (x1 - x0), size.height() / (y1 - y0))
+    target = QtCore.QRectF(0, 0, (x1 - x0) * scale, (y1 - y0) * scale)
+    target.moveCenter(QtCore.QRectF(0, 0, size.width(), size.height()).center())
+
+    items = overlay_items(name, unit, options)
+    scalebar, colorbar = items[1].item, items[2].item
+    scalebar.view_scale = scale
+    colorbar.updateTable(table, vmin, vmax)
+
+    output = QtGui.QImage(size, QtGui.QImage.Format_RGB32)
+    output.fill(QtCore.Qt.black)
+
+    painter = QtGui.QPainter(output)
+    painter.setRenderHint(QtGui.QPainter.SmoothPixmapTransform, options.smoothing)
+    painter.drawImage(target, image)
+    painter.setRenderHint(QtGui.QPainter.Antialiasing)
+    paint_overlay_items(painter, items, output.rect())
+    painter.end()
+
+    return output
@@ -68,3 +68,34 @@ class GraphicsOptions(object):
         self, name: str, colorrange: Tuple[Union[float, str], Union[float, str]]
     ) -> None:
         self._colorranges[name] = colorrange
+
+    def to_dict(self) -> dict:
+        return {
+            "items": dict(self.items),
+            "colortable": self.colortable,
+            "colorranges": {k: list(v) for k, v in self._colorranges.items()},
+            "colorrange_default": list(self.colorrange_default),
+            "smoothing": self.smoothing,
+            "font": {"family": self.font.family(), "size": self.font.pointSize()},
+            "font_color": QtGui.QColor(self.font_color).name(),
+            "calibrate": self.calibrate,
+            "units": self.units,
+        }
+
+    def update_from_dict(self, options: dict) -> None:
+        """Updates in place, the options are shared between widgets."""
+        self.items.update(options.get("items", {}))
+        self.colortable = options.get("colortable", self.colortable)
+        self._colorranges = {
+            k: tuple(v) for k, v in options.get("colorranges", {}).items()
+        }
+        if "colorrange_default" in options:
+            self.colorrange_default = tuple(options["colorrange_default"])
+        self.smoothing = options.get("smoothing", self.smoothing)
+        if "font" in options:
+            self.font.setFamily(options["font"]["family"])
+            self.font.setPointSize(options["font"]["size"])
+        if "font_color" in options:
+            self.font_color = QtGui.QColor(options["font_color"])
+        self.calibrate = options.get("calibrate", self.calibrate)
+        self.units = options.get("units", self.units)
@@ -1,4 +1,9 @@
 """Contains classes used for drawing a static overlay over a view.
+
+Each overlay item is painted to its own pixmap, composited over the view in
+:meth:`OverlayScene.drawForeground`. Items whose contents depend on the view list
+them in a `view_dependencies` attribute, 'scale' or 'size', and only these are
+repainted while zooming or resizing.
 """
 from PySide2 import QtCore, QtGui, QtWidgets
 
@@ -8,6 +13,9 @@ from typing import List, Set, Union
 
 
 class OverlayItem(object):
+    # Pixmaps are larger than items by the margin, for text outlines
+    pixmap_margin = 2
+
     def __init__(
         self,
         item: QtWidgets.QGraphicsItem,
@@ -23,6 +31,8 @@ class OverlayItem(object):
         self.anchor = anchor
         self.alignment = alignment
 
+        self.pixmap: QtGui.QPixmap = None
+
     def anchorPos(self, rect: QtCore.QRectF) -> QtCore.QPointF:
         if isinstance(self.anchor, QtCore.Qt.Corner):
             if self.anchor == QtCore.Qt.TopLeftCorner:
@@ -68,6 +78,51 @@ class OverlayItem(object):
         rect.moveTo(self.pos() + self.anchorPos(view_rect))
         return rect.contains(view_pos)
 
+    def dependsOn(self, change: str) -> bool:
+        """If the item must be repainted on a view 'scale' or 'size' change.
+
+        Resizing a view may also change its scale.
+        """
+        dependencies = getattr(self.item, "view_dependencies", ())
+        if change == "size":
+            return len(dependencies) > 0
+        return change in dependencies
+
+    def updatePixmap(self) -> None:
+        """Paints the item to `pixmap`."""
+        margin = self.pixmap_margin
+        rect = self.item.boundingRect().toAlignedRect()
+        self.pixmap = QtGui.QPixmap(rect.size() + QtCore.QSize(2 * margin, 2 * margin))
+        self.pixmap.fill(QtCore.Qt.transparent)
+
+        painter = QtGui.QPainter(self.pixmap)
+        painter.setRenderHint(QtGui.QPainter.Antialiasing)
+        # Items may use the painter viewport as their width
+        painter.setViewport(rect.translated(margin, margin))
+        painter.setWindow(rect)
+        self.item.paint(painter, QtWidgets.QStyleOptionGraphicsItem(), None)
+        painter.end()
+
+
+def paint_overlay_items(
+    painter: QtGui.QPainter, items: List[OverlayItem], rect: QtCore.QRect
+) -> None:
+    """Paints visible overlay items at their anchors in `rect`.
+
+    Does not require a scene or view, `painter` can be on any paint device.
+    """
+    for item in items:
+        if not item.item.isVisible():
+            continue
+        transform = QtGui.QTransform()
+        transform.translate(item.pos().x(), item.pos().y())
+        transform.translate(item.anchorPos(rect).x(), item.anchorPos(rect).y())
+        painter.setTransform(transform)
+        item.item.paint(painter, QtWidgets.QStyleOptionGraphicsItem(), None)
+
+        # painter.setBrush(QtGui.QBrush(QtCore.Qt.red, QtCore.Qt.Dense7Pattern))
+        # painter.drawRect(item.item.boundingRect())
+
 
 class OverlayScene(QtWidgets.QGraphicsScene):
     def __init__(
@@ -85,8 +140,8 @@ class OverlayScene(QtWidgets.QGraphicsScene):
         )  # Turn off BSP indexing, it causes a crash on item removal
 
         self.overlayitems: List[OverlayItem] = []
-
-        self.foreground_pixmap: QtGui.QPixmap = None
+        # View rect the overlay items are anchored to
+        self.foreground_rect: QtCore.QRect = None
 
     def addOverlayItem(
         self,
@@ -101,32 +156,40 @@ class OverlayScene(QtWidgets.QGraphicsScene):
         self.overlayitems.append(OverlayItem(item, anchor, alignment))
 
     def drawForeground(self, painter: QtGui.QPainter, rect: QtCore.QRect):
-        if self.foreground_pixmap is None:
-            self.updateForeground(rect)
+        if self.foreground_rect is None:
+            if len(self.views()) > 0:
+                self.updateForeground(self.views()[0].viewport().rect())
+            else:
+                self.updateForeground(rect.toAlignedRect())
 
         painter.save()
         painter.resetTransform()
-        # Draw the actual overlay
-        painter.drawPixmap(0, 0, self.foreground_pixmap)
-        painter.restore()
-
-    def updateForeground(self, rect: QtCore.QRect) -> None:
-        self.foreground_pixmap = QtGui.QPixmap(rect.size())
-        self.foreground_pixmap.fill(QtCore.Qt.transparent)
-        painter = QtGui.QPainter(self.foreground_pixmap)
-        painter.setRenderHint(QtGui.QPainter.Antialiasing)
-
+        # Draw the cached pixmap of each item
         for item in self.overlayitems:
             if not item.item.isVisible():
                 continue
-            transform = QtGui.QTransform()
-            transform.translate(item.pos().x(), item.pos().y())
-            transform.translate(item.anchorPos(rect).x(), item.anchorPos(rect).y())
-            painter.setTransform(transform)
-            item.item.paint(painter, QtWidgets.QStyleOptionGraphicsItem(), None)
+            if item.pixmap is None:
+                item.updatePixmap()
+            pos = item.pos() + item.anchorPos(self.foreground_rect)
+            margin = item.pixmap_margin
+            painter.drawPixmap(pos - QtCore.QPointF(margin, margin), item.pixmap)
+        painter.restore()
 
-            # painter.setBrush(QtGui.QBrush(QtCore.Qt.red, QtCore.Qt.Dense7Pattern))
-            # painter.drawRect(item.item.boundingRect())
+    def updateForeground(
+        self, rect: QtCore.QRect, items: List[OverlayItem] = None
+    ) -> None:
+        """Repaints the pixmaps of `items`, default is all, anchored to `rect`.
+
+        Hidden items are repainted when next shown.
+        """
+        self.foreground_rect = QtCore.QRect(rect)
+        if items is None:
+            items = self.overlayitems
+        for item in items:
+            if item.item.isVisible():
+                item.updatePixmap()
+            else:
+                item.pixmap = None
 
     def mouseDoubleClickEvent(self, event: QtWidgets.QGraphicsSceneMouseEvent) -> None:
         view_pos = event.widget().mapFromGlobal(event.screenPos())
@@ -139,6 +202,9 @@ class OverlayView(QtWidgets.QGraphicsView):
     viewScaleChanged = QtCore.Signal()
     viewSizeChanged = QtCore.Signal(QtCore.QRect)
 
+    # Minimum time between foreground updates when zooming or resizing, ms
+    foreground_interval = 16
+
     def __init__(
         self,
         scene: OverlayScene,
@@ -156,9 +222,15 @@ class OverlayView(QtWidgets.QGraphicsView):
         self.interaction_flags: Set[str] = set()  # Deafult is navigate when empty
         self._last_pos = QtCore.QPoint(0, 0)  # Used for mouse events
 
-        # Only redraw the ForegroundLayer when needed
-        self.viewSizeChanged.connect(self.updateForeground)
-        self.viewScaleChanged.connect(self.updateForeground)
+        # Only redraw the view dependent overlay items, at most once per frame
+        self.foreground_changes: Set[str] = set()
+        self.foreground_timer = QtCore.QTimer(self)
+        self.foreground_timer.setSingleShot(True)
+        self.foreground_timer.setInterval(self.foreground_interval)
+        self.foreground_timer.timeout.connect(self.updateChangedForeground)
+
+        self.viewSizeChanged.connect(lambda: self.requestForegroundUpdate("size"))
+        self.viewScaleChanged.connect(lambda: self.requestForegroundUpdate("scale"))
 
     def copyToClipboard(self) -> None:
         pixmap = QtGui.QPixmap(self.viewport().size())
@@ -244,7 +316,34 @@ class OverlayView(QtWidgets.QGraphicsView):
                 QtWidgets.QGraphicsScene.ForegroundLayer,
             )
 
+    def requestForegroundUpdate(self, change: str) -> None:
+        """Updates overlay items that depend on the view `change`.
+
+        The first request is updated immediately, later requests are coalesced
+        and updated every `foreground_interval`.
+
+        Args:
+            change: 'scale' or 'size'
+        """
+        self.foreground_changes.add(change)
+        if not self.foreground_timer.isActive():
+            self.updateChangedForeground()
+
+    def updateChangedForeground(self) -> None:
+        if len(self.foreground_changes) == 0:
+            return
+        items = [
+            item
+            for item in self.scene().overlayitems
+            if any(item.dependsOn(change) for change in self.foreground_changes)
+        ]
+        self.foreground_changes.clear()
+        self.scene().updateForeground(self.viewport().rect(), items)
+        self.viewport().update()
+        self.foreground_timer.start()
+
     def updateForeground(self, rect: QtCore.QRect = None) -> None:
+        """Repaints all overlay items, call when their contents change."""
         if rect is None:
             rect = self.viewport().rect()
         self.scene().updateForeground(rect)
@@ -269,6 +368,8 @@ class OverlayView(QtWidgets.QGraphicsView):
 
     def zoomToArea(self, rect: QtCore.QRectF) -> None:
         self.fitInView(rect, QtCore.Qt.KeepAspectRatio)
+        self.viewScaleChanged.emit()
 
     def zoomReset(self) -> None:
         self.fitInView(self.sceneRect(), QtCore.Qt.KeepAspectRatio)
+        self.viewScaleChanged.emit()
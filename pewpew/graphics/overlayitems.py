@@ -8,6 +8,8 @@ from PySide2 import QtCore, QtGui, QtWidgets
 
 import numpy as np
 
+from pewpew.lib.numpyqt import array_to_image
+
 from typing import Tuple
 
 
@@ -64,6 +66,9 @@ class LabelOverlay(QtWidgets.QGraphicsObject):
 
 
 class ColorBarOverlay(QtWidgets.QGraphicsItem):
+    # Spans the width of the view
+    view_dependencies = ("size",)
+
     def __init__(
         self,
         colortable: np.ndarray,
@@ -81,11 +86,10 @@ class ColorBarOverlay(QtWidgets.QGraphicsItem):
             font = QtGui.QFont()
             font.setPointSize(16)
 
-        image = QtGui.QImage(
-            np.arange(256, dtype=np.uint8), 256, 1, 256, QtGui.QImage.Format_Indexed8
-        )
+        image = array_to_image(np.arange(256, dtype=np.uint8))
         image.setColorTable(colortable)
-        self.pixmap = QtGui.QPixmap.fromImage(image)
+        # Converted copy, QPixmap cannot be used outside the GUI thread
+        self.image = image.convertToFormat(QtGui.QImage.Format_RGB32)
 
         self.vmin = vmin
         self.vmax = vmax
@@ -104,11 +108,10 @@ class ColorBarOverlay(QtWidgets.QGraphicsItem):
         self.vmin = vmin
         self.vmax = vmax
 
-        image = QtGui.QImage(
-            np.arange(256, dtype=np.uint8), 256, 1, 256, QtGui.QImage.Format_Indexed8
-        )
+        image = array_to_image(np.arange(256, dtype=np.uint8))
         image.setColorTable(colortable)
-        self.pixmap = QtGui.QPixmap.fromImage(image)
+        # Converted copy, QPixmap cannot be used outside the GUI thread
+        self.image = image.convertToFormat(QtGui.QImage.Format_RGB32)
 
     def boundingRect(self) -> QtCore.QRectF:
         fm = QtGui.QFontMetrics(self.font)
@@ -136,7 +139,7 @@ class ColorBarOverlay(QtWidgets.QGraphicsItem):
         fm = QtGui.QFontMetrics(self.font, painter.device())
 
         rect = QtCore.QRect(0, fm.height(), width, self.height)
-        painter.drawPixmap(rect, self.pixmap)
+        painter.drawImage(rect, self.image)
         painter.setPen(QtGui.QPen(QtCore.Qt.black, 2.0))
         painter.setBrush(QtGui.QBrush(QtCore.Qt.white, QtCore.Qt.NoBrush))
         painter.drawRect(rect)
@@ -169,6 +172,9 @@ class ColorBarOverlay(QtWidgets.QGraphicsItem):
 
 
 class MetricScaleBarOverlay(QtWidgets.QGraphicsItem):
+    # Length depends on the view scale
+    view_dependencies = ("scale",)
+
     allowed_lengths = [1.0, 2.0, 5.0, 10.0, 50.0, 100.0, 200.0, 500.0]
     units = {
         "pm": 1e-12,
@@ -193,6 +199,8 @@ class MetricScaleBarOverlay(QtWidgets.QGraphicsItem):
         self.unit = "μm"
         self.width = width
         self.height = height
+        # Scale used when not in a scene, i.e. offscreen rendering
+        self.view_scale = 1.0
 
         if font is None:
             font = QtGui.QFont()
@@ -220,18 +228,23 @@ class MetricScaleBarOverlay(QtWidgets.QGraphicsItem):
 
         return new * factors[idx] / self.units[self.unit], new_unit
 
+    def viewScale(self) -> float:
+        """Pixels per scene unit of the first view, or `view_scale`."""
+        if self.scene() is None or len(self.scene().views()) == 0:
+            return self.view_scale
+        return self.scene().views()[0].transform().m11()
+
     def paint(
         self,
         painter: QtGui.QPainter,
         option: QtWidgets.QStyleOptionGraphicsItem,
         widget: QtWidgets.QWidget = None,
     ):
-        view = self.scene().views()[0]
-        view_width = view.mapToScene(0, 0, self.width, 1).boundingRect().width()
-        width, unit = self.getWidthAndUnit(view_width)
+        scale = self.viewScale()
+        width, unit = self.getWidthAndUnit(self.width / scale)
         # Current scale
         text = f"{width * self.units[self.unit] / self.units[unit]:.3g} {unit}"
-        width = width * view.transform().m11()
+        width = width * scale
 
         fm = QtGui.QFontMetrics(self.font, painter.device())
         path = QtGui.QPainterPath()
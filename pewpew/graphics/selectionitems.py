@@ -6,12 +6,14 @@ from pewpew.graphics.imageitems import ScaledImageItem
 from pewpew.graphics.util import polygonf_contains_points
 
 from pewpew.lib.numpyqt import polygonf_to_array
+from pewpew.lib.profiler import timed
+from pewpew.lib.selection import RunMask
 
 from typing import Dict, Generator
 
 
 class SelectionItem(QtWidgets.QGraphicsObject):
-    selectionChanged = QtCore.Signal(np.ndarray, "QStringList")
+    selectionChanged = QtCore.Signal(object, "QStringList")
 
     def __init__(
         self,
@@ -102,6 +104,7 @@ class LassoImageSelectionItem(ScaledImageSelectionItem):
             self.poly.append(pos)
             self.prepareGeometryChange()
 
+    @timed(category="selection")
     def mouseReleaseEvent(self, event: QtWidgets.QGraphicsSceneMouseEvent) -> None:
         modes = list(self.modifierModes(event.modifiers()))
         pixel = self.pixelSize()
@@ -121,11 +124,11 @@ class LassoImageSelectionItem(ScaledImageSelectionItem):
         pixels = np.stack((X.flat, Y.flat), axis=1)
 
         # Get mask of selected area
-        mask = np.zeros(self.image_shape, dtype=np.bool)
         polymask = polygonf_contains_points(self.poly, pixels).reshape(ys.size, xs.size)
         # Insert
         ix, iy = int(x1 / pixel.width()), int(y1 / pixel.height())
-        mask[iy : iy + ys.size, ix : ix + xs.size] = polymask
+        polymask = polymask[: self.image_shape[0] - iy, : self.image_shape[1] - ix]
+        mask = RunMask.from_array(polymask, offset=(iy, ix), shape=self.image_shape)
 
         # self.poly.append(self.poly.first())
         self.poly.clear()
@@ -183,6 +186,7 @@ class RectImageSelectionItem(ScaledImageSelectionItem):
         self._rect.setBottomRight(event.pos())
         self.prepareGeometryChange()
 
+    @timed(category="selection")
     def mouseReleaseEvent(self, event: QtWidgets.QGraphicsSceneMouseEvent) -> None:
         if not event.button() & QtCore.Qt.LeftButton:
             return
@@ -199,8 +203,7 @@ class RectImageSelectionItem(ScaledImageSelectionItem):
         y1 = np.round(y1 / py).astype(int)
         y2 = np.round(y2 / py).astype(int)
 
-        mask = np.zeros(self.image_shape, dtype=np.bool)
-        mask[y1:y2, x1:x2] = True
+        mask = RunMask.from_rect(self.image_shape, (y1, y2), (x1, x2))
 
         self._rect = QtCore.QRectF()
         self.prepareGeometryChange()
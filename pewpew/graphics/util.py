@@ -2,9 +2,12 @@ from PySide2 import QtGui
 
 import numpy as np
 
-from pewpew.lib.numpyqt import polygonf_to_array
+from pewpew.lib.colorize import ColorizeBuffers, colorize_indexed
+from pewpew.lib.numpyqt import array_to_image, polygonf_to_array
 import pewpew.lib.polyext
 
+from typing import List
+
 
 def polygonf_contains_points(
     polygon: QtGui.QPolygonF, points: np.ndarray
@@ -12,3 +15,25 @@ def polygonf_contains_points(
     poly_array = polygonf_to_array(polygon)
     result = pewpew.lib.polyext.polygonf_contains_points(poly_array, points)
     return result
+
+
+def colortable_image(
+    data: np.ndarray,
+    vmin: float,
+    vmax: float,
+    colortable: List[int],
+    buffers: ColorizeBuffers = None,
+) -> QtGui.QImage:
+    """Maps `data` between `vmin` and `vmax` to an indexed image.
+
+    If `buffers` are passed the image shares memory with `buffers.out`, it is
+    overwritten by the next draw and should be copied with ``QImage.copy`` to keep.
+    """
+    if buffers is not None:
+        indexed = buffers.indexed(data, vmin, vmax)
+    else:
+        indexed = colorize_indexed(data, vmin, vmax)
+
+    image = array_to_image(indexed)
+    image.setColorTable(colortable)
+    return image
@@ -0,0 +1,62 @@
+"""Functions available in the calculator.
+
+:data:`parser_functions` maps each name to the parser function, its arguments
+and a description, :data:`reducer_functions` maps it to the implementation and
+number of arguments.
+"""
+
+import numpy as np
+
+from pewlib.process.calc import normalise
+from pewlib.process.threshold import otsu
+
+from pewpew.lib import kmeans
+from pewpew.lib.pratt import BinaryFunction, UnaryFunction, TernaryFunction
+
+
+parser_functions = {
+    "abs": (UnaryFunction("abs"), "(<x>)", "The absolute value of <x>."),
+    "kmeans": (
+        BinaryFunction("kmeans"),
+        "(<x>, <k>)",
+        "Returns lower bounds of 1 to <k> kmeans clusters.",
+    ),
+    "mean": (UnaryFunction("mean"), "(<x>)", "Returns the mean of <x>."),
+    "median": (
+        UnaryFunction("median"),
+        "(<x>)",
+        "Returns the median of <x>.",
+    ),
+    "nantonum": (UnaryFunction("nantonum"), "(<x>)", "Sets nan values to 0."),
+    "normalise": (
+        TernaryFunction("normalise"),
+        "(<x>, <min>, <max>)",
+        "Normalise <x> from from <min> to <max>.",
+    ),
+    "otsu": (
+        UnaryFunction("otsu"),
+        "(<x>)",
+        "Returns Otsu's threshold for <x>.",
+    ),
+    "percentile": (
+        BinaryFunction("percentile"),
+        "(<x>, <percent>)",
+        "Returns the <percent> percentile of <x>.",
+    ),
+    "threshold": (
+        BinaryFunction("threshold"),
+        "(<x>, <value>)",
+        "Sets <x> below <value> to NaN.",
+    ),
+}
+reducer_functions = {
+    "abs": (np.abs, 1),
+    "kmeans": (kmeans.thresholds, 2),
+    "mean": (np.nanmean, 1),
+    "median": (np.nanmedian, 1),
+    "nantonum": (np.nan_to_num, 1),
+    "normalise": (normalise, 3),
+    "otsu": (otsu, 1),
+    "percentile": (np.nanpercentile, 2),
+    "threshold": (lambda x, a: np.where(x > a, x, np.nan), 2),
+}
@@ -0,0 +1,198 @@
+"""Mapping of data to image pixels, without temporary arrays.
+
+Data is normalised in a float32 scratch buffer and written straight into the
+uint8 (indexed) or uint32 (RGB32) array that backs a QImage. Buffers are kept
+in a :class:`ColorizeBuffers` and reused between draws of the same shape.
+NaN values are mapped to the lowest value of the range.
+"""
+
+import numpy as np
+
+from typing import List, Tuple
+
+
+def aligned_empty(
+    shape: Tuple[int, int], dtype: type, previous: np.ndarray = None
+) -> np.ndarray:
+    """An uninitialised 2d array with rows aligned to 32 bits, as for QImages.
+
+    If `previous` was created by this function with the same shape and dtype, it
+    is returned instead.
+    """
+    dtype = np.dtype(dtype)
+    if previous is not None and previous.shape == shape and previous.dtype == dtype:
+        return previous
+
+    per_word = max(4 // dtype.itemsize, 1)
+    width = (shape[1] + per_word - 1) // per_word * per_word
+    return np.empty((shape[0], width), dtype=dtype)[:, : shape[1]]
+
+
+def _normalise_into(
+    data: np.ndarray, vmin: float, vmax: float, scratch: np.ndarray
+) -> np.ndarray:
+    """Normalises `data` from `vmin` - `vmax` to 0.0 - 1.0 into `scratch`.
+
+    If `vmin` equals `vmax` values at or above are 1.0 and values below 0.0.
+    """
+    # Subtracted in the dtype of data, only the small difference is cast
+    np.subtract(data, vmin, out=scratch, casting="unsafe")
+    if vmin == vmax:
+        np.greater_equal(scratch, 0.0, out=scratch, casting="unsafe")
+    else:  # Same rounding as scratch, so that vmax is exactly 1.0
+        np.divide(scratch, np.float32(vmax - vmin), out=scratch)
+    # fmax and fmin also replace NaN
+    np.fmax(scratch, 0.0, out=scratch)
+    np.fmin(scratch, 1.0, out=scratch)
+    return scratch
+
+
+def colorize_indexed(
+    data: np.ndarray,
+    vmin: float,
+    vmax: float,
+    out: np.ndarray = None,
+    scratch: np.ndarray = None,
+) -> np.ndarray:
+    """Maps `data` from `vmin` - `vmax` to indicies 0 - 255.
+
+    Args:
+        data: 2d array
+        vmin: value of the first index
+        vmax: value of the last index
+        out: uint8 array of `data.shape`
+        scratch: float32 array of `data.shape`
+
+    Returns:
+        `out`, or a new array
+    """
+    scratch = aligned_empty(data.shape, np.float32, scratch)
+    out = aligned_empty(data.shape, np.uint8, out)
+
+    _normalise_into(data, vmin, vmax, scratch)
+    np.multiply(scratch, 255.0, out=scratch)
+    np.copyto(out, scratch, casting="unsafe")
+    return out
+
+
+def colorize_rgb(
+    datas: List[np.ndarray],
+    ranges: List[Tuple[float, float]],
+    colors: List[Tuple[int, int, int]],
+    subtractive: bool = False,
+    normalise: bool = False,
+    shape: Tuple[int, int] = None,
+    out: np.ndarray = None,
+    scratch: np.ndarray = None,
+    channels: np.ndarray = None,
+) -> np.ndarray:
+    """Blends `datas` into RGB32 pixels.
+
+    Each data is normalised to its range and multiplied by its color, channels
+    are then summed and clipped to 0 - 255. For subtractive blending colors are
+    inverted before summing and the sum is inverted after.
+
+    Args:
+        datas: 2d arrays of the same shape
+        ranges: (vmin, vmax) of each data
+        colors: (r, g, b) of each data
+        subtractive: use subtractive blending
+        normalise: stretch summed channels to 0 - 255 instead of clipping
+        shape: shape of the image, required if there are no datas
+        out: uint32 array of the shape of the datas
+        scratch: float32 array of the shape of the datas
+        channels: float32 array of (3, *shape)
+
+    Returns:
+        `out`, or a new array
+    """
+    if shape is None:
+        shape = datas[0].shape
+    out = aligned_empty(shape, np.uint32, out)
+    if channels is None or channels.shape != (3, *shape):
+        channels = np.empty((3, *shape), dtype=np.float32)
+    channels.fill(0.0)
+
+    scratch = aligned_empty(shape, np.float32, scratch)
+    for data, (vmin, vmax), color in zip(datas, ranges, colors):
+        _normalise_into(data, vmin, vmax, scratch)
+        for channel, c in zip(channels, color):
+            if subtractive:
+                c = 255 - c
+            if c == 0:
+                continue
+            # Casting to out truncates each color, as for 8 bit images
+            np.multiply(scratch, c, out=out, casting="unsafe")
+            np.add(channel, out, out=channel)
+
+    if subtractive:
+        np.subtract(255.0, channels, out=channels)
+    if normalise:
+        cmin, cmax = channels.min(), channels.max()
+        if cmax > cmin:
+            np.subtract(channels, cmin, out=channels)
+            np.divide(channels, cmax - cmin, out=channels)
+            np.multiply(channels, 255.0, out=channels)
+    np.clip(channels, 0.0, 255.0, out=channels)
+    np.trunc(channels, out=channels)
+
+    out.fill(255 << 24)
+    for channel, shift in zip(channels, [16, 8, 0]):
+        np.multiply(channel, 1 << shift, out=channel)
+        np.add(out, channel, out=out, casting="unsafe")
+    return out
+
+
+class ColorizeBuffers(object):
+    """Reusable buffers for :func:`colorize_indexed` and :func:`colorize_rgb`.
+
+    The returned arrays are overwritten by the next call.
+    """
+
+    def __init__(self):
+        self.out: np.ndarray = None
+        self.scratch: np.ndarray = None
+        self.channels: np.ndarray = None
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            x.base.nbytes if x.base is not None else x.nbytes
+            for x in [self.out, self.scratch, self.channels]
+            if x is not None
+        )
+
+    def clear(self) -> None:
+        self.out, self.scratch, self.channels = None, None, None
+
+    def indexed(self, data: np.ndarray, vmin: float, vmax: float) -> np.ndarray:
+        self.out = aligned_empty(data.shape, np.uint8, self.out)
+        self.scratch = aligned_empty(data.shape, np.float32, self.scratch)
+        return colorize_indexed(data, vmin, vmax, self.out, self.scratch)
+
+    def rgb(
+        self,
+        datas: List[np.ndarray],
+        ranges: List[Tuple[float, float]],
+        colors: List[Tuple[int, int, int]],
+        subtractive: bool = False,
+        normalise: bool = False,
+        shape: Tuple[int, int] = None,
+    ) -> np.ndarray:
+        if shape is None:
+            shape = datas[0].shape
+        self.out = aligned_empty(shape, np.uint32, self.out)
+        self.scratch = aligned_empty(shape, np.float32, self.scratch)
+        if self.channels is None or self.channels.shape != (3, *shape):
+            self.channels = np.empty((3, *shape), dtype=np.float32)
+        return colorize_rgb(
+            datas,
+            ranges,
+            colors,
+            subtractive=subtractive,
+            normalise=normalise,
+            shape=shape,
+            out=self.out,
+            scratch=self.scratch,
+            channels=self.channels,
+        )
@@ -0,0 +1,294 @@
+"""Column (struct-of-arrays) storage of laser elements.
+
+In a structured array each element is a strided view, the stride being the size of
+all elements of a pixel. :class:`ColumnarData` instead keeps one contiguous array
+per element, while supporting the parts of the structured array interface used by
+pewlib's :class:`Laser` and pewpew; indexing by name, list of names or slice,
+`dtype`, `shape` and `copy`. Conversion to a structured array is only made when
+required, e.g. by :func:`numpy.save`.
+
+Elements may be stored with different types, see :func:`compact`. Assigning values
+that an element's type cannot hold, such as calibrated or filtered floats to counts
+stored as integers, promotes that element.
+"""
+
+import numpy as np
+
+from pewlib.calibration import Calibration
+from pewlib.laser import Laser
+
+from typing import Dict, List, Tuple, Union
+
+
+class ColumnarData(object):
+    """Elements stored as one contiguous array each.
+
+    Selecting an element returns its array, other indexing is applied to every
+    element and returns a new :class:`ColumnarData` that shares memory, as for
+    numpy views.
+
+    Args:
+        columns: dict of element name and array, all of the same shape
+        shape: shape of the data, required if there are no columns
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], shape: Tuple[int, ...] = None):
+        if shape is None:
+            shape = next(iter(columns.values())).shape
+        for name, column in columns.items():
+            if column.shape != shape:
+                raise ValueError(f"Shape of '{name}' does not match {shape}.")
+        self.columns = dict(columns)
+        self._shape = tuple(shape)
+
+    @classmethod
+    def from_structured(cls, data: np.ndarray) -> "ColumnarData":
+        """Copies each field of a structured array to a contiguous array."""
+        if isinstance(data, ColumnarData):
+            return data
+        return cls(
+            {name: np.ascontiguousarray(data[name]) for name in data.dtype.names},
+            shape=data.shape,
+        )
+
+    def to_structured(self) -> np.ndarray:
+        data = np.empty(self.shape, dtype=self.dtype)
+        for name, column in self.columns.items():
+            data[name] = column
+        return data
+
+    def __array__(self, dtype: np.dtype = None) -> np.ndarray:
+        data = self.to_structured()
+        return data if dtype is None else data.astype(dtype)
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"ColumnarData(shape={self.shape}, names={self.dtype.names})"
+
+    @property
+    def dtype(self) -> np.dtype:
+        """Structured dtype of the data, without padding."""
+        return np.dtype([(name, c.dtype) for name, c in self.columns.items()])
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes for column in self.columns.values())
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self._shape
+
+    @property
+    def size(self) -> int:
+        return int(np.prod(self.shape))
+
+    def _placeholder(self) -> np.ndarray:
+        # Zero strided array of shape, for the shape of an index or transform
+        return np.broadcast_to(np.False_, self.shape)
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(
+        self, key: Union[str, List[str], tuple, slice]
+    ) -> Union[np.ndarray, "ColumnarData"]:
+        if isinstance(key, str):
+            if key not in self.columns:
+                raise ValueError(f"no field of name {key}")
+            return self.columns[key]
+        if isinstance(key, list) and all(isinstance(k, str) for k in key):
+            return ColumnarData({k: self[k] for k in key}, shape=self.shape)
+
+        columns = {name: column[key] for name, column in self.columns.items()}
+        return ColumnarData(columns, shape=self._placeholder()[key].shape)
+
+    def __setitem__(
+        self, key: Union[str, tuple, slice], value: Union[np.ndarray, "ColumnarData"]
+    ) -> None:
+        if isinstance(key, str):
+            if key not in self.columns:
+                raise ValueError(f"no field of name {key}")
+            column = self.columns[key]
+            value = np.asanyarray(value)
+            if np.can_cast(value.dtype, column.dtype, casting="same_kind"):
+                column[...] = value
+            else:  # Promote the element
+                dtype = np.result_type(column.dtype, value.dtype)
+                self.columns[key] = np.ascontiguousarray(
+                    np.broadcast_to(value, self.shape), dtype=dtype
+                )
+        else:
+            for name, column in self.columns.items():
+                column[key] = value[name]
+
+    def astype(self, dtype: np.dtype) -> "ColumnarData":
+        """A contiguous copy, with the types of the structured `dtype`."""
+        dtype = np.dtype(dtype)
+        return ColumnarData(
+            {
+                name: np.array(column, dtype=dtype[name], order="C")
+                for name, column in self.columns.items()
+            },
+            shape=self.shape,
+        )
+
+    def copy(self) -> "ColumnarData":
+        """A contiguous copy of every element."""
+        return ColumnarData(
+            {name: column.copy(order="C") for name, column in self.columns.items()},
+            shape=self.shape,
+        )
+
+    def flip(self, axis: int) -> "ColumnarData":
+        """Elements flipped along `axis`, as :func:`numpy.flip`."""
+        return ColumnarData(
+            {name: np.flip(c, axis=axis) for name, c in self.columns.items()},
+            shape=self.shape,
+        )
+
+    def rot90(self, k: int = 1, axes: Tuple[int, int] = (0, 1)) -> "ColumnarData":
+        """Elements rotated by 90° `k` times, as :func:`numpy.rot90`."""
+        columns = {
+            name: np.rot90(c, k=k, axes=axes) for name, c in self.columns.items()
+        }
+        shape = np.rot90(self._placeholder(), k=k, axes=axes).shape
+        return ColumnarData(columns, shape=shape)
+
+    def add(self, name: str, array: np.ndarray) -> None:
+        """Adds an element, other elements are not copied."""
+        if name in self.columns:
+            raise ValueError(f"field '{name}' already exists")
+        if array.shape != self.shape:
+            raise ValueError(f"Shape of '{name}' does not match {self.shape}.")
+        self.columns[name] = np.ascontiguousarray(array)
+
+    def remove(self, names: Union[str, List[str]]) -> None:
+        if isinstance(names, str):
+            names = [names]
+        for name in names:
+            self.columns.pop(name)
+
+    def rename(self, names: Dict[str, str]) -> None:
+        """Renames elements, keeping their order."""
+        self.columns = {names.get(k, k): v for k, v in self.columns.items()}
+
+
+storage_types = ["float64", "float32", "integer"]
+
+
+def compact_dtype(array: np.ndarray, storage: str) -> np.dtype:
+    """The type used to store `array`.
+
+    For 'integer' storage this is the narrowest integer type that holds every value
+    exactly, if `array` contains NaN, infinite or fractional values its type is
+    kept.
+
+    Args:
+        array: element data
+        storage: one of :data:`storage_types`
+    """
+    if storage not in storage_types:
+        raise ValueError(f"Unknown storage type '{storage}'.")
+    if storage != "integer":
+        return np.dtype(storage)
+    if array.size == 0 or array.dtype.kind not in "fiu":
+        return array.dtype
+
+    vmin, vmax = np.amin(array), np.amax(array)
+    if array.dtype.kind == "f":
+        # NaN and inf are propagated to the min or max
+        if not (np.isfinite(vmin) and np.isfinite(vmax)):
+            return array.dtype
+        if np.any(np.trunc(array) != array):
+            return array.dtype
+
+    if vmin >= 0:
+        types = [np.uint8, np.uint16, np.uint32, np.uint64]
+    else:
+        types = [np.int8, np.int16, np.int32, np.int64]
+    for dtype in types:
+        info = np.iinfo(dtype)
+        if info.min <= vmin and vmax <= info.max:
+            return np.dtype(dtype)
+    return array.dtype
+
+
+def compact(data: Union[np.ndarray, ColumnarData], storage: str) -> ColumnarData:
+    """Copies each element to the type given by :func:`compact_dtype`.
+
+    Args:
+        data: structured or columnar data
+        storage: one of :data:`storage_types`
+    """
+    return ColumnarData(
+        {
+            name: np.ascontiguousarray(
+                data[name], dtype=compact_dtype(data[name], storage)
+            )
+            for name in data.dtype.names
+        },
+        shape=data.shape,
+    )
+
+
+class ColumnarLaser(Laser):
+    """A :class:`Laser` that stores its data as :class:`ColumnarData`.
+
+    Structured arrays assigned to `data` are converted. Elements are added, removed
+    and renamed without copying the other elements.
+
+    Files record the class name, use :meth:`to_laser` before saving with pewlib.
+    """
+
+    @classmethod
+    def from_laser(cls, laser: Laser) -> "ColumnarLaser":
+        if isinstance(laser, cls):
+            return laser
+        return cls(
+            laser.data,
+            calibration=laser.calibration,
+            config=laser.config,
+            name=laser.name,
+            path=laser.path,
+        )
+
+    def to_laser(self) -> Laser:
+        """A :class:`Laser` with a structured copy of the data."""
+        return Laser(
+            self.data.to_structured(),
+            calibration=self.calibration,
+            config=self.config,
+            name=self.name,
+            path=self.path,
+        )
+
+    @property
+    def data(self) -> ColumnarData:
+        return self._data
+
+    @data.setter
+    def data(self, data: Union[np.ndarray, ColumnarData]) -> None:
+        self._data = ColumnarData.from_structured(data)
+
+    def add(
+        self, isotope: str, data: np.ndarray, calibration: Calibration = None
+    ) -> None:
+        self.data.add(isotope, data)
+        if calibration is None:
+            calibration = Calibration()
+        self.calibration[isotope] = calibration
+
+    def remove(self, names: Union[str, List[str]]) -> None:
+        if isinstance(names, str):
+            names = [names]
+        self.data.remove(names)
+        for name in names:
+            self.calibration.pop(name)
+
+    def rename(self, names: Dict[str, str]) -> None:
+        self.data.rename(names)
+        for old, new in names.items():
+            self.calibration[new] = self.calibration.pop(old)
@@ -0,0 +1,21 @@
+"""Correction of signal drift over the course of an acquisition."""
+
+import numpy as np
+
+
+def fit_drift(ys: np.ndarray, degree: int) -> np.ndarray:
+    """Fits a polynomial to the mean drift of each row.
+
+    Args:
+        ys: mean of each row in the drift region, may contain NaN
+        degree: degree of polynomial, 0 returns `ys`
+
+    Returns:
+        the fitted drift
+    """
+    if degree == 0:
+        return ys
+    xs = np.arange(ys.size)
+    nans = np.isnan(ys)
+    coef = np.polynomial.polynomial.polyfit(xs[~nans], ys[~nans], degree)
+    return np.polynomial.polynomial.polyval(xs, coef)
@@ -0,0 +1,19 @@
+"""Naming of exported files."""
+
+from pathlib import Path
+
+
+invalid_chars = '<>:"/\\|?*'
+invalid_map = str.maketrans(invalid_chars, "_" * len(invalid_chars))
+
+
+def path_for_isotope(path: Path, isotope: str) -> Path:
+    """Appends `isotope` to the name of `path`, replacing invalid characters."""
+    return path.with_name(
+        path.stem + "_" + isotope.translate(invalid_map) + path.suffix
+    )
+
+
+def path_for_layer(path: Path, layer: int) -> Path:
+    """Appends 'layer<layer>' to the name of `path`."""
+    return path.with_name(path.stem + "_layer" + str(layer) + path.suffix)
@@ -0,0 +1,168 @@
+"""Filters for removing outliers from element images.
+
+Each entry of :data:`methods` has the filter function, its parameters as
+(name, default, (min, max), condition) and a description of each parameter.
+"""
+
+import numpy as np
+
+from pewlib.process import filters
+
+from pewpew.lib import filtersext
+
+from typing import Tuple
+
+
+def quantise(x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Maps `x` to the rank of each unique value.
+
+    Returns:
+        uint32 levels, 0xFFFFFFFF for NaN
+        value of each level
+    """
+    valid = ~np.isnan(x)
+    values, inverse = np.unique(x[valid], return_inverse=True)
+    levels = np.full(x.shape, np.iinfo(np.uint32).max, dtype=np.uint32)
+    levels[valid] = inverse
+    return levels, values
+
+
+def sliding_median(x: np.ndarray, size: int) -> np.ndarray:
+    """Median of the `size` x `size` window around each value, ignoring NaN.
+
+    Uses a sliding histogram of the ranks from :func:`quantise`, the cost per value
+    grows with `size` not its square. Windows without values are NaN.
+    """
+    levels, values = quantise(x)
+    lo, hi = filtersext.rolling_median_levels(levels, values.size, int(size))
+
+    # Empty windows are past the last level
+    lookup = np.append(values, np.nan)
+    lo = np.minimum(lo, values.size)
+    hi = np.minimum(hi, values.size)
+    return (lookup[lo] + lookup[hi]) / 2.0
+
+
+def rolling_mean(x: np.ndarray, size: int, threshold: float) -> np.ndarray:
+    x = x.astype(np.float64, copy=False)  # Integer data is padded with NaN
+    size = int(size)
+    return filters.rolling_mean(x, (size, size), threshold)
+
+
+def window_sums(x: np.ndarray, size: int) -> np.ndarray:
+    """Sum of the `size` x `size` window around each value, zero outside `x`.
+
+    Uses a summed-area table, the cost per value does not depend on `size`.
+    """
+    r = size // 2
+    table = np.zeros((x.shape[0] + 2 * r + 1, x.shape[1] + 2 * r + 1), dtype=x.dtype)
+    np.cumsum(np.pad(x, r), axis=0, out=table[1:, 1:])
+    np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+    return (
+        table[size:, size:]
+        - table[:-size, size:]
+        - table[size:, :-size]
+        + table[:-size, :-size]
+    )
+
+
+def local_mean(x: np.ndarray, size: int, threshold: float) -> np.ndarray:
+    """Replaces values more than `threshold` σ from the local mean.
+
+    As :func:`pewlib.process.filters.rolling_mean`, the σ of each window excludes
+    the central value and outliers are replaced with the mean of the window without
+    outliers. Windows are summed with :func:`window_sums`, NaN are not counted.
+    """
+    x = x.astype(np.float64, copy=False)
+    size = int(size)
+
+    valid = ~np.isnan(x)
+    # Offsetting by the mean reduces loss of precision in the variance
+    offset = np.mean(x[valid]) if np.any(valid) else 0.0
+    d = np.where(valid, x - offset, 0.0)
+    counts = window_sums(valid.astype(np.int64), size)
+    sums = window_sums(d, size)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = sums / counts + offset
+        # Don't include the central point in the std calculation
+        n = counts - valid
+        mean_others = (sums - d) / n
+        var = (window_sums(d * d, size) - d * d) / n - mean_others**2
+        stds = np.sqrt(np.maximum(var, 0.0))
+
+        outliers = np.abs(x - means) > threshold * stds
+
+        # As the mean is sensitive to outliers recalculate it
+        counts -= window_sums(outliers.astype(np.int64), size)
+        sums -= window_sums(np.where(outliers, d, 0.0), size)
+        means = sums / counts + offset
+
+    return np.where(np.logical_and(outliers, ~np.isnan(means)), means, x)
+
+
+def rolling_median(x: np.ndarray, size: int, threshold: float) -> np.ndarray:
+    """Replaces values more than `threshold` medians from the local median.
+
+    As :func:`pewlib.process.filters.rolling_median`, using :func:`sliding_median`.
+    """
+    x = x.astype(np.float64, copy=False)
+    medians = sliding_median(x, size)
+    distances = np.abs(x - medians)
+    outliers = distances > threshold * sliding_median(distances, size)
+    return np.where(np.logical_and(outliers, ~np.isnan(medians)), medians, x)
+
+
+# def simple_highpass(x: np.ndarray, limit: float, replace: float) -> np.ndarray:
+#     return np.where(x < limit, replace, x)
+
+
+# def simple_lowpass(x: np.ndarray, limit: float, replace: float) -> np.ndarray:
+#     return np.where(x > limit, replace, x)
+
+
+methods: dict = {
+    "Rolling Mean": {
+        "filter": rolling_mean,
+        "params": [
+            ("size", 5, (2.5, 99), lambda x: (x + 1) % 2 == 0),
+            ("σ", 3.0, (0.0, np.inf), None),
+        ],
+        "desc": ["Window size for local mean.", "Filter if > σ stddevs from mean."],
+    },
+    "Local Mean": {
+        "filter": local_mean,
+        "params": [
+            ("size", 5, (2.5, 999), lambda x: (x + 1) % 2 == 0),
+            ("σ", 3.0, (0.0, np.inf), None),
+        ],
+        "desc": ["Window size for local mean.", "Filter if > σ stddevs from mean."],
+    },
+    "Rolling Median": {
+        "filter": rolling_median,
+        "params": [
+            ("size", 5, (2.5, 99), lambda x: (x + 1) % 2 == 0),
+            ("M", 3.0, (0.0, np.inf), None),
+        ],
+        "desc": [
+            "Window size for local median.",
+            "Filter if > M medians from median.",
+        ],
+    },
+    # "Simple High-pass": {
+    #     "filter": simple_highpass,
+    #     "params": [
+    #         ("min", 1e3, (-np.inf, np.inf), None),
+    #         ("replace", 0.0, (-np.inf, np.inf), None),
+    #     ],
+    #     "desc": ["Filter if below this value.", "Value to replace with."],
+    # },
+    # "Simple Low-pass": {
+    #     "filter": simple_lowpass,
+    #     "params": [
+    #         ("max", 1e3, (-np.inf, np.inf), None),
+    #         ("replace", 0.0, (-np.inf, np.inf), None),
+    #     ],
+    #     "desc": ["Filter if above this value.", "Value to replace with."],
+    # },
+}
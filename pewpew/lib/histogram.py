@@ -0,0 +1,67 @@
+import numpy as np
+
+from typing import Tuple, Union
+
+
+def sample(x: np.ndarray, max_samples: int = 100000) -> np.ndarray:
+    """Random sample of `x`, with replacement.
+
+    Sampling without replacement requires a permutation of all of `x`, the sample is
+    only used to estimate percentiles and bins.
+
+    Args:
+        x: flattened to 1d
+        max_samples: maximum size of sample
+
+    Returns:
+        `x` if smaller than `max_samples`, otherwise a sample of `x`
+    """
+    x = x.ravel()
+    if x.size <= max_samples:
+        return x
+    return x[np.random.randint(0, x.size, max_samples)]
+
+
+def histogram(
+    x: np.ndarray,
+    bins: Union[int, str] = "auto",
+    percentiles: Tuple[float, float] = (5.0, 95.0),
+    min_bins: int = 16,
+    max_bins: int = 128,
+    max_samples: int = 100000,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Histogram of `x` between two percentiles.
+
+    The range and number of bins are estimated in a single pass over a random
+    sample of `x`. The data is then binned using uniform width bins, letting
+    numpy perform the binning in one vectorised call.
+
+    Args:
+        x: flattened to 1d, should not contain NaN
+        bins: number of bins or a numpy bin estimator, e.g. 'auto'
+        percentiles: lower and upper percentiles of range
+        min_bins: minimum number of bins
+        max_bins: maximum number of bins
+        max_samples: maximum size of sample used for estimation
+
+    Returns:
+        histogram
+        bin edges
+
+    See Also:
+        :func:`numpy.histogram_bin_edges`
+    """
+    x = x.ravel()
+    xs = sample(x, max_samples)
+    vmin, vmax = np.percentile(xs, percentiles)
+
+    if isinstance(bins, str):
+        bins = np.histogram_bin_edges(xs, bins=bins, range=(vmin, vmax)).size - 1
+
+    # Limits are compared to the number of edges
+    if bins + 1 > max_bins:
+        bins = max_bins
+    elif bins + 1 < min_bins:
+        bins = min_bins
+
+    return np.histogram(x, bins=bins, range=(vmin, vmax))
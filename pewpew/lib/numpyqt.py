@@ -26,13 +26,59 @@ def array_to_image(array: np.ndarray) -> QtGui.QImage:
     elif array.dtype == np.uint32:
         image_format = QtGui.QImage.Format_RGB32
 
+    # Rows padded for alignment, see pewpew.lib.colorize.aligned_empty
+    buffer = array
+    if not array.flags.c_contiguous:
+        if (
+            array.base is not None
+            and array.base.flags.c_contiguous
+            and array.strides == array.base.strides
+            and array.ctypes.data == array.base.ctypes.data
+        ):
+            buffer = array.base
+        else:
+            array = np.ascontiguousarray(array)
+            buffer = array
+
     image = QtGui.QImage(
-        array.data, array.shape[1], array.shape[0], array.strides[0], image_format
+        buffer.data, array.shape[1], array.shape[0], array.strides[0], image_format
     )
     image._array = array
     return image
 
 
+def array_to_text(array: np.ndarray, fmt: str = "%.10g", delimiter: str = "\t") -> str:
+    """Formats a 1d or 2d array as delimited text.
+
+    Rows are converted to Python objects in bulk and formatted without any
+    per value string concatenation.
+    """
+    array = np.asarray(array)
+    if array.ndim == 1:
+        return "\n".join(map(fmt.__mod__, array.tolist()))
+
+    fmt = delimiter.join([fmt] * array.shape[1])
+    return "\n".join(map(fmt.__mod__, map(tuple, array.tolist())))
+
+
+def array_to_mimedata(array: np.ndarray, fmt: str = "%.10g") -> QtCore.QMimeData:
+    """Formats an array as tab separated text and a html table.
+
+    1d arrays are formatted as a single column.
+    """
+    text = array_to_text(array, fmt, delimiter="\t")
+    rows = text.replace("\t", "</td><td>").replace("\n", "</td></tr><tr><td>")
+    html = (
+        '<meta http-equiv="content-type" content="text/html; charset=utf-8"/>'
+        f"<table><tr><td>{rows}</td></tr></table>"
+    )
+
+    mime = QtCore.QMimeData()
+    mime.setHtml(html)
+    mime.setText(text)
+    return mime
+
+
 def polygonf_to_array(polygon: QtGui.QPolygonF) -> np.ndarray:
     buf = (ctypes.c_double * 2 * polygon.length()).from_address(
         shiboken2.getCppPointer(polygon.data())[0]
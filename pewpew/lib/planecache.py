@@ -0,0 +1,192 @@
+"""Cache of the planes drawn by a laser widget.
+
+Drawing an element calibrates and, for SRR lasers, flattens it into a new array.
+A :class:`PlaneCache` keeps these planes so that redraws that only change the
+colour table, range or overlays reuse them. Planes are keyed by element, layer and
+the calibration they were made with, data and config changes must be passed to
+:meth:`PlaneCache.invalidate`.
+
+SRR reconstruction in pewlib is performed for every element at once, here it is
+performed per element by :func:`flatten_srr` and in parallel by
+:meth:`PlaneCache.prefetch`.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+from pewlib.laser import _Laser
+from pewlib.process.calc import subpixel_offset_equal
+from pewlib.srr import SRRLaser
+
+from typing import Dict, Hashable, Iterable, List, Tuple
+
+
+def flatten_srr(laser: SRRLaser, name: str) -> np.ndarray:
+    """The reconstructed, flattened data of element `name`.
+
+    Equal to `laser.get(name, flat=True)`, without reconstructing other elements.
+    """
+    config = laser.config
+    mag = config.magnification
+    mag_axis = 0 if mag > 1.0 else 1
+    mag = np.round(1.0 / mag if mag < 1.0 else mag).astype(int)
+
+    layers = [layer[name] for layer in laser.data]
+    length = (layers[1].shape[mag_axis] * mag, layers[0].shape[mag_axis] * mag)
+    aligned = np.empty((length[1], length[0], len(layers)), dtype=layers[0].dtype)
+    for i, layer in enumerate(layers):
+        # Trim data of warmup time and excess
+        layer = layer[:, config._warmup : config._warmup + length[i % 2]]
+        layer = np.repeat(layer, mag, axis=mag_axis)
+        if i % 2 == 1:  # Flip vertical layers
+            layer = layer.T
+        aligned[:, :, i] = layer
+
+    data = subpixel_offset_equal(
+        aligned, list(config._subpixel_offsets), config.subpixels_per_pixel
+    )
+    return np.mean(data, axis=2)
+
+
+def laser_plane(
+    laser: _Laser, name: str, calibrate: bool, layer: int = None
+) -> np.ndarray:
+    """Element `name` as `laser.get(name, calibrate, layer=layer, flat=True)`.
+
+    SRR layers are taken without copying other elements.
+    """
+    if not isinstance(laser, SRRLaser):
+        return laser.get(name, calibrate=calibrate, flat=True)
+
+    if layer is None:
+        data = flatten_srr(laser, name)
+    else:
+        data = laser.data[layer][name]
+        if layer % 2 == 1:  # Flip alternate layers
+            data = data.T
+    if calibrate:
+        data = laser.calibration[name].calibrate(data)
+    return data
+
+
+def calibration_key(laser: _Laser, name: str, calibrate: bool) -> Hashable:
+    """The version of the calibration of element `name`, as a hashable."""
+    if not calibrate:
+        return None
+    calibration = laser.calibration[name]
+    return (calibration.intercept, calibration.gradient)
+
+
+class PlaneCache(object):
+    """Least recently used cache of read-only 2d planes.
+
+    Planes are removed once there are more than `max_planes` or they use more than
+    `max_bytes`, the last used plane is always kept. Planes of uncalibrated data
+    may share memory with the laser.
+    """
+
+    max_bytes = 256 * 2**20
+    max_planes = 16
+    max_workers: int = None
+
+    def __init__(self):
+        self.planes: Dict[Tuple[str, int, Hashable], np.ndarray] = OrderedDict()
+
+    @property
+    def nbytes(self) -> int:
+        return sum(plane.nbytes for plane in self.planes.values())
+
+    def _insert(self, key: Tuple[str, int, Hashable], plane: np.ndarray) -> np.ndarray:
+        plane = plane.view()
+        plane.flags.writeable = False
+        self.planes[key] = plane
+        while len(self.planes) > 1 and (
+            len(self.planes) > self.max_planes or self.nbytes > self.max_bytes
+        ):
+            self.planes.popitem(last=False)
+        return plane
+
+    def get(
+        self, laser: _Laser, name: str, calibrate: bool, layer: int = None
+    ) -> np.ndarray:
+        """The plane of element `name`, as `laser.get(..., flat=True)`."""
+        key = (name, layer, calibration_key(laser, name, calibrate))
+        plane = self.planes.get(key)
+        if plane is not None:
+            self.planes.move_to_end(key)
+            return plane
+
+        return self._insert(key, laser_plane(laser, name, calibrate, layer=layer))
+
+    def prefetch(
+        self, laser: _Laser, names: List[str], calibrate: bool, layer: int = None
+    ) -> None:
+        """Computes the missing planes of `names` in parallel.
+
+        Only as many planes as fit in the limits are computed, in the order of
+        `names`. The planes are not marked as used.
+        """
+        keys = [
+            (name, layer, calibration_key(laser, name, calibrate)) for name in names
+        ]
+        missing = [
+            (key, name) for key, name in zip(keys, names) if key not in self.planes
+        ]
+        if len(missing) == 0:
+            return
+
+        # Estimate the size of planes from the first
+        key, name = missing.pop(0)
+        plane = self._insert(key, laser_plane(laser, name, calibrate, layer=layer))
+        self.planes.move_to_end(key, last=False)
+        count = min(
+            self.max_planes - len(self.planes),
+            (self.max_bytes - self.nbytes) // max(plane.nbytes, 1),
+        )
+        missing = missing[: max(count, 0)]
+
+        with ThreadPoolExecutor(self.max_workers) as executor:
+            planes = list(
+                executor.map(
+                    lambda name: laser_plane(laser, name, calibrate, layer=layer),
+                    [name for _, name in missing],
+                )
+            )
+        for (key, _), plane in zip(missing, planes):
+            self._insert(key, plane)
+            self.planes.move_to_end(key, last=False)
+
+    def structured(
+        self, laser: _Laser, calibrate: bool, layer: int = None
+    ) -> np.ndarray:
+        """All elements as a structured array, as `laser.get(flat=True)`."""
+        self.prefetch(laser, laser.isotopes, calibrate, layer=layer)
+        planes = {
+            name: self.get(laser, name, calibrate, layer=layer)
+            for name in laser.isotopes
+        }
+        shape = next(iter(planes.values())).shape
+        data = np.empty(shape, dtype=[(k, v.dtype) for k, v in planes.items()])
+        for name, plane in planes.items():
+            data[name] = plane
+        return data
+
+    def clear(self) -> None:
+        self.planes.clear()
+
+    def invalidate(self, names: Iterable[str] = None) -> None:
+        """Removes the planes of elements `names`, default is all."""
+        if names is None:
+            self.clear()
+            return
+        names = set(names)
+        for key in [key for key in self.planes if key[0] in names]:
+            self.planes.pop(key)
+
+    def rename(self, names: Dict[str, str]) -> None:
+        """Renames cached elements, keeping their planes."""
+        self.planes = OrderedDict(
+            ((names.get(key[0], key[0]),) + key[1:], plane)
+            for key, plane in self.planes.items()
+        )
@@ -0,0 +1,249 @@
+"""Timing of hot paths for diagnosing slow operations.
+
+Functions are instrumented with the :func:`timed` decorator or the :func:`profile`
+context manager. Nothing is recorded until the :data:`profiler` is enabled, until
+then both cost a single attribute lookup.
+
+.. code-block:: python
+
+    @timed(category="draw")
+    def drawLaser(self, laser, name):
+        ...
+
+    with profile("import", "io", path=str(path)):
+        ...
+
+Recorded events can be summarised or saved as a `Chrome trace
+<https://docs.google.com/document/d/1CvAClvFfyA5R-PhYUmn5OOQtYMH4h6I0nSsKchNAySU>`_,
+viewable in chrome://tracing or https://ui.perfetto.dev.
+"""
+
+from collections import deque
+import contextlib
+import functools
+import inspect
+import json
+import logging
+import os
+from pathlib import Path
+import threading
+import time
+import tracemalloc
+
+from PySide2 import QtCore
+
+from typing import Callable, ContextManager, Deque, Dict, List, NamedTuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+class ProfileEvent(NamedTuple):
+    name: str
+    category: str
+    start: int  # ns since the profiler was created
+    duration: int  # ns
+    memory_delta: int  # net bytes allocated, 0 if memory is not traced
+    thread: int
+    args: dict
+
+
+class Profiler(object):
+    """Records the duration and allocations of profiled functions.
+
+    Allocations are the net change in traced memory over an event, memory that is
+    allocated and freed within the event is not counted. Only the last `max_events`
+    events are kept. Events longer than `log_threshold` seconds are also logged.
+    """
+
+    max_events = 100000
+    log_threshold = 0.5
+
+    def __init__(self):
+        self.enabled = False
+        self.events: Deque[ProfileEvent] = deque(maxlen=self.max_events)
+        self.origin = time.perf_counter_ns()
+
+        self._started_tracemalloc = False
+
+    @property
+    def trace_memory(self) -> bool:
+        return self._started_tracemalloc
+
+    def enable(self, trace_memory: bool = False) -> None:
+        """Starts recording events.
+
+        Args:
+            trace_memory: also record allocations, using :mod:`tracemalloc`
+        """
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        elif not trace_memory and self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stops recording events, recorded events are kept."""
+        self.enabled = False
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def clear(self) -> None:
+        self.events.clear()
+
+    def record(
+        self,
+        name: str,
+        category: str,
+        start: int,
+        duration: int,
+        memory_delta: int = 0,
+        args: dict = None,
+    ) -> None:
+        self.events.append(
+            ProfileEvent(
+                name,
+                category,
+                start - self.origin,
+                duration,
+                memory_delta,
+                threading.get_ident(),
+                args or {},
+            )
+        )
+        if duration > self.log_threshold * 1e9:
+            logger.info(f"{name} took {duration / 1e6:.0f} ms.")
+
+    def summary(self) -> Dict[str, dict]:
+        """Statistics for each event name.
+
+        Returns:
+            dict of name and dict of 'category', 'count', 'total', 'mean' and 'max'
+            durations in seconds and 'memory_delta', the largest net allocation in
+            bytes
+        """
+        summary: Dict[str, dict] = {}
+        for event in list(self.events):
+            if event.name not in summary:
+                summary[event.name] = {
+                    "category": event.category,
+                    "count": 0,
+                    "total": 0.0,
+                    "max": 0.0,
+                    "memory_delta": 0,
+                }
+            stats = summary[event.name]
+            stats["count"] += 1
+            stats["total"] += event.duration / 1e9
+            stats["max"] = max(stats["max"], event.duration / 1e9)
+            stats["memory_delta"] = max(stats["memory_delta"], event.memory_delta)
+        for stats in summary.values():
+            stats["mean"] = stats["total"] / stats["count"]
+        return summary
+
+    def chromeTrace(self) -> dict:
+        """Events in the Chrome trace event format."""
+        pid = os.getpid()
+        trace: List[dict] = []
+        for event in list(self.events):
+            args = dict(event.args)
+            if event.memory_delta != 0:
+                args["memory_delta"] = event.memory_delta
+            trace.append(
+                {
+                    "name": event.name,
+                    "cat": event.category,
+                    "ph": "X",
+                    "ts": event.start / 1e3,
+                    "dur": event.duration / 1e3,
+                    "pid": pid,
+                    "tid": event.thread,
+                    "args": args,
+                }
+            )
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def saveChromeTrace(self, path: Union[str, Path]) -> None:
+        with Path(path).open("w") as fp:
+            json.dump(self.chromeTrace(), fp)
+
+
+profiler = Profiler()
+
+
+class _ProfileContext(object):
+    __slots__ = ("name", "category", "args", "start", "memory")
+
+    def __init__(self, name: str, category: str, args: dict):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self) -> "_ProfileContext":
+        self.memory = tracemalloc.get_traced_memory()[0] if profiler.trace_memory else 0
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        duration = time.perf_counter_ns() - self.start
+        memory_delta = 0
+        if profiler.trace_memory:
+            memory_delta = tracemalloc.get_traced_memory()[0] - self.memory
+        profiler.record(
+            self.name, self.category, self.start, duration, memory_delta, self.args
+        )
+
+
+_null_context = contextlib.nullcontext()
+
+
+def profile(name: str, category: str = "", **args) -> ContextManager:
+    """Context manager that records the enclosed block.
+
+    Args:
+        name: name of the event
+        category: category of the event
+        args: extra values stored in the trace
+    """
+    if not profiler.enabled:
+        return _null_context
+    return _ProfileContext(name, category, args)
+
+
+def timed(name: str = None, category: str = "") -> Callable:
+    """Decorator that records calls of a function.
+
+    Decorated methods of QObjects can be connected to Qt signals. PySide passes all
+    of a signal's arguments to the wrapper, so for methods of QObjects positional
+    arguments past those of the method are dropped, unless it takes ``*args``.
+    **This also applies to direct calls of these methods.** Other functions called
+    with too many arguments raise TypeError as usual.
+
+    Args:
+        name: name of the event, defaults to the function's qualified name
+        category: category of the event
+    """
+
+    def decorator(func: Callable) -> Callable:
+        label = name or func.__qualname__
+        code = func.__code__
+        nargs = None if code.co_flags & inspect.CO_VARARGS else code.co_argcount
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if (
+                nargs is not None
+                and len(args) > nargs
+                and isinstance(args[0], QtCore.QObject)
+            ):
+                args = args[:nargs]
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            with _ProfileContext(label, category, {}):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
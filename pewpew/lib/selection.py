@@ -0,0 +1,267 @@
+import numpy as np
+
+from typing import Callable, Dict, Optional, Tuple, Union
+
+
+class RunMask(object):
+    """Compact boolean mask of a 2d image, stored as runs of selected pixels.
+
+    Runs are half-open intervals of the flattened (row major) image, stored as one
+    sorted array of their start and end indices. Runs that reach the end of a row
+    continue onto the next. The memory used and the cost of set operations grow with
+    the number of runs, i.e. the length of the selection boundary, not the size of
+    the image. :meth:`contains` tests a single pixel in O(log runs).
+
+    Args:
+        shape: shape of the image
+        edges: sorted start and end of each run, no runs if None
+    """
+
+    def __init__(self, shape: Tuple[int, int], edges: np.ndarray = None):
+        self.shape = (int(shape[0]), int(shape[1]))
+        if edges is None:
+            edges = np.empty(0, dtype=np.int64)
+        self.edges = np.asarray(edges, dtype=np.int64)
+        assert self.edges.ndim == 1 and self.edges.size % 2 == 0
+
+    @classmethod
+    def from_array(
+        cls,
+        array: np.ndarray,
+        offset: Tuple[int, int] = (0, 0),
+        shape: Tuple[int, int] = None,
+    ) -> "RunMask":
+        """Runs of the true values of a 2d array.
+
+        Args:
+            array: mask, or part of a mask
+            offset: (row, column) of `array` in the image
+            shape: shape of the image, default is the shape of `array`
+        """
+        if isinstance(array, RunMask):
+            return array
+        array = np.asarray(array, dtype=bool)
+        if shape is None:
+            shape = array.shape
+        # +1 at the start of runs and -1 at the end, for each row
+        changes = np.diff(array.astype(np.int8), axis=1, prepend=0, append=0)
+        rows, cols = np.nonzero(changes)
+        edges = (rows + offset[0]) * shape[1] + cols + offset[1]
+
+        # Join runs that continue onto the next row
+        joined = edges[1:] == edges[:-1]
+        keep = np.ones(edges.size, dtype=bool)
+        keep[1:][joined] = False
+        keep[:-1][joined] = False
+        return cls(shape, edges[keep])
+
+    @classmethod
+    def from_rect(
+        cls, shape: Tuple[int, int], rows: Tuple[int, int], cols: Tuple[int, int]
+    ) -> "RunMask":
+        """Runs of the rectangle [rows[0], rows[1]) x [cols[0], cols[1]).
+
+        The rectangle is clipped to the image.
+        """
+        r0, r1 = max(rows[0], 0), min(rows[1], shape[0])
+        c0, c1 = max(cols[0], 0), min(cols[1], shape[1])
+        if r1 <= r0 or c1 <= c0:
+            return cls(shape)
+        if c0 == 0 and c1 == shape[1]:  # A single run of whole rows
+            return cls(shape, np.array([r0 * shape[1], r1 * shape[1]]))
+        starts = np.arange(r0, r1, dtype=np.int64) * shape[1] + c0
+        return cls(shape, np.stack((starts, starts + (c1 - c0)), axis=1).ravel())
+
+    def __array__(self, dtype: np.dtype = None) -> np.ndarray:
+        return self.to_array(dtype if dtype is not None else bool)
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"RunMask(shape={self.shape}, runs={self.edges.size // 2})"
+
+    @property
+    def count(self) -> int:
+        """Number of selected pixels."""
+        return int(np.sum(self.edges[1::2] - self.edges[::2]))
+
+    @property
+    def nbytes(self) -> int:
+        return self.edges.nbytes
+
+    @property
+    def size(self) -> int:
+        return self.shape[0] * self.shape[1]
+
+    def contains(self, row: int, col: int) -> bool:
+        """If pixel (`row`, `col`) is selected, False outside the image."""
+        if not (0 <= row < self.shape[0] and 0 <= col < self.shape[1]):
+            return False
+        index = row * self.shape[1] + col
+        return bool(np.searchsorted(self.edges, index, side="right") % 2 == 1)
+
+    def nonzero(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Row and column indices of selected pixels, as :func:`numpy.nonzero`."""
+        starts, ends = self.edges[::2], self.edges[1::2]
+        lengths = ends - starts
+        # Index in the flattened image, without creating it
+        offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        return np.divmod(np.arange(offsets.size) + offsets, self.shape[1])
+
+    def to_array(self, dtype: np.dtype = bool) -> np.ndarray:
+        """Rasterises the runs, selected pixels are 1 and others 0.
+
+        Values are written directly as `dtype`, e.g. np.uint8 for an indexed image.
+        """
+        starts, ends = self.edges[::2], self.edges[1::2]
+        if starts.size > self.size // 256:  # Many short runs, sum the changes
+            changes = np.zeros(self.size + 1, dtype=np.int8)
+            changes[starts] = 1
+            changes[ends] = -1
+            array = np.cumsum(changes[:-1], dtype=np.int8).astype(dtype)
+        else:
+            array = np.zeros(self.size, dtype=dtype)
+            for start, end in zip(starts.tolist(), ends.tolist()):
+                array[start:end] = 1
+        return array.reshape(self.shape)
+
+    def _combine(
+        self, other: "RunMask", op: Callable[[np.ndarray, np.ndarray], np.ndarray]
+    ) -> "RunMask":
+        other = RunMask.from_array(other)
+        if other.shape != self.shape:
+            raise ValueError(f"Shape {other.shape} does not match {self.shape}.")
+        # Selection of each mask at and after every edge
+        edges = np.union1d(self.edges, other.edges)
+        a = np.searchsorted(self.edges, edges, side="right") % 2 == 1
+        b = np.searchsorted(other.edges, edges, side="right") % 2 == 1
+        selected = op(a, b)
+        changed = selected != np.concatenate(([False], selected[:-1]))
+        return RunMask(self.shape, edges[changed])
+
+    def union(self, other: "RunMask") -> "RunMask":
+        return self._combine(other, np.logical_or)
+
+    def intersection(self, other: "RunMask") -> "RunMask":
+        return self._combine(other, np.logical_and)
+
+    def difference(self, other: "RunMask") -> "RunMask":
+        return self._combine(other, lambda a, b: np.logical_and(a, ~b))
+
+    def symmetric_difference(self, other: "RunMask") -> "RunMask":
+        return self._combine(other, np.logical_xor)
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+    __xor__ = symmetric_difference
+
+
+class SelectionView(object):
+    """Lazy view of the selected pixels in a structured array.
+
+    The selection is stored as the row and column indices of selected pixels,
+    elements are only gathered when first requested and then cached.
+    No NaN filled copies of the data are made.
+
+    Args:
+        data: structured array
+        mask: boolean mask or :class:`RunMask` of selected pixels,
+            None selects everything
+    """
+
+    def __init__(self, data: np.ndarray, mask: Union[np.ndarray, RunMask] = None):
+        assert data.dtype.names is not None
+        assert data.ndim == 2
+
+        self.data = data
+        self.indices: Tuple[np.ndarray, np.ndarray] = None
+        if mask is not None:
+            assert mask.shape == data.shape
+            self.indices = np.nonzero(mask)
+
+        self._values: Dict[str, np.ndarray] = {}
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.get(name)
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        return self.data.dtype.names
+
+    @property
+    def bounds(self) -> Tuple[int, int, int, int]:
+        """Bounding box of the selection as (x0, x1, y0, y1)."""
+        if self.indices is None:
+            return 0, self.data.shape[0], 0, self.data.shape[1]
+        ix, iy = self.indices
+        if ix.size == 0:
+            return 0, 0, 0, 0
+        # Indices from np.nonzero are sorted by row
+        return ix[0], ix[-1] + 1, np.min(iy), np.max(iy) + 1
+
+    @property
+    def mask(self) -> Optional[np.ndarray]:
+        """Boolean mask of selected pixels, None if everything is selected."""
+        if self.indices is None:
+            return None
+        mask = np.zeros(self.data.shape, dtype=bool)
+        mask[self.indices] = True
+        return mask
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """Shape of the selection bounding box."""
+        x0, x1, y0, y1 = self.bounds
+        return x1 - x0, y1 - y0
+
+    @property
+    def size(self) -> int:
+        """Number of selected pixels."""
+        if self.indices is None:
+            return self.data.size
+        return self.indices[0].size
+
+    def get(self, name: str) -> np.ndarray:
+        """The selected values of an element.
+
+        Args:
+            name: element name
+
+        Returns:
+            1d array of selected values, cached
+        """
+        if name not in self._values:
+            if self.indices is None:
+                values = self.data[name].ravel()
+            else:
+                values = self.data[name][self.indices]
+            self._values[name] = values
+        return self._values[name]
+
+    def crop(self, fill_value: float = np.nan) -> np.ndarray:
+        """Copy the selection bounding box.
+
+        Elements that cannot hold `fill_value`, e.g. integers and NaN, are promoted.
+
+        Args:
+            fill_value: value for pixels that are not selected
+
+        Returns:
+            structured array with the shape of `bounds`
+        """
+        x0, x1, y0, y1 = self.bounds
+        data = self.data[x0:x1, y0:y1]
+        if self.indices is None:
+            return data.copy()
+
+        dtype = np.dtype(
+            [
+                (name, np.result_type(data.dtype[name], fill_value))
+                for name in data.dtype.names
+            ]
+        )
+        data = data.astype(dtype)
+        unselected = np.ones(data.shape, dtype=bool)
+        unselected[self.indices[0] - x0, self.indices[1] - y0] = False
+        for name in data.dtype.names:
+            data[name][unselected] = fill_value
+        return data
@@ -0,0 +1,77 @@
+"""Sessions store the layout and state of a workspace.
+
+A session is a JSON document describing the views, tabs, graphics options and
+per tab state. Lasers are referenced by their path, lasers that cannot be
+reloaded from their path (modified or imported from vendor formats) are cached
+as stores in a directory next to the session.
+"""
+
+import base64
+import json
+from pathlib import Path
+
+import numpy as np
+
+from pewpew.lib.selection import RunMask
+
+from typing import Generator, Optional, Union
+
+
+version = 2
+
+
+def cache_dir(path: Path) -> Path:
+    """Directory of cached lasers for session `path`."""
+    return path.with_name(path.stem + "_cache")
+
+
+def is_reloadable(path: Path) -> bool:
+    """If a laser can be loaded from `path` without import options."""
+    return path.suffix.lower() in [".npz", ".pew"] and path.exists()
+
+
+def mask_to_dict(mask: Optional[Union[RunMask, np.ndarray]]) -> Optional[dict]:
+    """Encodes a selection as the edges of its runs, see :class:`RunMask`."""
+    if mask is None:
+        return None
+    mask = RunMask.from_array(mask)
+    if mask.edges.size == 0:
+        return None
+    edges = mask.edges.astype("<i8").tobytes()
+    return {"shape": list(mask.shape), "edges": base64.b64encode(edges).decode()}
+
+
+def mask_from_dict(state: Optional[dict]) -> Optional[RunMask]:
+    """Decodes a selection, version 1 sessions store masks as packed bits."""
+    if state is None:
+        return None
+    shape = tuple(state["shape"])
+    if "bits" in state:
+        bits = np.frombuffer(base64.b64decode(state["bits"]), dtype=np.uint8)
+        mask = np.unpackbits(bits, count=int(np.prod(shape))).reshape(shape)
+        return RunMask.from_array(mask)
+    edges = np.frombuffer(base64.b64decode(state["edges"]), dtype="<i8")
+    return RunMask(shape, edges)
+
+
+def tab_states(layout: dict) -> Generator[dict, None, None]:
+    """Yields the state of every tab in a layout."""
+    for child in layout["children"]:
+        if "children" in child:
+            yield from tab_states(child)
+        else:
+            yield from child["tabs"]
+
+
+def load(path: Path) -> dict:
+    with path.open("r") as fp:
+        state = json.load(fp)
+    if state.get("_version", 0) > version:  # pragma: no cover
+        raise ValueError("Session version is newer than supported.")
+    return state
+
+
+def save(path: Path, state: dict) -> None:
+    state = dict(state, _version=version)
+    with path.open("w") as fp:
+        json.dump(state, fp, indent=2)
@@ -0,0 +1,318 @@
+"""Chunked directory store for lasers.
+
+A store is a directory, by convention ending in '.pew', with the layout
+
+.. code-block:: text
+
+    laser.pew/
+        meta.json               class, name, shapes, chunking and elements
+        config.npy              laser parameters
+        elements/<key>/
+            calibration.npy     element calibration
+            <layer>.<row>.<col> zlib compressed chunks
+
+Elements, or tiles of an element, can be read individually and saving
+only rewrites the chunks of modified elements. Chunks are compressed and
+decompressed in parallel, zlib releases the GIL.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+from pathlib import Path
+import re
+import shutil
+import zlib
+
+import numpy as np
+
+from pewlib import Calibration, Config, Laser
+from pewlib.laser import _Laser
+from pewlib.srr import SRRConfig, SRRLaser
+
+from typing import Dict, Iterable, List, Tuple
+
+
+version = 1
+meta_name = "meta.json"
+
+
+def is_valid_directory(path: Path) -> bool:
+    return path.is_dir() and path.joinpath(meta_name).exists()
+
+
+def _class_name(laser: _Laser) -> str:
+    # Subclasses, such as ColumnarLaser, are stored as their pewlib class
+    return "SRRLaser" if isinstance(laser, SRRLaser) else "Laser"
+
+
+def _layers(laser: _Laser) -> List[np.ndarray]:
+    if isinstance(laser, SRRLaser):
+        return laser.data
+    return [laser.data]
+
+
+def _unique_key(name: str, keys: Iterable[str]) -> str:
+    key = re.sub(r"[^\w.-]", "_", name)
+    unique, i = key, 1
+    while unique in keys:
+        unique = f"{key}_{i}"
+        i += 1
+    return unique
+
+
+class LaserStore(object):
+    """Read access to a chunked directory store.
+
+    Args:
+        path: store directory
+        max_workers: number of threads used for decompression
+    """
+
+    def __init__(self, path: Path, max_workers: int = None):
+        if not is_valid_directory(path):
+            raise FileNotFoundError(f"{path.name} is not a valid store.")
+
+        self.path = path
+        self.max_workers = max_workers
+        with path.joinpath(meta_name).open("r") as fp:
+            self.meta = json.load(fp)
+
+        if self.meta["_version"] > version:  # pragma: no cover
+            raise ValueError("Store version is newer than supported.")
+
+        self.elements: Dict[str, dict] = {
+            element["name"]: element for element in self.meta["elements"]
+        }
+
+    @property
+    def names(self) -> List[str]:
+        return [element["name"] for element in self.meta["elements"]]
+
+    @property
+    def chunks(self) -> Tuple[int, int]:
+        return tuple(self.meta["chunks"])  # type: ignore
+
+    @property
+    def shapes(self) -> List[Tuple[int, int]]:
+        return [tuple(shape) for shape in self.meta["shapes"]]  # type: ignore
+
+    def element_path(self, name: str) -> Path:
+        return self.path.joinpath("elements", self.elements[name]["key"])
+
+    def calibration(self, name: str) -> Calibration:
+        array = np.load(self.element_path(name).joinpath("calibration.npy"))
+        return Calibration.from_array(array)
+
+    def config(self) -> Config:
+        array = np.load(self.path.joinpath("config.npy"))
+        if self.meta["_class"] == "SRRLaser":
+            return SRRConfig.from_array(array)
+        return Config.from_array(array)
+
+    def read(
+        self, name: str, layer: int = 0, region: Tuple[int, int, int, int] = None
+    ) -> np.ndarray:
+        """Reads an element, or a region of it.
+
+        Only chunks that overlap `region` are read.
+
+        Args:
+            name: element name
+            layer: layer of SRR lasers
+            region: (y0, y1, x0, x1), default is the whole layer
+
+        Returns:
+            2d array
+        """
+        ny, nx = self.shapes[layer]
+        y0, y1, x0, x1 = region if region is not None else (0, ny, 0, nx)
+        cy, cx = self.chunks
+        dtype = np.dtype(self.elements[name]["dtype"])
+        path = self.element_path(name)
+
+        def read_chunk(rc: Tuple[int, int]) -> None:
+            r, c = rc
+            shape = min(cy, ny - r * cy), min(cx, nx - c * cx)
+            raw = path.joinpath(f"{layer}.{r}.{c}").read_bytes()
+            chunk = np.frombuffer(zlib.decompress(raw), dtype=dtype).reshape(shape)
+            # Overlap of chunk and region
+            ry0, rx0 = max(y0, r * cy), max(x0, c * cx)
+            ry1, rx1 = min(y1, r * cy + shape[0]), min(x1, c * cx + shape[1])
+            data[ry0 - y0 : ry1 - y0, rx0 - x0 : rx1 - x0] = chunk[
+                ry0 - r * cy : ry1 - r * cy, rx0 - c * cx : rx1 - c * cx
+            ]
+
+        data = np.empty((y1 - y0, x1 - x0), dtype=dtype)
+        indices = [
+            (r, c)
+            for r in range(y0 // cy, (y1 - 1) // cy + 1)
+            for c in range(x0 // cx, (x1 - 1) // cx + 1)
+        ]
+        with ThreadPoolExecutor(self.max_workers) as executor:
+            list(executor.map(read_chunk, indices))
+        return data
+
+
+def load(path: Path, names: List[str] = None, max_workers: int = None) -> _Laser:
+    """Loads a laser from a store.
+
+    Args:
+        path: store directory
+        names: only load these elements, default is all
+        max_workers: number of threads used for decompression
+
+    Returns:
+        :class:`Laser` or :class:`SRRLaser`
+    """
+    store = LaserStore(path, max_workers=max_workers)
+    if names is None:
+        names = store.names
+
+    dtype = [(name, store.elements[name]["dtype"]) for name in names]
+    layers = []
+    for i, shape in enumerate(store.shapes):
+        data = np.empty(shape, dtype=dtype)
+        for name in names:
+            data[name] = store.read(name, layer=i)
+        layers.append(data)
+
+    calibration = {name: store.calibration(name) for name in names}
+
+    if store.meta["_class"] == "SRRLaser":
+        return SRRLaser(
+            layers, calibration, store.config(), name=store.meta["name"], path=path
+        )
+    return Laser(
+        layers[0], calibration, store.config(), name=store.meta["name"], path=path
+    )
+
+
+def _replace_npy(path: Path, array: np.ndarray) -> None:
+    """Saves `array` to a temporary file and then replaces `path`."""
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as fp:
+        np.save(fp, array)
+    os.replace(tmp, path)
+
+
+def save(
+    path: Path,
+    laser: _Laser,
+    modified: Iterable[str] = None,
+    renamed: Dict[str, str] = None,
+    chunks: Tuple[int, int] = (256, 256),
+    level: int = 1,
+    max_workers: int = None,
+) -> None:
+    """Saves a laser to a store.
+
+    If `path` is an existing store of the same shape then only `modified` and new
+    elements are written. Renamed elements keep their data. Calibrations, config
+    and name are always written.
+
+    Written elements always go to new directories and the metadata is replaced
+    last, only then are directories of modified or removed elements deleted.
+    An interrupted save leaves the previous store readable.
+
+    Args:
+        path: store directory
+        laser: :class:`Laser` or :class:`SRRLaser`
+        modified: names of modified elements, default is all
+        renamed: map of names in the store to current names
+        chunks: chunk shape
+        level: zlib compression level
+        max_workers: number of threads used for compression
+    """
+    layers = _layers(laser)
+    shapes = [list(layer.shape) for layer in layers]
+    elements_path = path.joinpath("elements")
+    elements_path.mkdir(parents=True, exist_ok=True)
+
+    old: Dict[str, dict] = {}
+    if is_valid_directory(path):
+        store = LaserStore(path)
+        if (
+            store.meta["_class"] == _class_name(laser)
+            and store.meta["shapes"] == shapes
+            and store.chunks == tuple(chunks)
+        ):
+            old = store.elements
+    if modified is None:
+        modified = laser.isotopes
+    if renamed is None:
+        renamed = {}
+
+    # Match elements to those in the store, by rename or by name
+    existing: Dict[str, dict] = {}
+    for old_name, new_name in renamed.items():
+        if old_name in old and new_name in laser.isotopes:
+            existing[new_name] = old[old_name]
+    for name in laser.isotopes:
+        if name in old and name not in existing and name not in renamed:
+            existing[name] = old[name]
+
+    # Keys of all directories, including those of incompatible or failed saves
+    keys = {p.name for p in elements_path.iterdir()}
+    elements = []
+    write = []
+    for name in laser.isotopes:
+        dtype = layers[0].dtype[name].str
+        if (
+            name in existing
+            and name not in modified
+            and existing[name]["dtype"] == dtype
+        ):
+            element = dict(existing[name], name=name, dtype=dtype)
+        else:
+            element = {"name": name, "key": _unique_key(name, keys), "dtype": dtype}
+            write.append(element)
+        keys.add(element["key"])
+        elements.append(element)
+
+    def write_chunk(args: Tuple[Path, np.ndarray]) -> None:
+        chunk_path, chunk = args
+        chunk_path.write_bytes(
+            zlib.compress(np.ascontiguousarray(chunk).tobytes(), level)
+        )
+
+    def chunked(element: dict):
+        element_path = elements_path.joinpath(element["key"])
+        for i, layer in enumerate(layers):
+            ny, nx = layer.shape
+            for r, y in enumerate(range(0, ny, chunks[0])):
+                for c, x in enumerate(range(0, nx, chunks[1])):
+                    chunk = layer[element["name"]][y : y + chunks[0], x : x + chunks[1]]
+                    yield element_path.joinpath(f"{i}.{r}.{c}"), chunk
+
+    with ThreadPoolExecutor(max_workers) as executor:
+        for element in write:
+            elements_path.joinpath(element["key"]).mkdir()
+            list(executor.map(write_chunk, chunked(element)))
+
+    for element in elements:
+        _replace_npy(
+            elements_path.joinpath(element["key"], "calibration.npy"),
+            laser.calibration[element["name"]].to_array(),
+        )
+    _replace_npy(path.joinpath("config.npy"), laser.config.to_array())
+
+    meta = {
+        "_version": version,
+        "_class": _class_name(laser),
+        "name": laser.name,
+        "shapes": shapes,
+        "chunks": list(chunks),
+        "compression": "zlib",
+        "elements": elements,
+    }
+    tmp = path.joinpath(meta_name + ".tmp")
+    with tmp.open("w") as fp:
+        json.dump(meta, fp, indent=2)
+    os.replace(tmp, path.joinpath(meta_name))
+
+    # Delete stale elements, no longer referenced by the metadata
+    current = [element["key"] for element in elements]
+    for element_path in elements_path.iterdir():
+        if element_path.name not in current:
+            shutil.rmtree(element_path, ignore_errors=True)
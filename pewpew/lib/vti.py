@@ -0,0 +1,205 @@
+"""Streaming export of lasers to VTK ImageData.
+
+Elements are written one at a time in slabs of rows, optionally compressed,
+as appended raw binary data. Output is compatible with :func:`pewlib.io.vtk.save`.
+"""
+import sys
+import zlib
+from pathlib import Path
+
+import numpy as np
+import numpy.lib.recfunctions as rfn
+
+from pewlib.calibration import Calibration
+from pewlib.io.vtk import escape_xml
+from pewlib.laser import _Laser
+from pewlib.srr import SRRLaser
+
+from typing import BinaryIO, Callable, Dict, Generator, Tuple
+
+try:
+    import lz4.block
+
+    has_lz4 = True
+except ImportError:  # pragma: no cover
+    has_lz4 = False
+
+
+def _compress_lz4(block: bytes) -> bytes:  # pragma: no cover
+    return lz4.block.compress(block, store_size=False)
+
+
+compressors: Dict[str, Tuple[str, Callable[[bytes], bytes]]] = {
+    "zlib": ("vtkZLibDataCompressor", zlib.compress)
+}
+if has_lz4:  # pragma: no cover
+    compressors["lz4"] = ("vtkLZ4DataCompressor", _compress_lz4)
+
+
+def element_volume(laser: _Laser, name: str) -> np.ndarray:
+    """Uncalibrated 3d data of a single element.
+
+    For SRR lasers only the element is reconstructed, otherwise a view is returned.
+    """
+    if isinstance(laser, SRRLaser):
+        layers = [rfn.repack_fields(layer[[name]]) for layer in laser.data]
+        return SRRLaser(layers, config=laser.config).get(name)
+    return laser.data[name][:, :, None]
+
+
+def slabs(
+    volume: np.ndarray, calibration: Calibration = None, rows: int = 1
+) -> Generator[np.ndarray, None, None]:
+    """Yields `volume` in VTK order, up to `rows` rows at a time.
+
+    VTK is x, y ordered with y reversed, the returned slabs are float64.
+    """
+    for z in range(volume.shape[2]):
+        plane = volume[::-1, :, z]
+        for y in range(0, plane.shape[0], rows):
+            slab = plane[y : y + rows]
+            if calibration is not None:
+                slab = calibration.calibrate(slab)
+            yield np.ascontiguousarray(slab, dtype=np.float64)
+
+
+def _write_raw(fp: BinaryIO, volume: np.ndarray, calibration: Calibration, rows: int):
+    fp.write(np.uint64(volume.size * 8))
+    for slab in slabs(volume, calibration, rows):
+        fp.write(slab)
+
+
+def _write_compressed(
+    fp: BinaryIO,
+    volume: np.ndarray,
+    calibration: Calibration,
+    rows: int,
+    compress: Callable[[bytes], bytes],
+    block_size: int,
+):
+    size = volume.size * 8
+    nblocks = (size + block_size - 1) // block_size
+    header = np.zeros(3 + nblocks, dtype=np.uint64)
+    header[:3] = nblocks, block_size, size % block_size
+
+    # Space for the header, written once the block sizes are known
+    header_pos = fp.tell()
+    fp.write(header)
+
+    i = 3
+    buffer = bytearray()
+    for slab in slabs(volume, calibration, rows):
+        buffer.extend(slab.tobytes())
+        while len(buffer) >= block_size:
+            block = compress(bytes(buffer[:block_size]))
+            del buffer[:block_size]
+            fp.write(block)
+            header[i] = len(block)
+            i += 1
+    if len(buffer) > 0:
+        block = compress(bytes(buffer))
+        fp.write(block)
+        header[i] = len(block)
+
+    end = fp.tell()
+    fp.seek(header_pos)
+    fp.write(header)
+    fp.seek(end)
+
+
+def save(
+    path: Path,
+    laser: _Laser,
+    spacing: Tuple[float, float, float],
+    calibrate: bool = True,
+    compression: str = None,
+    block_size: int = 1 << 20,
+) -> None:
+    """Save a laser as a VTK ImageData XML.
+
+    Each element is written in slabs of about `block_size` bytes, peak memory
+    is one slab for :class:`pewlib.laser.Laser` and one element for SRR lasers.
+
+    Args:
+        path: path to file
+        laser: laser to save
+        spacing: spacing of '.vti'
+        calibrate: calibrate the data
+        compression: None, or key of `compressors`
+        block_size: size of compressed blocks, in bytes
+    """
+    if compression is not None and compression not in compressors:
+        raise ValueError(f"Unknown compression '{compression}'.")
+
+    names = laser.isotopes
+    # SRR volumes are larger than the laser shape
+    volume = element_volume(laser, names[0])
+    ny, nx, nz = volume.shape
+    rows = max(1, block_size // (nx * 8))
+
+    endian = "LittleEndian" if sys.byteorder == "little" else "BigEndian"
+    compressor = ""
+    if compression is not None:
+        compressor = f' compressor="{compressors[compression][0]}"'
+
+    extent_str = f"0 {nx} 0 {ny} 0 {nz}"
+    origin_str = "0.0 0.0 0.0"
+    spacing_str = f"{spacing[0]} {spacing[1]} {spacing[2]}"
+
+    with path.open("wb") as fp:
+        fp.write(
+            (
+                '<?xml version="1.0"?>\n'
+                '<VTKFile type="ImageData" version="1.0" '
+                f'byte_order="{endian}" header_type="UInt64"{compressor}>\n'
+                f'<ImageData WholeExtent="{extent_str}" '
+                f'Origin="{origin_str}" Spacing="{spacing_str}">\n'
+                f'<Piece Extent="{extent_str}">\n'
+            ).encode()
+        )
+
+        fp.write(f'<CellData Scalars="{escape_xml(names[0])}">\n'.encode())
+        # Offsets of compressed data are unknown, written as fixed width later
+        offset_pos = []
+        offset = 0
+        for name in names:
+            fp.write(
+                (
+                    f'<DataArray Name="{escape_xml(name)}" type="Float64" '
+                    'format="appended" offset="'
+                ).encode()
+            )
+            offset_pos.append(fp.tell())
+            if compression is None:
+                fp.write(str(offset).encode())
+                offset += nx * ny * nz * 8 + 8  # blocksize
+            else:
+                fp.write(b"0" * 20)
+            fp.write('"/>\n'.encode())
+        fp.write("</CellData>\n".encode())
+
+        fp.write(
+            (
+                "</Piece>\n" "</ImageData>\n" '<AppendedData encoding="raw">\n' "_"
+            ).encode()
+        )
+
+        start = fp.tell()
+        offsets = []
+        for i, name in enumerate(names):
+            offsets.append(fp.tell() - start)
+            if i > 0:
+                volume = element_volume(laser, name)
+            calibration = laser.calibration[name] if calibrate else None
+            if compression is None:
+                _write_raw(fp, volume, calibration, rows)
+            else:
+                compress = compressors[compression][1]
+                _write_compressed(fp, volume, calibration, rows, compress, block_size)
+
+        fp.write(("</AppendedData>\n" "</VTKFile>").encode())
+
+        if compression is not None:
+            for pos, offset in zip(offset_pos, offsets):
+                fp.seek(pos)
+                fp.write(f"{offset:020d}".encode())
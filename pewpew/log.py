@@ -1,24 +1,75 @@
+from collections import deque
+import html
 import logging
+import threading
 
 from PySide2 import QtCore, QtGui, QtWidgets
 
-from typing import List
+from pewpew.lib.profiler import profiler
+
+from typing import Deque, List, Tuple
 
 
 class LogRecordSignaller(QtCore.QObject):
-    new_record = QtCore.Signal(str, logging.LogRecord)
+    """Passes records from a :class:`QtListHandler` to the GUI thread.
+
+    The first record after a send starts `timer`, which sends all records
+    received before it times out.
+    """
+
+    new_records = QtCore.Signal(list)
+    send_requested = QtCore.Signal()
+
+    def __init__(self, interval: int, parent: QtCore.QObject = None):
+        super().__init__(parent)
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(interval)
+        # Queued when requested from other threads
+        self.send_requested.connect(self.timer.start)
 
 
 class QtListHandler(logging.Handler):
-    def __init__(self) -> None:
+    """Stores the last `capacity` records and sends them to the GUI in batches.
+
+    Records are formatted as they are emitted and sent at most once every
+    `send_interval` ms through ``signal.new_records``, as a list of
+    (formatted string, record) tuples.
+
+    Args:
+        capacity: number of records kept
+        send_interval: time between updates in ms
+    """
+
+    def __init__(self, capacity: int = 10000, send_interval: int = 100) -> None:
         super().__init__()
 
-        self.signal = LogRecordSignaller()
-        self.records: List[logging.LogRecord] = []
+        self.records: Deque[logging.LogRecord] = deque(maxlen=capacity)
+        self.pending: Deque[Tuple[str, logging.LogRecord]] = deque(maxlen=capacity)
+        self.pending_lock = threading.Lock()
+
+        self.signal = LogRecordSignaller(send_interval)
+        self.signal.timer.timeout.connect(self.sendRecords)
+
+    @property
+    def capacity(self) -> int:
+        return self.records.maxlen
 
     def emit(self, record: logging.LogRecord) -> None:
-        self.records.append(record)
-        self.signal.new_record.emit(self.format(record), record)
+        string = self.format(record)
+        with self.pending_lock:
+            self.records.append(record)
+            self.pending.append((string, record))
+            request = len(self.pending) == 1
+        if request:
+            self.signal.send_requested.emit()
+
+    def sendRecords(self) -> None:
+        with self.pending_lock:
+            pending = list(self.pending)
+            self.pending.clear()
+        if len(pending) > 0:
+            self.signal.new_records.emit(pending)
 
 
 class LoggingTextEdit(QtWidgets.QPlainTextEdit):
@@ -30,29 +81,34 @@ class LoggingTextEdit(QtWidgets.QPlainTextEdit):
         logging.CRITICAL: "purple",
     }
 
-    def __init__(self, parent: QtWidgets.QWidget = None):
+    def __init__(self, max_lines: int = 0, parent: QtWidgets.QWidget = None):
         super().__init__(parent)
         self.setFont(QtGui.QFont("monospace"))
         self.setReadOnly(True)
-
-    @QtCore.Slot(str, logging.LogRecord)
-    def add_record(self, string: str, record: logging.LogRecord) -> None:
-        color = self.COLORS.get(record.levelno, "black")
-        string = f"<pre><font color={color}>{string}</font></pre>"
-        self.appendHtml(string)
+        # Oldest lines are removed past the maximum
+        self.setMaximumBlockCount(max_lines)
+
+    @QtCore.Slot(list)
+    def add_records(self, records: List[Tuple[str, logging.LogRecord]]) -> None:
+        if self.maximumBlockCount() > 0:
+            records = records[-self.maximumBlockCount() :]
+        lines = []
+        for string, record in records:
+            color = self.COLORS.get(record.levelno, "black")
+            lines.append(f"<pre><font color={color}>{html.escape(string)}</font></pre>")
+        # One append and repaint for all records, each is still a separate block
+        self.appendHtml("".join(lines))
 
     def minimumSizeHint(self) -> QtCore.QSize:
         return QtCore.QSize(600, 400)
 
 
 class LoggingDialog(QtWidgets.QDialog):
-    def __init__(
-        self, parent: QtWidgets.QWidget = None,
-    ):
+    def __init__(self, parent: QtWidgets.QWidget = None, *, capacity: int = 10000):
         super().__init__(parent)
-        self.handler = QtListHandler()
-        self.textedit = LoggingTextEdit()
-        self.handler.signal.new_record.connect(self.textedit.add_record)
+        self.handler = QtListHandler(capacity)
+        self.textedit = LoggingTextEdit(capacity)
+        self.handler.signal.new_records.connect(self.textedit.add_records)
         self.handler.setFormatter(
             logging.Formatter(
                 "[%(asctime)s] %(levelname)8s - %(name)s : %(message)s", datefmt="%H:%M:%S"
@@ -62,3 +118,120 @@ class LoggingDialog(QtWidgets.QDialog):
         layout = QtWidgets.QVBoxLayout()
         layout.addWidget(self.textedit)
         self.setLayout(layout)
+
+
+class PerformanceDialog(QtWidgets.QDialog):
+    """Summary of the events recorded by :data:`pewpew.lib.profiler.profiler`.
+
+    Recording can be started and stopped and the events exported as a Chrome trace.
+    """
+
+    HEADERS = [
+        "Name",
+        "Category",
+        "Count",
+        "Total (ms)",
+        "Mean (ms)",
+        "Max (ms)",
+        "Net Alloc. (kB)",
+    ]
+
+    def __init__(self, parent: QtWidgets.QWidget = None):
+        super().__init__(parent)
+        self.setWindowTitle("Performance")
+
+        self.check_enabled = QtWidgets.QCheckBox("Record timings")
+        self.check_enabled.setChecked(profiler.enabled)
+        self.check_enabled.toggled.connect(self.updateProfiler)
+        self.check_memory = QtWidgets.QCheckBox("Trace allocations")
+        self.check_memory.setToolTip(
+            "Record the net memory allocated, slows all operations."
+        )
+        self.check_memory.setChecked(profiler.trace_memory)
+        self.check_memory.toggled.connect(self.updateProfiler)
+
+        self.table = QtWidgets.QTableWidget(0, len(self.HEADERS))
+        self.table.setHorizontalHeaderLabels(self.HEADERS)
+        self.table.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setStretchLastSection(True)
+
+        self.button_clear = QtWidgets.QPushButton("Clear")
+        self.button_clear.pressed.connect(self.clear)
+        self.button_export = QtWidgets.QPushButton("Export Trace")
+        self.button_export.pressed.connect(self.dialogExportTrace)
+
+        # Update while visible
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self.refresh)
+
+        layout_checks = QtWidgets.QHBoxLayout()
+        layout_checks.addWidget(self.check_enabled)
+        layout_checks.addWidget(self.check_memory)
+        layout_checks.addStretch(1)
+
+        layout_buttons = QtWidgets.QHBoxLayout()
+        layout_buttons.addStretch(1)
+        layout_buttons.addWidget(self.button_clear)
+        layout_buttons.addWidget(self.button_export)
+
+        layout = QtWidgets.QVBoxLayout()
+        layout.addLayout(layout_checks)
+        layout.addWidget(self.table)
+        layout.addLayout(layout_buttons)
+        self.setLayout(layout)
+
+    def clear(self) -> None:
+        profiler.clear()
+        self.refresh()
+
+    def dialogExportTrace(self) -> QtWidgets.QDialog:
+        dlg = QtWidgets.QFileDialog(
+            self, "Export Trace", "trace.json", "Chrome Trace(*.json);;All files(*)"
+        )
+        dlg.setAcceptMode(QtWidgets.QFileDialog.AcceptSave)
+        dlg.setDefaultSuffix("json")
+        dlg.fileSelected.connect(profiler.saveChromeTrace)
+        dlg.open()
+        return dlg
+
+    def hideEvent(self, event: QtGui.QHideEvent) -> None:
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def showEvent(self, event: QtGui.QShowEvent) -> None:
+        self.check_enabled.setChecked(profiler.enabled)
+        self.refresh()
+        self.timer.start()
+        super().showEvent(event)
+
+    def refresh(self) -> None:
+        summary = profiler.summary()
+        names = sorted(summary, key=lambda k: summary[k]["total"], reverse=True)
+
+        self.table.setRowCount(len(names))
+        for row, name in enumerate(names):
+            stats = summary[name]
+            values = [
+                name,
+                stats["category"],
+                str(stats["count"]),
+                f"{stats['total'] * 1e3:.1f}",
+                f"{stats['mean'] * 1e3:.1f}",
+                f"{stats['max'] * 1e3:.1f}",
+                f"{stats['memory_delta'] / 1024:.0f}"
+                if stats["memory_delta"] > 0
+                else "",
+            ]
+            for column, value in enumerate(values):
+                item = QtWidgets.QTableWidgetItem(value)
+                if column > 1:
+                    item.setTextAlignment(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+                self.table.setItem(row, column, item)
+
+    def updateProfiler(self) -> None:
+        if self.check_enabled.isChecked():
+            profiler.enable(trace_memory=self.check_memory.isChecked())
+        else:
+            profiler.disable()
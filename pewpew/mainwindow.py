@@ -1,25 +1,17 @@
 import sys
 import logging
+from pathlib import Path
 
 from PySide2 import QtGui, QtWidgets
 
 from pewpew import __version__
 
 from pewpew.actions import qAction, qActionGroup
-from pewpew.log import LoggingDialog
+from pewpew.log import LoggingDialog, PerformanceDialog
 from pewpew.widgets import dialogs
-from pewpew.widgets.exportdialogs import ExportAllDialog
-from pewpew.widgets.laser import LaserWidget, LaserViewSpace
-
-from pewpew.widgets.tools import (
-    ToolWidget,
-    CalculatorTool,
-    DriftTool,
-    FilteringTool,
-    StandardsTool,
-    OverlayTool,
-)
-from pewpew.widgets.wizards import ImportWizard, SpotImportWizard, SRRImportWizard
+from pewpew.widgets.laser import LaserPlaceholder, LaserWidget, LaserViewSpace
+
+# Tools, wizards and export dialogs are imported on first use for faster startup
 
 from types import TracebackType
 
@@ -32,6 +24,7 @@ class MainWindow(QtWidgets.QMainWindow):
         self.resize(1280, 800)
 
         self.log = LoggingDialog()
+        self.performance = PerformanceDialog()
 
         self.viewspace = LaserViewSpace()
         self.viewspace.numTabsChanged.connect(self.updateActionAvailablity)
@@ -128,10 +121,28 @@ class MainWindow(QtWidgets.QMainWindow):
         self.action_log = qAction(
             "clock", "&Show Log", "Show the pew² event and error log.", self.actionLog
         )
+        self.action_performance = qAction(
+            "",
+            "Show &Performance",
+            "Show and record the time taken by drawing, tools and exports.",
+            self.actionPerformance,
+        )
         self.action_open = qAction(
             "document-open", "&Open", "Open new document(s).", self.actionOpen
         )
         self.action_open.setShortcut("Ctrl+O")
+        self.action_open_session = qAction(
+            "document-open",
+            "Open Session",
+            "Restore the views and documents of a saved session.",
+            self.actionOpenSession,
+        )
+        self.action_save_session = qAction(
+            "document-save-as",
+            "Save Session",
+            "Save the views and documents of the workspace.",
+            self.actionSaveSession,
+        )
 
         self.action_toggle_calibrate = qAction(
             "go-top", "Ca&librate", "Toggle calibration.", self.actionToggleCalibrate
@@ -259,11 +270,14 @@ class MainWindow(QtWidgets.QMainWindow):
         return dlg
 
     def actionExportAll(self) -> QtWidgets.QDialog:
+        from pewpew.widgets.exportdialogs import ExportAllDialog
+
+        # Placeholders are exported from their laser, without creating graphics
         widgets = [
-            w
-            for v in self.viewspace.views
-            for w in v.widgets()
-            if isinstance(w, LaserWidget)
+            widget
+            for view in self.viewspace.views
+            for widget in view.widgets()
+            if isinstance(widget, (LaserWidget, LaserPlaceholder))
         ]
         dlg = ExportAllDialog(widgets, self)
         dlg.open()
@@ -291,18 +305,24 @@ class MainWindow(QtWidgets.QMainWindow):
         self.refresh()
 
     def actionWizardImport(self) -> QtWidgets.QWizard:
+        from pewpew.widgets.wizards import ImportWizard
+
         wiz = ImportWizard(config=self.viewspace.config, parent=self)
         wiz.laserImported.connect(self.viewspace.activeView().addLaser)
         wiz.open()
         return wiz
 
     def actionWizardSpot(self) -> QtWidgets.QWizard:
+        from pewpew.widgets.wizards import SpotImportWizard
+
         wiz = SpotImportWizard(config=self.viewspace.config, parent=self)
         wiz.laserImported.connect(self.viewspace.activeView().addLaser)
         wiz.open()
         return wiz
 
     def actionWizardSRR(self) -> QtWidgets.QWizard:
+        from pewpew.widgets.wizards import SRRImportWizard
+
         wiz = SRRImportWizard(config=self.viewspace.config, parent=self)
         wiz.laserImported.connect(self.viewspace.activeView().addLaser)
         wiz.open()
@@ -311,10 +331,32 @@ class MainWindow(QtWidgets.QMainWindow):
     def actionLog(self) -> None:
         self.log.show()
 
+    def actionPerformance(self) -> None:
+        self.performance.show()
+
     def actionOpen(self) -> QtWidgets.QDialog:
         view = self.viewspace.activeView()
         return view.actionOpen()
 
+    def actionOpenSession(self) -> QtWidgets.QDialog:
+        dlg = QtWidgets.QFileDialog(
+            self, "Open Session", "", "Pew Sessions(*.pewsession);;All files(*)"
+        )
+        dlg.setFileMode(QtWidgets.QFileDialog.ExistingFile)
+        dlg.fileSelected.connect(self.openSession)
+        dlg.open()
+        return dlg
+
+    def actionSaveSession(self) -> QtWidgets.QDialog:
+        dlg = QtWidgets.QFileDialog(
+            self, "Save Session", "", "Pew Sessions(*.pewsession);;All files(*)"
+        )
+        dlg.setAcceptMode(QtWidgets.QFileDialog.AcceptSave)
+        dlg.setDefaultSuffix("pewsession")
+        dlg.fileSelected.connect(lambda s: self.viewspace.saveSession(Path(s)))
+        dlg.open()
+        return dlg
+
     def actionToggleCalibrate(self, checked: bool) -> None:
         self.viewspace.options.calibrate = checked
         self.refresh()
@@ -332,7 +374,11 @@ class MainWindow(QtWidgets.QMainWindow):
         self.refresh()
 
     def actionToolCalculator(self) -> None:
+        from pewpew.widgets.tools import ToolWidget, CalculatorTool
+
         widget = self.viewspace.activeWidget()
+        if widget is None:
+            return
         index = widget.index
         if isinstance(widget, ToolWidget):
             widget = widget.widget
@@ -343,7 +389,11 @@ class MainWindow(QtWidgets.QMainWindow):
         tool.setActive()
 
     def actionToolDrift(self) -> None:
+        from pewpew.widgets.tools import ToolWidget, DriftTool
+
         widget = self.viewspace.activeWidget()
+        if widget is None:
+            return
         index = widget.index
         if isinstance(widget, ToolWidget):
             widget = widget.widget
@@ -354,7 +404,11 @@ class MainWindow(QtWidgets.QMainWindow):
         tool.setActive()
 
     def actionToolFilter(self) -> None:
+        from pewpew.widgets.tools import ToolWidget, FilteringTool
+
         widget = self.viewspace.activeWidget()
+        if widget is None:
+            return
         index = widget.index
         if isinstance(widget, ToolWidget):
             widget = widget.widget
@@ -365,7 +419,11 @@ class MainWindow(QtWidgets.QMainWindow):
         tool.setActive()
 
     def actionToolStandards(self) -> None:
+        from pewpew.widgets.tools import ToolWidget, StandardsTool
+
         widget = self.viewspace.activeWidget()
+        if widget is None:
+            return
         index = widget.index
         if isinstance(widget, ToolWidget):
             widget = widget.widget
@@ -376,7 +434,11 @@ class MainWindow(QtWidgets.QMainWindow):
         tool.setActive()
 
     def actionToolOverlay(self) -> None:
+        from pewpew.widgets.tools import ToolWidget, OverlayTool
+
         widget = self.viewspace.activeWidget()
+        if widget is None:
+            return
         index = widget.index
         if isinstance(widget, ToolWidget):
             widget = widget.widget
@@ -422,6 +484,11 @@ class MainWindow(QtWidgets.QMainWindow):
 
         menu_file.addSeparator()
 
+        menu_file.addAction(self.action_open_session)
+        menu_file.addAction(self.action_save_session)
+
+        menu_file.addSeparator()
+
         menu_file.addAction(self.action_export_all)
 
         menu_file.addSeparator()
@@ -473,6 +540,7 @@ class MainWindow(QtWidgets.QMainWindow):
         # Help
         menu_help = self.menuBar().addMenu("&Help")
         menu_help.addAction(self.action_log)
+        menu_help.addAction(self.action_performance)
         menu_help.addAction(self.action_about)
 
     def buttonStatusUnit(self, toggled: bool) -> None:
@@ -481,6 +549,24 @@ class MainWindow(QtWidgets.QMainWindow):
         elif self.button_status_index.isChecked():
             self.viewspace.options.units = "index"
 
+    def openSession(self, path: str) -> None:
+        if not self.viewspace.restoreSession(Path(path)):
+            return
+
+        # Update actions to the restored options
+        options = self.viewspace.options
+        for action in self.action_group_colortable.actions():
+            action.setChecked(action.text() == options.colortable)
+        self.action_smooth.setChecked(options.smoothing)
+        self.action_toggle_calibrate.setChecked(options.calibrate)
+        self.action_toggle_colorbar.setChecked(options.items["colorbar"])
+        self.action_toggle_label.setChecked(options.items["label"])
+        self.action_toggle_scalebar.setChecked(options.items["scalebar"])
+        if options.units == "index":
+            self.button_status_index.setChecked(True)
+        else:
+            self.button_status_um.setChecked(True)
+
     def refresh(self) -> None:
         self.viewspace.refresh()
 
@@ -5,6 +5,7 @@ import numpy as np
 from pewlib.calibration import Calibration
 
 from pewpew.lib.numpyqt import NumpyArrayTableModel
+from pewpew.threads import ExportScheduler
 
 from typing import Any, Tuple
 
@@ -95,3 +96,55 @@ class CalibrationPointsTableModel(NumpyArrayTableModel):
             self.calibration.points = self.array[:, :2]
 
         self.calibration.update_linreg()
+
+
+class ExportJobTableModel(QtCore.QAbstractTableModel):
+    """Read only model of the jobs in an ExportScheduler, one job per row."""
+
+    columns = ["Laser", "Element", "Layer", "File", "Status"]
+
+    def __init__(self, scheduler: ExportScheduler, parent: QtCore.QObject = None):
+        super().__init__(parent)
+        self.scheduler = scheduler
+        self.scheduler.jobChanged.connect(self.jobChanged)
+
+    def columnCount(self, parent: QtCore.QModelIndex = None) -> int:
+        return len(self.columns)
+
+    def rowCount(self, parent: QtCore.QModelIndex = None) -> int:
+        return len(self.scheduler.jobs)
+
+    def data(self, index: QtCore.QModelIndex, role: int = QtCore.Qt.DisplayRole) -> str:
+        if not index.isValid():
+            return None
+
+        job = self.scheduler.jobs[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            values = [
+                job.laser.name,
+                job.isotope or "",
+                "" if job.layer is None else str(job.layer),
+                job.path.name,
+                job.status,
+            ]
+            return values[index.column()]
+        elif role == QtCore.Qt.ToolTipRole:
+            return job.error if job.error != "" else str(job.path)
+        return None
+
+    def flags(self, index: QtCore.QModelIndex) -> QtCore.Qt.ItemFlags:
+        return QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable
+
+    def headerData(
+        self, section: int, orientation: QtCore.Qt.Orientation, role: int
+    ) -> str:
+        if role != QtCore.Qt.DisplayRole:
+            return None
+        if orientation == QtCore.Qt.Horizontal:
+            return self.columns[section]
+        return str(section + 1)
+
+    def jobChanged(self, row: int) -> None:
+        self.dataChanged.emit(
+            self.index(row, 0), self.index(row, self.columnCount() - 1)
+        )
@@ -0,0 +1,26 @@
+"""Qt resources for icons and the application icon.
+
+Resources are registered from a compiled '.rcc' file if one exists next to
+this module, otherwise from the generated Python module. Binary resources
+avoid parsing the large generated modules, they are built from the modules by
+``python scripts/build_rcc.py`` and when building the package.
+"""
+import importlib
+from pathlib import Path
+
+from PySide2 import QtCore
+
+from typing import Set
+
+
+_registered: Set[str] = set()
+
+
+def register(name: str) -> None:
+    """Registers the resource `name`, e.g. 'icons' or 'app_icon', once."""
+    if name in _registered:
+        return
+    path = Path(__file__).with_name(name + ".rcc")
+    if not (path.exists() and QtCore.QResource.registerResource(str(path))):
+        importlib.import_module(f"pewpew.resources.{name}")
+    _registered.add(name)
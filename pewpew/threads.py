@@ -1,28 +1,121 @@
 from PySide2 import QtCore
+from concurrent.futures import Future, ThreadPoolExecutor
+import json
 from pathlib import Path
 import logging
 
+import numpy as np
+from numpy.lib import recfunctions
+
 from pewlib import io
 from pewlib import Config, Laser
+from pewlib.laser import _Laser
+from pewlib.srr import SRRLaser
+
+from pewpew.graphics.offscreen import render_laser
+from pewpew.graphics.options import GraphicsOptions
+from pewpew.lib import store, vti
+from pewpew.lib.columnar import ColumnarData, ColumnarLaser, compact
+from pewpew.lib.numpyqt import array_to_text
+from pewpew.lib.profiler import profile
 
-from typing import List
+from typing import Dict, List, Tuple
 
 
 logger = logging.getLogger(__name__)
 
 
+def import_path(path: Path, config: Config) -> Laser:
+    """Imports a laser from a file or directory.
+
+    Agilent batches, Perkin-Elmer, CSV directories, numpy archives, stores,
+    Thermo iCap CSV and text images are supported.
+
+    Args:
+        path: file or directory
+        config: default spotsize, speed and scantime
+
+    Returns:
+        the imported laser
+    """
+    config = Config(
+        spotsize=config.spotsize,
+        speed=config.speed,
+        scantime=config.scantime,
+    )
+
+    if not path.exists():
+        raise FileNotFoundError(f"{path.name} not found.")
+
+    if path.name == store.meta_name:  # Opened the store metadata
+        path = path.parent
+
+    if path.is_dir():
+        if store.is_valid_directory(path):
+            return store.load(path)
+        if path.suffix.lower() == ".b":
+            data, params = io.agilent.load(path, full=True)
+            config.scantime = params["scantime"]
+        elif io.perkinelmer.is_valid_directory(path):
+            data, params = io.perkinelmer.load(path, full=True)
+            config.spotsize = params["spotsize"]
+            config.speed = params["speed"]
+            config.scantime = params["scantime"]
+        elif io.csv.is_valid_directory(path):
+            data, params = io.csv.load(path, full=True)
+            for key, val in params.items():
+                setattr(config, key, val)
+    else:
+        if path.suffix.lower() == ".npz":
+            laser = io.npz.load(path)
+            if laser.name == "":  # pragma: no cover
+                laser.name = path.stem
+            return laser
+        if path.suffix.lower() == ".csv":
+            sample_format = io.thermo.icap_csv_sample_format(path)
+            if sample_format in ["columns", "rows"]:
+                data, params = io.thermo.load(path, full=True)
+                config.scantime = params["scantime"]
+            else:
+                data = io.textimage.load(path, name="_isotope_")
+        elif path.suffix.lower() in [".txt", ".text"]:
+            data = io.textimage.load(path, name="_isotope_")
+        else:  # pragma: no cover
+            raise ValueError(f"{path.name}: Unknown extention '{path.suffix}'.")
+
+    return Laser(data=data, config=config, name=path.stem, path=path.resolve())
+
+
 class ImportThread(QtCore.QThread):
+    """Imports lasers from `paths` in a separate thread.
+
+    Elements of imported lasers are stored as `storage`, see
+    :func:`pewpew.lib.columnar.compact`. SRR lasers are not converted.
+
+    Args:
+        paths: files or directories
+        config: default spotsize, speed and scantime
+        parent: parent object
+        storage: 'float64' keeps the imported data
+    """
+
     importStarted = QtCore.Signal(str)
     importFinished = QtCore.Signal(object)
     importFailed = QtCore.Signal(str)
     progressChanged = QtCore.Signal(int)
 
     def __init__(
-        self, paths: List[Path], config: Config, parent: QtCore.QObject = None
+        self,
+        paths: List[Path],
+        config: Config,
+        parent: QtCore.QObject = None,
+        *,
+        storage: str = "float64",
     ):
         super().__init__(parent)
         self.paths = paths
         self.config = config
+        self.storage = storage
 
     def run(self) -> None:
         for i, path in enumerate(self.paths):
@@ -40,44 +133,278 @@ class ImportThread(QtCore.QThread):
         self.progressChanged.emit(len(self.paths))
 
     def importPath(self, path: Path) -> Laser:
-        config = Config(
-            spotsize=self.config.spotsize,
-            speed=self.config.speed,
-            scantime=self.config.scantime,
-        )
-
-        if not path.exists():
-            raise FileNotFoundError(f"{path.name} not found.")
-
-        if path.is_dir():
-            if path.suffix.lower() == ".b":
-                data, params = io.agilent.load(path, full=True)
-                config.scantime = params["scantime"]
-            elif io.perkinelmer.is_valid_directory(path):
-                data, params = io.perkinelmer.load(path, full=True)
-                config.spotsize = params["spotsize"]
-                config.speed = params["speed"]
-                config.scantime = params["scantime"]
-            elif io.csv.is_valid_directory(path):
-                data, params = io.csv.load(path, full=True)
-                for key, val in params.items():
-                    setattr(config, key, val)
-        else:
-            if path.suffix.lower() == ".npz":
-                laser = io.npz.load(path)
-                if laser.name == "":  # pragma: no cover
-                    laser.name = path.stem
-                return laser
-            if path.suffix.lower() == ".csv":
-                sample_format = io.thermo.icap_csv_sample_format(path)
-                if sample_format in ["columns", "rows"]:
-                    data, params = io.thermo.load(path, full=True)
-                    config.scantime = params["scantime"]
+        with profile("import", "io", path=path.name):
+            laser = import_path(path, self.config)
+            if self.storage != "float64" and not isinstance(laser, SRRLaser):
+                laser = ColumnarLaser(
+                    compact(laser.data, self.storage),
+                    calibration=laser.calibration,
+                    config=laser.config,
+                    name=laser.name,
+                    path=laser.path,
+                )
+            return laser
+
+
+def laser_snapshot(laser: _Laser, isotope: str = None) -> _Laser:
+    """A copy of `laser` that is unaffected by later edits.
+
+    Data, calibration and config are copied, for exports that run later.
+    Columnar data is copied to a structured array.
+
+    Args:
+        laser: laser to copy
+        isotope: only copy this element
+
+    Returns:
+        :class:`Laser` or :class:`SRRLaser`
+    """
+
+    def copy_data(data: np.ndarray) -> np.ndarray:
+        if isinstance(data, ColumnarData):
+            return (data if isotope is None else data[[isotope]]).to_structured()
+        if isotope is None:
+            return data.copy()
+        return recfunctions.repack_fields(data[[isotope]])
+
+    if isinstance(laser, SRRLaser):
+        data = [copy_data(x) for x in laser.data]
+        laser_type = SRRLaser
+    else:
+        data = copy_data(laser.data)
+        laser_type = Laser
+
+    calibration = laser.calibration
+    if isotope is not None:
+        calibration = {isotope: laser.calibration[isotope]}
+
+    # Calibration and config are copied by the constructor
+    return laser_type(
+        data,
+        calibration=calibration,
+        config=laser.config,
+        name=laser.name,
+        path=laser.path,
+    )
+
+
+class ExportJob(object):
+    """A single export of a laser, the format is taken from the suffix of `path`.
+
+    Jobs run after they are created, possibly on another thread. Pass a
+    :func:`laser_snapshot` and a copy of the options so that later edits
+    are not exported.
+
+    Args:
+        laser: laser to export
+        path: output file
+        isotope: element for '.csv' and '.png' exports
+        layer: layer for '.csv' and '.png' exports
+        calibrate: calibrate the exported data
+        spacing: spacing of '.vti' exports
+        compression: compression of '.vti' exports, see :mod:`pewpew.lib.vti`
+        options: graphics options of '.png' exports
+        size: size of '.png' exports
+        raw: export '.png' without overlays
+    """
+
+    def __init__(
+        self,
+        laser: Laser,
+        path: Path,
+        isotope: str = None,
+        layer: int = None,
+        calibrate: bool = True,
+        spacing: Tuple[float, float, float] = None,
+        compression: str = None,
+        options: GraphicsOptions = None,
+        size: QtCore.QSize = None,
+        raw: bool = False,
+    ):
+        self.laser = laser
+        self.path = path
+        self.isotope = isotope
+        self.layer = layer
+        self.calibrate = calibrate
+        self.spacing = spacing
+        self.compression = compression
+        self.options = options
+        self.size = size
+        self.raw = raw
+
+        self.status = "Queued"
+        self.error = ""
+
+    def run(self) -> None:
+        with profile("export", "io", path=self.path.name):
+            ext = self.path.suffix.lower()
+            if ext == ".csv":
+                data = self.laser.get(
+                    self.isotope, calibrate=self.calibrate, layer=self.layer, flat=True
+                )
+                # Same output as io.textimage.save, formatted in bulk
+                with self.path.open("w") as fp:
+                    fp.write(array_to_text(data, "%.18g", ",") + "\n")
+            elif ext == ".png":
+                image = render_laser(
+                    self.laser,
+                    self.isotope,
+                    self.options,
+                    size=self.size,
+                    layer=self.layer,
+                    raw=self.raw,
+                )
+                if not image.save(str(self.path.absolute())):  # pragma: no cover
+                    raise IOError(f"Unable to save image '{self.path.name}'.")
+            elif ext == ".vti":
+                # Last axis (z) is negative for layer order
+                spacing = self.spacing[0], self.spacing[1], -self.spacing[2]
+                vti.save(
+                    self.path,
+                    self.laser,
+                    spacing,
+                    calibrate=self.calibrate,
+                    compression=self.compression,
+                )
+            elif ext == ".npz":
+                io.npz.save(self.path, self.laser)
+            elif ext == ".pew":
+                store.save(self.path, self.laser)
+            else:
+                raise ValueError(f"Unable to export file as '{ext}'.")
+
+    def toDict(self) -> dict:
+        return {
+            "laser": self.laser.name,
+            "isotope": self.isotope,
+            "layer": self.layer,
+            "path": str(self.path),
+            "status": self.status,
+            "error": self.error,
+        }
+
+
+class ExportScheduler(QtCore.QObject):
+    """Runs export jobs on a pool of worker threads.
+
+    Jobs are submitted in order, with at most `max_queued` waiting or running
+    at once, so that only a few exports hold their data in memory.
+    The state of each job is polled from the GUI thread and `jobChanged`
+    emitted for every update.
+
+    Args:
+        jobs: jobs to run
+        max_workers: number of worker threads, default is the number of cpus
+        max_queued: maximum number of submitted jobs, default is twice `max_workers`
+    """
+
+    jobChanged = QtCore.Signal(int)
+    progressChanged = QtCore.Signal(int)
+    finished = QtCore.Signal()
+
+    def __init__(
+        self,
+        jobs: List[ExportJob],
+        max_workers: int = None,
+        max_queued: int = None,
+        parent: QtCore.QObject = None,
+    ):
+        super().__init__(parent)
+        self.jobs = jobs
+        self.max_workers = max_workers or QtCore.QThread.idealThreadCount()
+        self.max_queued = max_queued or self.max_workers * 2
+
+        self.executor: ThreadPoolExecutor = None
+        self.futures: Dict[int, Future] = {}
+
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(50)
+        self.timer.timeout.connect(self.poll)
+
+    def count(self, status: str = None) -> int:
+        if status is None:
+            return len(self.jobs)
+        return sum(job.status == status for job in self.jobs)
+
+    def completed(self) -> int:
+        return len(self.jobs) - self.count("Queued") - self.count("Running")
+
+    def isRunning(self) -> bool:
+        return self.executor is not None
+
+    def start(self) -> None:
+        if self.isRunning():  # pragma: no cover
+            return
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        self.timer.start()
+        self.poll()
+
+    def cancel(self) -> None:
+        """Cancels all queued jobs, running jobs are allowed to finish."""
+        for i, job in enumerate(self.jobs):
+            if job.status != "Queued":
+                continue
+            if i in self.futures:
+                if not self.futures[i].cancel():  # Already running
+                    continue
+                self.futures.pop(i)
+            job.status = "Canceled"
+            self.jobChanged.emit(i)
+        self.poll()
+
+    def retry(self) -> None:
+        """Requeues and runs failed and canceled jobs."""
+        for i, job in enumerate(self.jobs):
+            if job.status in ["Failed", "Canceled"]:
+                job.status = "Queued"
+                job.error = ""
+                self.jobChanged.emit(i)
+        self.progressChanged.emit(self.completed())
+        self.start()
+
+    def poll(self) -> None:
+        if self.executor is None:
+            return
+
+        for i, future in list(self.futures.items()):
+            job = self.jobs[i]
+            if future.done():
+                self.futures.pop(i)
+                if future.exception() is not None:
+                    job.status = "Failed"
+                    job.error = str(future.exception())
+                    logger.error(f"Unable to export {job.path.name}: {job.error}")
                 else:
-                    data = io.textimage.load(path, name="_isotope_")
-            elif path.suffix.lower() in [".txt", ".text"]:
-                data = io.textimage.load(path, name="_isotope_")
-            else:  # pragma: no cover
-                raise ValueError(f"{path.name}: Unknown extention '{path.suffix}'.")
+                    job.status = "Done"
+                    logger.info(f"Exported {job.laser.name} to {job.path.name}.")
+                self.jobChanged.emit(i)
+            elif future.running() and job.status != "Running":
+                job.status = "Running"
+                self.jobChanged.emit(i)
+
+        # Submit more jobs, in order
+        for i, job in enumerate(self.jobs):
+            if len(self.futures) >= self.max_queued:
+                break
+            if job.status == "Queued" and i not in self.futures:
+                self.futures[i] = self.executor.submit(job.run)
+
+        self.progressChanged.emit(self.completed())
+
+        if len(self.futures) == 0:
+            self.timer.stop()
+            self.executor.shutdown(wait=False)
+            self.executor = None
+            self.finished.emit()
 
-        return Laser(data=data, config=config, name=path.stem, path=path.resolve())
+    def writeManifest(self, path: Path) -> None:
+        """Writes the outcome of every job as JSON."""
+        manifest = {
+            "total": self.count(),
+            "done": self.count("Done"),
+            "failed": self.count("Failed"),
+            "canceled": self.count("Canceled"),
+            "jobs": [job.toDict() for job in self.jobs],
+        }
+        with path.open("w") as fp:
+            json.dump(manifest, fp, indent=2)
@@ -12,16 +12,15 @@ from pewlib.srr import SRRConfig
 
 from pewpew.actions import qAction, qToolButton
 from pewpew.lib import kmeans
+from pewpew.lib.profiler import timed
+from pewpew.lib.selection import RunMask, SelectionView
 from pewpew.validators import (
     DecimalValidator,
     DecimalValidatorNoZero,
     PercentOrDecimalValidator,
 )
 
-from pewpew.charts.calibration import CalibrationChart
-from pewpew.charts.colocal import ColocalisationChart
-from pewpew.charts.histogram import HistogramChart
-
+# Charts are imported by their dialogs, QtCharts is slow to import
 from pewpew.graphics.lasergraphicsview import LaserGraphicsView
 
 from pewpew.models import CalibrationPointsTableModel
@@ -31,7 +30,7 @@ from pewpew.widgets.modelviews import BasicTableView
 
 from pewpew.validators import DoubleSignificantFiguresDelegate
 
-from typing import Dict, List, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
 
 
 class ApplyDialog(QtWidgets.QDialog):
@@ -311,6 +310,9 @@ class CalibrationCurveDialog(QtWidgets.QDialog):
     ):
         super().__init__(parent)
         self.setWindowTitle("Calibration Curve")
+
+        from pewpew.charts.calibration import CalibrationChart
+
         self.chart = CalibrationChart(title, parent=self)
 
         layout = QtWidgets.QVBoxLayout()
@@ -442,7 +444,7 @@ class ColocalisationDialog(QtWidgets.QDialog):
     def __init__(
         self,
         data: np.ndarray,
-        mask: np.ndarray = None,
+        mask: Union[np.ndarray, RunMask] = None,
         colors: List[Tuple[float, ...]] = None,
         parent: QtWidgets.QWidget = None,
     ):
@@ -450,12 +452,14 @@ class ColocalisationDialog(QtWidgets.QDialog):
         super().__init__(parent)
         self.setWindowTitle("Colocalisation")
         self.data = data
-        self.mask = mask
+        self.selection = SelectionView(data, mask)
 
         # if colors is None:
         #     colors = [(1.0, 0.0, 0.0), (0.0, 1.0, 0.0)]
         # self.cmap = LinearSegmentedColormap.from_list("colocal_cmap", colors)
 
+        from pewpew.charts.colocal import ColocalisationChart
+
         self.chart = ColocalisationChart()
 
         self.combo_name1 = QtWidgets.QComboBox()
@@ -523,16 +527,11 @@ class ColocalisationDialog(QtWidgets.QDialog):
 
         self.refresh()
 
+    @timed(category="dialog")
     def refresh(self) -> None:
         n1 = self.combo_name1.currentText()
         n2 = self.combo_name2.currentText()
-        x = self.data[n1]
-        y = self.data[n2]
-
-        if self.mask is not None:
-            x, y = x[self.mask], y[self.mask]
-
-        x, y = normalise(x), normalise(y)
+        x, y = normalise(self.selection[n1]), normalise(self.selection[n2])
 
         # Pearson
         r = colocal.pearsonr(x, y)
@@ -540,7 +539,6 @@ class ColocalisationDialog(QtWidgets.QDialog):
         # Li
         icq = colocal.li_icq(x, y)
 
-        x, y = x.ravel(), y.ravel()
         if x.size > 10000:  # pragma: no cover
             n = np.random.choice(x.size, 10000)
             x, y = x[n], y[n]
@@ -568,11 +566,12 @@ class ColocalisationDialog(QtWidgets.QDialog):
         self.chart.xaxis.setTitleText(n1)
         self.chart.yaxis.setTitleText(n2)
 
+    @timed(category="dialog")
     def calculatePearsonsProbablity(self) -> None:
         x = self.data[self.combo_name1.currentText()]
         y = self.data[self.combo_name2.currentText()]
 
-        _r, p = colocal.pearsonr_probablity(x, y, mask=self.mask, n=500)
+        _r, p = colocal.pearsonr_probablity(x, y, mask=self.selection.mask, n=500)
         self.label_p.setText(f"{p:.2f}")
 
         self.button_p.setEnabled(False)
@@ -805,11 +804,13 @@ class SelectionDialog(ApplyDialog):
 
         self.layout_main.addLayout(layout_form)
 
+    @timed(category="dialog")
     def refresh(self) -> None:
         method = self.combo_method.currentText()
         data = self.graphics.data
-        if self.check_limit_threshold.isChecked() and self.graphics.mask is not None:
-            data = data[self.graphics.mask]
+        selection = self.graphics.selection
+        if self.check_limit_threshold.isChecked() and selection is not None:
+            data = data[selection.nonzero()]
 
         # Remove nans
         data = data[~np.isnan(data)]
@@ -859,7 +860,7 @@ class StatsDialog(QtWidgets.QDialog):
     def __init__(
         self,
         data: np.ndarray,
-        mask: np.ndarray,
+        mask: Optional[Union[np.ndarray, RunMask]],
         units: Dict[str, str],
         isotope: str,
         pixel_size: Tuple[float, float] = None,
@@ -869,11 +870,13 @@ class StatsDialog(QtWidgets.QDialog):
         super().__init__(parent)
         self.setWindowTitle("Statistics")
 
-        self.data = self.prepareData(data, mask)
+        self.selection = SelectionView(data, mask)
         self.units = units
         self.pixel_size = pixel_size
         self.colorranges = colorranges
 
+        from pewpew.charts.histogram import HistogramChart
+
         self.chart = HistogramChart()
 
         self.button_clipboard = QtWidgets.QPushButton("Copy to Clipboard")
@@ -886,7 +889,7 @@ class StatsDialog(QtWidgets.QDialog):
         )
 
         self.combo_isotope = QtWidgets.QComboBox()
-        self.combo_isotope.addItems(self.data.dtype.names or [isotope])
+        self.combo_isotope.addItems(self.selection.names)
         self.combo_isotope.setCurrentText(isotope)
         self.combo_isotope.currentIndexChanged.connect(self.updateStats)
         self.combo_isotope.currentTextChanged.connect(self.isotope_changed)
@@ -935,7 +938,7 @@ class StatsDialog(QtWidgets.QDialog):
             "<table>"
         )
         text = ""
-        size = self.data[~np.isnan(self.data[self.data.dtype.names[0]])].size
+        size = np.count_nonzero(~np.isnan(self.selection[self.selection.names[0]]))
         area = size * self.pixel_size[0] * self.pixel_size[1]
 
         data += f"<tr><td>Size</td><td>{size}</td></tr>"
@@ -947,8 +950,8 @@ class StatsDialog(QtWidgets.QDialog):
         "<td>Median</td><td>Std</tr>"
         text += "Name\tUnit\tMin\tMax\tMean\tMedian\tStd\n"
 
-        for name in self.data.dtype.names:
-            nd = self.data[name]
+        for name in self.selection.names:
+            nd = self.selection[name]
             unit = self.units.get(name, "")
             nd = nd[~np.isnan(nd)]
 
@@ -967,15 +970,17 @@ class StatsDialog(QtWidgets.QDialog):
         mime.setText(text)
         QtWidgets.QApplication.clipboard().setMimeData(mime)
 
+    @timed(category="dialog")
     def updateStats(self) -> None:
         isotope = self.combo_isotope.currentText()
-        data = self.data[isotope]
+        data = self.selection[isotope]
         unit = self.units.get(isotope, "")
 
-        self.label_shape.setText(str(data.shape))
-        self.label_size.setText(str(data.size))
-        # Discard nans and shape
-        data = data[~np.isnan(data)].ravel()
+        shape = self.selection.shape
+        self.label_shape.setText(str(shape))
+        self.label_size.setText(str(shape[0] * shape[1]))
+        # Discard nans
+        data = data[~np.isnan(data)]
         if self.pixel_size is not None:
             area = data.size * self.pixel_size[0] * self.pixel_size[1]
             if area > 1e11:
@@ -999,16 +1004,3 @@ class StatsDialog(QtWidgets.QDialog):
 
     def isCalibrate(self) -> bool:
         return False  # pragma: no cover
-
-    def prepareData(self, structured: np.ndarray, mask: np.ndarray) -> np.ndarray:
-        ix, iy = np.nonzero(mask)
-        x0, x1, y0, y1 = np.min(ix), np.max(ix) + 1, np.min(iy), np.max(iy) + 1
-
-        data = np.empty((x1 - x0, y1 - y0), dtype=structured.dtype)
-        for name in structured.dtype.names:
-            data[name] = np.where(
-                mask[x0:x1, y0:y1],
-                structured[name][x0:x1, y0:y1],
-                np.nan,
-            )
-        return data
@@ -3,13 +3,18 @@ import logging
 
 from PySide2 import QtCore, QtGui, QtWidgets
 
-from pewlib import io
 from pewlib.laser import Laser
 
+from pewpew.graphics.options import GraphicsOptions
+from pewpew.lib import filenames, vti
+from pewpew.models import ExportJobTableModel
+from pewpew.threads import ExportJob, ExportScheduler, laser_snapshot
+
+from pewpew.widgets.laser import LaserWidget
 from pewpew.widgets.prompts import OverwriteFilePrompt
 from pewpew.widgets.views import _ViewWidget
 
-from typing import List, Set, Tuple
+from typing import List, Optional, Set, Tuple
 
 
 logger = logging.getLogger(__name__)
@@ -58,17 +63,37 @@ class VtiOptionsBox(OptionsBox):
         self.lineedits[0].setEnabled(False)  # X
         self.lineedits[1].setEnabled(False)  # Y
 
-        layout = QtWidgets.QHBoxLayout()
-        layout.addWidget(QtWidgets.QLabel("Spacing:"), 0)
-        layout.addWidget(self.lineedits[0], 0)  # X
-        layout.addWidget(QtWidgets.QLabel("x"), 0, QtCore.Qt.AlignCenter)
-        layout.addWidget(self.lineedits[1], 0)  # Y
-        layout.addWidget(QtWidgets.QLabel("x"), 0, QtCore.Qt.AlignCenter)
-        layout.addWidget(self.lineedits[2], 0)  # Z
-        layout.addStretch(1)
+        self.combo_compression = QtWidgets.QComboBox()
+        self.combo_compression.addItem("None")
+        self.combo_compression.addItems(list(vti.compressors.keys()))
+        self.combo_compression.setToolTip(
+            "Compress the data, reducing file size but increasing export time."
+        )
+
+        layout_spacing = QtWidgets.QHBoxLayout()
+        layout_spacing.addWidget(QtWidgets.QLabel("Spacing:"), 0)
+        layout_spacing.addWidget(self.lineedits[0], 0)  # X
+        layout_spacing.addWidget(QtWidgets.QLabel("x"), 0, QtCore.Qt.AlignCenter)
+        layout_spacing.addWidget(self.lineedits[1], 0)  # Y
+        layout_spacing.addWidget(QtWidgets.QLabel("x"), 0, QtCore.Qt.AlignCenter)
+        layout_spacing.addWidget(self.lineedits[2], 0)  # Z
+        layout_spacing.addStretch(1)
+
+        layout_compression = QtWidgets.QHBoxLayout()
+        layout_compression.addWidget(QtWidgets.QLabel("Compression:"), 0)
+        layout_compression.addWidget(self.combo_compression, 0)
+        layout_compression.addStretch(1)
 
+        layout = QtWidgets.QVBoxLayout()
+        layout.addLayout(layout_spacing)
+        layout.addLayout(layout_compression)
         self.setLayout(layout)
 
+    def compression(self) -> Optional[str]:
+        if self.combo_compression.currentText() == "None":
+            return None
+        return self.combo_compression.currentText()
+
     def isComplete(self) -> bool:
         return all(le.hasAcceptableInput() for le in self.lineedits)
 
@@ -159,8 +184,8 @@ class ExportOptions(QtWidgets.QWidget):
 
 
 class _ExportDialogBase(QtWidgets.QDialog):
-    invalid_chars = '<>:"/\\|?*'
-    invalid_map = str.maketrans(invalid_chars, "_" * len(invalid_chars))
+    invalid_chars = filenames.invalid_chars
+    invalid_map = filenames.invalid_map
 
     def __init__(self, options: List[OptionsBox], parent: QtWidgets.QWidget = None):
         super().__init__(parent)
@@ -270,6 +295,7 @@ class ExportDialog(_ExportDialogBase):
         )
         options = [
             OptionsBox("Numpy Archives", ".npz"),
+            OptionsBox("Pew Stores", ".pew"),
             OptionsBox("CSV Document", ".csv"),
             PngOptionsBox(),
             VtiOptionsBox(spacing),
@@ -312,13 +338,13 @@ class ExportDialog(_ExportDialogBase):
         self.typeChanged(0)
 
     def allowCalibrate(self) -> bool:
-        return self.options.currentExt() != ".npz"
+        return self.options.currentExt() not in [".npz", ".pew"]
 
     def allowExportAll(self) -> bool:
-        return self.options.currentExt() not in [".npz", ".vti"]
+        return self.options.currentExt() not in [".npz", ".pew", ".vti"]
 
     def allowExportLayers(self) -> bool:
-        return self.options.currentExt() not in [".npz", ".png", ".vti"]
+        return self.options.currentExt() not in [".npz", ".pew", ".png", ".vti"]
 
     def isCalibrate(self) -> bool:
         return self.check_calibrate.isChecked() and self.check_calibrate.isEnabled()
@@ -354,16 +380,14 @@ class ExportDialog(_ExportDialogBase):
         )
 
     def getPathForIsotope(self, path: Path, isotope: str) -> Path:
-        return path.with_name(
-            path.stem + "_" + isotope.translate(self.invalid_map) + path.suffix
-        )
+        return filenames.path_for_isotope(path, isotope)
 
     def getPathForLayer(self, path: Path, layer: int) -> Path:
-        return path.with_name(path.stem + "_layer" + str(layer) + path.suffix)
+        return filenames.path_for_layer(path, layer)
 
     def generatePaths(self, laser: Laser) -> List[Tuple[Path, str, int]]:
         paths: List[Tuple[Path, str, int]] = [
-            (self.getPath(), self.widget.combo_isotope.currentText(), None)
+            (self.getPath(), self.widget.current_isotope, None)
         ]
         if self.isExportAll():
             paths = [
@@ -380,52 +404,48 @@ class ExportDialog(_ExportDialogBase):
 
         return [p for p in paths if p[0] != ""]
 
-    def export(self, path: Path, isotope: str, layer: int, widget: _ViewWidget) -> None:
-        option = self.options.currentOption()
+    def imageSize(self) -> QtCore.QSize:
+        """Size of rendered images, that of the current view."""
+        return self.widget.graphics.viewport().size()
 
-        if option.ext == ".csv":
-            kwargs = {"calibrate": self.isCalibrate(), "flat": True}
-            if isotope in widget.laser.isotopes:
-                data = widget.laser.get(isotope, layer=layer, **kwargs)
-                io.textimage.save(path, data)
-
-        elif option.ext == ".png":
-            if isotope in widget.laser.isotopes:
-
-                self.widget.graphics.drawLaser(
-                    self.widget.laser,
-                    isotope,
-                    layer=self.widget.current_layer,
-                )
-                if self.widget.graphics.widget is not None:
-                    self.widet.graphics.widget.imageChanged(
-                        self.widget.graphics.image, self.widget.graphics.data
-                    )
-
-                self.widget.graphics.updateForeground()
-                self.widget.graphics.invalidateScene()
-                if option.raw():
-                    self.widget.graphics.image.image.save(str(path.absolute()))
-                else:
-                    pixmap = QtGui.QPixmap(self.widget.graphics.viewport().size())
-                    painter = QtGui.QPainter(pixmap)
-                    self.widget.graphics.render(painter)
-                    painter.end()
-                    pixmap.save(str(path.absolute()))
+    def isExportable(self, isotope: str, widget: _ViewWidget) -> bool:
+        if self.options.currentExt() in [".csv", ".png"]:
+            return isotope in widget.laser.isotopes
+        return True
 
-        elif option.ext == ".vti":
-            spacing = option.spacing()
-            # Last axis (z) is negative for layer order
-            spacing = spacing[0], spacing[1], -spacing[2]
-            data = widget.laser.get(calibrate=self.isCalibrate())
-            io.vtk.save(path, data, spacing)
+    def createJob(
+        self, path: Path, isotope: str, layer: int, widget: _ViewWidget
+    ) -> ExportJob:
+        """Creates a job from the current options.
 
-        elif option.ext == ".npz":  # npz
-            io.npz.save(path, widget.laser)
+        The job exports a snapshot of the laser and options, edits made while
+        it is queued are not exported. Images are rendered offscreen at the size
+        of the current view. Widgets that have not been drawn, such as
+        :class:`LaserPlaceholder`, export their laser with the view space options.
+        """
+        option = self.options.currentOption()
+        laser = laser_snapshot(
+            widget.laser, isotope if option.ext in [".csv", ".png"] else None
+        )
+        job = ExportJob(laser, path, isotope, layer, self.isCalibrate())
+
+        if option.ext == ".png":
+            if layer is None and isinstance(widget, LaserWidget):
+                job.layer = widget.current_layer
+            job.options = GraphicsOptions()
+            job.options.update_from_dict(widget.viewspace.options.to_dict())
+            job.size = self.imageSize()
+            job.raw = option.raw()
+        elif option.ext == ".vti":
+            job.spacing = option.spacing()
+            job.compression = option.compression()
+        return job
 
-        else:
-            raise ValueError(f"Unable to export file as '{option.ext}'.")
+    def export(self, path: Path, isotope: str, layer: int, widget: _ViewWidget) -> None:
+        if not self.isExportable(isotope, widget):
+            return
 
+        self.createJob(path, isotope, layer, widget).run()
         logger.info(f"Exported {widget.laser.name} to {path.name}.")
 
     def accept(self) -> None:
@@ -444,7 +464,6 @@ class ExportDialog(_ExportDialogBase):
             QtWidgets.QMessageBox.critical(self, "Unable to Export!", str(e))
             return
 
-        self.widget.refresh()
         super().accept()
 
 
@@ -452,7 +471,10 @@ class ExportAllDialog(ExportDialog):
     def __init__(self, widgets: List[_ViewWidget], parent: QtWidgets.QWidget = None):
         unique: Set[str] = set()
         for widget in widgets:
-            unique.update(widget.laser.isotopes)
+            if isinstance(widget, LaserWidget):
+                unique.update(widget.laser.isotopes)
+            else:  # Don't load placeholders
+                unique.update(widget.isotopes)
         isotopes = sorted(unique)
 
         self.combo_isotope = QtWidgets.QComboBox()
@@ -477,6 +499,13 @@ class ExportAllDialog(ExportDialog):
         self.check_export_all.stateChanged.connect(self.showIsotopes)
         self.showIsotopes()
 
+    def imageSize(self) -> QtCore.QSize:
+        """Size of rendered images, that of the first drawn view."""
+        for widget in self.widgets:
+            if isinstance(widget, LaserWidget):
+                return widget.graphics.viewport().size()
+        return self.widget.size()
+
     def showIsotopes(self) -> None:
         self.combo_isotope.setEnabled(self.allowExportAll() and not self.isExportAll())
 
@@ -506,7 +535,7 @@ class ExportAllDialog(ExportDialog):
 
     def generatePaths(self, laser: Laser) -> List[Tuple[Path, str, int]]:
         paths: List[Tuple[Path, str, int]] = [
-            (self.getPath(laser.name), self.widget.combo_isotope.currentText(), None)
+            (self.getPath(laser.name), self.widget.current_isotope, None)
         ]
         if self.isExportAll():
             paths = [
@@ -528,7 +557,11 @@ class ExportAllDialog(ExportDialog):
         prompt = OverwriteFilePrompt()
 
         for widget in self.widgets:
-            paths = self.generatePaths(widget.laser)
+            try:
+                paths = self.generatePaths(widget.laser)
+            except Exception as e:  # Placeholders that cannot be loaded
+                logger.exception(e)
+                paths = []
             all_paths.append(
                 [p for p in paths if prompt.promptOverwrite(str(p[0].resolve()))]
             )
@@ -536,26 +569,110 @@ class ExportAllDialog(ExportDialog):
         if all(len(paths) == 0 for paths in all_paths):
             return
 
-        count = sum([len(p) for p in all_paths])
-        exported = 0
-        dlg = QtWidgets.QProgressDialog("Exporting...", "Abort", 0, count, self)
-        dlg.setWindowTitle("Exporting Data")
-        dlg.open()
+        jobs = [
+            self.createJob(path, isotope, layer, widget)
+            for paths, widget in zip(all_paths, self.widgets)
+            for path, isotope, layer in paths
+            if self.isExportable(isotope, widget)
+        ]
 
-        try:
-            for paths, widget in zip(all_paths, self.widgets):
-                widget.setActive()
-                for path, isotope, layer in paths:
-                    dlg.setValue(exported)
-                    if dlg.wasCanceled():
-                        break
-                    self.export(path, isotope, layer, widget)
-                    exported += 1
-        except Exception as e:  # pragma: no cover
-            logger.exception(e)
-            QtWidgets.QMessageBox.critical(self, "Unable to Export!", str(e))
-            dlg.cancel()
-            return
+        # Progress outlives this dialog
+        self.progress = ExportProgressDialog(
+            ExportScheduler(jobs),
+            manifest=self.getPath("export_manifest").with_suffix(".json"),
+            parent=self.parent(),
+        )
+        self.progress.open()
+        self.progress.scheduler.start()
 
-        dlg.setValue(count)
         QtWidgets.QDialog.accept(self)
+
+
+class ExportProgressDialog(QtWidgets.QDialog):
+    """Shows the progress of an ExportScheduler.
+
+    Queued exports can be canceled and failed or canceled exports retried.
+    A summary of every export is written to `manifest` when finished.
+
+    Args:
+        scheduler: scheduler, started by the caller
+        manifest: path of the JSON manifest, or None
+        parent: parent widget
+    """
+
+    def __init__(
+        self,
+        scheduler: ExportScheduler,
+        manifest: Path = None,
+        parent: QtWidgets.QWidget = None,
+    ):
+        super().__init__(parent)
+        self.setWindowTitle("Exporting Data")
+        self.setMinimumWidth(480)
+
+        self.scheduler = scheduler
+        self.scheduler.setParent(self)
+        self.scheduler.progressChanged.connect(self.updateProgress)
+        self.scheduler.finished.connect(self.exportFinished)
+        self.manifest = manifest
+
+        self.model = ExportJobTableModel(self.scheduler, self)
+        self.table = QtWidgets.QTableView()
+        self.table.setModel(self.model)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+
+        self.label = QtWidgets.QLabel("Exporting...")
+        self.progress = QtWidgets.QProgressBar()
+        self.progress.setRange(0, self.scheduler.count())
+
+        self.button_box = QtWidgets.QDialogButtonBox(
+            QtWidgets.QDialogButtonBox.Abort
+            | QtWidgets.QDialogButtonBox.Retry
+            | QtWidgets.QDialogButtonBox.Close
+        )
+        self.button_box.button(QtWidgets.QDialogButtonBox.Abort).clicked.connect(
+            self.scheduler.cancel
+        )
+        self.button_box.button(QtWidgets.QDialogButtonBox.Retry).clicked.connect(
+            self.retry
+        )
+        self.button_box.rejected.connect(self.reject)
+        self.button_box.button(QtWidgets.QDialogButtonBox.Retry).setEnabled(False)
+
+        layout = QtWidgets.QVBoxLayout()
+        layout.addWidget(self.table, 1)
+        layout.addWidget(self.label)
+        layout.addWidget(self.progress)
+        layout.addWidget(self.button_box)
+        self.setLayout(layout)
+
+    def exportFinished(self) -> None:
+        done = self.scheduler.count("Done")
+        failed = self.scheduler.count("Failed")
+        canceled = self.scheduler.count("Canceled")
+        self.label.setText(f"Exported {done}, failed {failed}, canceled {canceled}.")
+
+        self.button_box.button(QtWidgets.QDialogButtonBox.Abort).setEnabled(False)
+        self.button_box.button(QtWidgets.QDialogButtonBox.Retry).setEnabled(
+            failed + canceled > 0
+        )
+
+        if self.manifest is not None:
+            try:
+                self.scheduler.writeManifest(self.manifest)
+            except OSError as e:  # pragma: no cover
+                logger.exception(e)
+
+    def reject(self) -> None:
+        self.scheduler.cancel()
+        super().reject()
+
+    def retry(self) -> None:
+        self.label.setText("Exporting...")
+        self.button_box.button(QtWidgets.QDialogButtonBox.Abort).setEnabled(True)
+        self.button_box.button(QtWidgets.QDialogButtonBox.Retry).setEnabled(False)
+        self.scheduler.retry()
+
+    def updateProgress(self, value: int) -> None:
+        self.progress.setValue(value)
@@ -3,6 +3,9 @@ from io import BytesIO
 import numpy as np
 from pathlib import Path
 import logging
+import shutil
+import time
+import uuid
 
 from PySide2 import QtCore, QtGui, QtWidgets
 
@@ -18,18 +21,51 @@ from pewpew.events import DragDropRedirectFilter
 from pewpew.graphics.lasergraphicsview import LaserGraphicsView
 from pewpew.graphics.options import GraphicsOptions
 
-from pewpew.threads import ImportThread
+from pewpew.lib import session, store
+from pewpew.lib.columnar import ColumnarLaser
+from pewpew.lib.planecache import PlaneCache
+from pewpew.lib.numpyqt import array_to_mimedata
+from pewpew.lib.selection import SelectionView
 
-from pewpew.widgets import dialogs, exportdialogs
+from pewpew.threads import ImportThread, import_path, laser_snapshot
+
+from pewpew.widgets import dialogs
+from pewpew.widgets.prompts import NonModalMessageBox
 from pewpew.widgets.views import View, ViewSpace, _ViewWidget
 
-from typing import Dict, List, Set, Union
+from typing import Dict, Iterable, List, Optional, Set, Union
 
 
 logger = logging.getLogger(__name__)
 
 
+def _laser_state(laser: Laser) -> dict:
+    """Default tab state of `laser`."""
+    return {
+        "name": laser.name if laser.name != "" else laser.path.stem,
+        "path": str(laser.path.absolute()),
+        "srr": isinstance(laser, SRRLaser),
+        "isotopes": list(laser.isotopes),
+        "isotope": laser.isotopes[0],
+        "layer": 0,
+        "selection": None,
+        "modified": False,
+    }
+
+
+def _cache_laser(laser: Laser, path: Path) -> str:
+    """Saves `laser` to the cache of session `path`, returns the relative path."""
+    data = session.cache_dir(path).joinpath(uuid.uuid4().hex + ".pew")
+    store.save(data, laser)
+    return str(data.relative_to(path.parent))
+
+
 class LaserViewSpace(ViewSpace):
+    # Images of hidden widgets are released above this limit, in bytes
+    image_memory_limit = 512 * 1024 * 1024
+    # Time, in seconds, a widget must be hidden before release
+    release_after = 60.0
+
     def __init__(
         self,
         orientaion: QtCore.Qt.Orientation = QtCore.Qt.Horizontal,
@@ -39,12 +75,19 @@ class LaserViewSpace(ViewSpace):
         self.config = Config()
         self.options = GraphicsOptions()
 
+        self.release_timer = QtCore.QTimer(self)
+        self.release_timer.setInterval(10000)
+        self.release_timer.timeout.connect(self.releaseInactiveImages)
+        self.release_timer.start()
+
     def uniqueIsotopes(self) -> List[str]:
         isotopes: Set[str] = set()
         for view in self.views:
             for widget in view.widgets():
                 if isinstance(widget, LaserWidget):
                     isotopes.update(widget.laser.isotopes)
+                elif isinstance(widget, LaserPlaceholder):
+                    isotopes.update(widget.isotopes)
         return sorted(isotopes)
 
     def createView(self) -> "LaserView":
@@ -54,6 +97,12 @@ class LaserViewSpace(ViewSpace):
         self.numViewsChanged.emit()
         return view
 
+    def activeWidget(self) -> QtWidgets.QWidget:
+        widget = super().activeWidget()
+        if isinstance(widget, LaserPlaceholder):
+            widget = widget.materialise()
+        return widget
+
     def currentIsotope(self) -> str:
         widget = self.activeWidget()
         if widget is None:
@@ -73,6 +122,79 @@ class LaserViewSpace(ViewSpace):
         for view in self.views:
             view.applyConfig(self.config)
 
+    def releaseInactiveImages(self) -> None:
+        """Releases the images of the longest hidden widgets.
+
+        Images are released until the memory used by all images is below
+        `image_memory_limit`, only widgets hidden for `release_after` are released.
+        """
+        widgets = [
+            widget
+            for view in self.views
+            for widget in view.widgets()
+            if isinstance(widget, LaserWidget)
+        ]
+        total = sum(widget.graphics.imageBytes() for widget in widgets)
+
+        now = time.monotonic()
+        inactive = [
+            widget
+            for widget in widgets
+            if widget.hidden_since is not None
+            and now - widget.hidden_since >= self.release_after
+            and widget.graphics.image is not None
+        ]
+        for widget in sorted(inactive, key=lambda w: w.hidden_since):
+            if total <= self.image_memory_limit:
+                break
+            total -= widget.graphics.imageBytes()
+            widget.graphics.releaseImage()
+            widget.planes.clear()
+
+    def restoreSession(self, path: Path) -> bool:
+        """Replaces the views with those of a session.
+
+        Lasers are loaded when their tab is first shown.
+
+        Returns:
+            False if an open widget refused to close
+        """
+        state = session.load(path)
+        if not self.restoreSessionState(state["layout"], path):
+            return False
+        self.config = Config(**state["config"])
+        self.options.update_from_dict(state["options"])
+        return True
+
+    def saveSession(self, path: Path) -> None:
+        """Saves the views, options and tab states to a session.
+
+        Unsaved lasers and those that cannot be reloaded are cached.
+        """
+        state = {
+            "config": {
+                "spotsize": self.config.spotsize,
+                "speed": self.config.speed,
+                "scantime": self.config.scantime,
+            },
+            "options": self.options.to_dict(),
+            "layout": self.sessionState(path),
+        }
+
+        # Remove lasers no longer in the session from the cache
+        cached = [
+            path.parent.joinpath(tab["data"])
+            for tab in session.tab_states(state["layout"])
+            if "data" in tab
+        ]
+        cache = session.cache_dir(path)
+        if cache.exists():
+            for child in cache.iterdir():
+                if child not in cached:
+                    shutil.rmtree(child)
+
+        session.save(path, state)
+
 
 class LaserView(View):
     def __init__(self, viewspace: LaserViewSpace):
@@ -87,11 +209,27 @@ class LaserView(View):
         self.addTab(name, widget)
         return widget
 
+    def addPlaceholder(self, laser: Laser) -> "LaserPlaceholder":
+        """Adds a tab that only creates its LaserWidget when first shown."""
+        widget = LaserPlaceholder(_laser_state(laser), self, laser=laser)
+        self.addTab(widget.state["name"], widget)
+        return widget
+
     def setCurrentIsotope(self, isotope: str) -> None:
         for widget in self.widgets():
-            if isotope in widget.laser.isotopes:
+            if isinstance(widget, LaserPlaceholder):
+                isotopes = widget.isotopes
+            else:
+                isotopes = widget.laser.isotopes
+            if isotope in isotopes:
                 widget.current_isotope = isotope
 
+    def restoreSessionState(self, state: dict, path: Path) -> None:
+        for tab in state["tabs"]:
+            if "path" in tab:
+                self.addTab(tab["name"], LaserPlaceholder(tab, self, path=path))
+        super().restoreSessionState(state, path)
+
     # Events
     def contextMenuEvent(self, event: QtGui.QContextMenuEvent) -> None:
         menu = QtWidgets.QMenu(self)
@@ -128,7 +266,7 @@ class LaserView(View):
         thread.importStarted.connect(progress.setLabelText)
         thread.progressChanged.connect(progress.setValue)
 
-        thread.importFinished.connect(self.addLaser)
+        thread.importFinished.connect(self.addPlaceholder)
         thread.importFailed.connect(logger.exception)
         thread.finished.connect(progress.close)
 
@@ -136,12 +274,12 @@ class LaserView(View):
 
     def applyCalibration(self, calibration: Dict[str, Calibration]) -> None:
         for widget in self.widgets():
-            if isinstance(widget, LaserWidget):
+            if isinstance(widget, (LaserWidget, LaserPlaceholder)):
                 widget.applyCalibration(calibration)
 
     def applyConfig(self, config: Config) -> None:
         for widget in self.widgets():
-            if isinstance(widget, LaserWidget):
+            if isinstance(widget, (LaserWidget, LaserPlaceholder)):
                 widget.applyConfig(config)
 
     # Actions
@@ -150,7 +288,8 @@ class LaserView(View):
             self,
             "Open File(s).",
             "",
-            "CSV Documents(*.csv *.txt *.text);;Numpy Archives(*.npz);;All files(*)",
+            "CSV Documents(*.csv *.txt *.text);;Numpy Archives(*.npz);;"
+            "Pew Stores(meta.json);;All files(*)",
         )
         dlg.selectNameFilter("All files(*)")
         dlg.setFileMode(QtWidgets.QFileDialog.ExistingFiles)
@@ -184,11 +323,187 @@ class LaserComboBox(QtWidgets.QComboBox):
         menu.popup(event.globalPos())
 
 
+class LaserPlaceholder(_ViewWidget):
+    """Stands in for a LaserWidget until the tab is first shown.
+
+    The placeholder holds no graphics and is replaced by a LaserWidget when
+    first shown. If restored from a session, the laser is loaded when first
+    accessed. Calibrations and configs applied before loading are stored and
+    applied on load.
+
+    Args:
+        state: tab state, see :meth:`LaserWidget.sessionState`
+        view: parent view
+        laser: the laser, if already loaded
+        path: session file, if restored from a session
+    """
+
+    def __init__(
+        self,
+        state: dict,
+        view: LaserView = None,
+        laser: Laser = None,
+        path: Path = None,
+    ):
+        super().__init__(view)
+        self.state = state
+        self.session_path = path
+        self._modified = state.get("modified", False)
+
+        self._laser = laser
+        self.calibrations: Dict[str, Calibration] = {}
+        self.config: Config = None
+
+        # Delay so only the finally visible placeholder is replaced
+        self.materialise_timer = QtCore.QTimer(self)
+        self.materialise_timer.setSingleShot(True)
+        self.materialise_timer.timeout.connect(self.materialise)
+
+    @property
+    def current_isotope(self) -> str:
+        return self.state["isotope"]
+
+    @current_isotope.setter
+    def current_isotope(self, isotope: str) -> None:
+        self.state["isotope"] = isotope
+
+    @property
+    def isotopes(self) -> List[str]:
+        if self._laser is not None:
+            return list(self._laser.isotopes)
+        return self.state["isotopes"]
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._laser is not None
+
+    @property
+    def is_srr(self) -> bool:
+        return self.state.get("srr", False)
+
+    @property
+    def laser(self) -> Laser:
+        if self._laser is None:
+            self._laser = self.loadLaser()
+        return self._laser
+
+    def loadLaser(self) -> Laser:
+        if "data" in self.state:
+            laser = store.load(self.session_path.parent.joinpath(self.state["data"]))
+            laser.path = Path(self.state["path"])
+        else:
+            laser = import_path(Path(self.state["path"]), self.viewspace.config)
+
+        for isotope, calibration in self.calibrations.items():
+            if isotope in laser.calibration:
+                laser.calibration[isotope] = calibration
+        if self.config is not None:
+            laser.config = self.config
+        return laser
+
+    def materialise(self) -> Optional["LaserWidget"]:
+        """Replaces the placeholder with a LaserWidget.
+
+        If the laser cannot be loaded the tab is closed and None returned.
+        """
+        self.materialise_timer.stop()
+        try:
+            laser = self.laser
+        except Exception as e:
+            logger.exception(e)
+            NonModalMessageBox.warning(
+                "Unable to Load",
+                f"Unable to load '{self.state['name']}', closing tab.\n{e}",
+                parent=self.view,
+            )
+            self.view.removeTab(self.index)
+            self.deleteLater()
+            return None
+
+        widget = LaserWidget(laser, self.viewspace.options, self.view)
+        widget.restoreSessionState(self.state)
+
+        # Keep the tab, swap the widget
+        stack = self.view.stack
+        current = stack.currentWidget() == self
+        stack.insertWidget(self.index, widget)
+        if current:
+            stack.setCurrentWidget(widget)
+        stack.removeWidget(self)
+        widget.modified = self.modified
+
+        self.deleteLater()
+        return widget
+
+    def rename(self, text: str) -> None:
+        self.laser.name = text
+        self.state["name"] = text
+        self.modified = True
+
+    def sessionState(self, path: Path) -> dict:
+        state = dict(self.state, modified=self.modified)
+        if self.is_loaded:
+            if self.modified or not session.is_reloadable(self.laser.path):
+                state["data"] = _cache_laser(self.laser, path)
+        elif "data" in state:  # Copy the cached laser if the session has moved
+            data = self.session_path.parent.joinpath(state["data"])
+            cache = session.cache_dir(path)
+            if data.parent.resolve() != cache.resolve():
+                shutil.copytree(data, cache.joinpath(data.name))
+            state["data"] = str(cache.joinpath(data.name).relative_to(path.parent))
+        return state
+
+    # Callbacks
+    def applyCalibration(self, calibrations: Dict[str, Calibration]) -> None:
+        calibrations = {
+            k: copy.copy(v) for k, v in calibrations.items() if k in self.isotopes
+        }
+        if len(calibrations) == 0:
+            return
+        if self.is_loaded:
+            self._laser.calibration.update(calibrations)
+        else:
+            self.calibrations.update(calibrations)
+        self.modified = True
+
+    def applyConfig(self, config: Config) -> None:
+        # Only apply if the type of config is correct
+        if isinstance(config, SRRConfig) == self.state.get("srr", False):
+            if self.is_loaded:
+                self._laser.config = copy.copy(config)
+            else:
+                self.config = copy.copy(config)
+            self.modified = True
+
+    # Events
+    def hideEvent(self, event: QtGui.QHideEvent) -> None:
+        self.materialise_timer.stop()
+        super().hideEvent(event)
+
+    def showEvent(self, event: QtGui.QShowEvent) -> None:
+        self.materialise_timer.start(0)
+        super().showEvent(event)
+
+
 class LaserWidget(_ViewWidget):
+    # Larger selections are offered to be saved to file instead
+    max_clipboard_size = 1000000
+
     def __init__(self, laser: Laser, options: GraphicsOptions, view: LaserView = None):
         super().__init__(view)
-        self.laser = laser
         self.is_srr = isinstance(laser, SRRLaser)
+        if not self.is_srr:
+            laser = ColumnarLaser.from_laser(laser)
+        self.laser = laser
+        # Time the widget was hidden, for releasing images
+        self.hidden_since: float = None
+
+        # Calibrated and flattened planes of drawn elements
+        self.planes = PlaneCache()
+
+        # Elements changed since the last save and their names in the saved file
+        self.modified_elements: Set[str] = set()
+        self.saved_names: Dict[str, str] = {name: name for name in laser.isotopes}
 
         self.graphics = LaserGraphicsView(options, parent=self)
         self.graphics.cursorValueChanged.connect(self.updateCursorStatus)
@@ -198,7 +513,7 @@ class LaserWidget(_ViewWidget):
         self.combo_layers = QtWidgets.QComboBox()
         self.combo_layers.addItem("*")
         self.combo_layers.addItems([str(i) for i in range(0, self.laser.layers)])
-        self.combo_layers.currentIndexChanged.connect(self.refresh)
+        self.combo_layers.currentIndexChanged.connect(self.requestRefresh)
         if not self.is_srr:
             self.combo_layers.setEnabled(False)
             self.combo_layers.setVisible(False)
@@ -206,7 +521,7 @@ class LaserWidget(_ViewWidget):
         self.combo_isotope = LaserComboBox()
         self.combo_isotope.namesSelected.connect(self.updateNames)
         self.combo_isotope.setSizeAdjustPolicy(QtWidgets.QComboBox.AdjustToContents)
-        self.combo_isotope.currentIndexChanged.connect(self.refresh)
+        self.combo_isotope.currentIndexChanged.connect(self.requestRefresh)
         self.populateIsotopes()
 
         self.action_calibration = qAction(
@@ -306,6 +621,13 @@ class LaserWidget(_ViewWidget):
             "Copy the current selection to the clipboard as a column of text values.",
             self.actionCopySelectionText,
         )
+        self.action_select_save = qAction(
+            "document-save-as",
+            "Save Selection",
+            "Save the current selection to a CSV or numpy file, cropped to its "
+            "bounds with unselected pixels as NaN.",
+            self.actionSaveSelection,
+        )
         self.action_select_crop = qAction(
             "transform-crop",
             "Crop to Selection",
@@ -386,8 +708,21 @@ class LaserWidget(_ViewWidget):
 
     # Virtual
     def refresh(self) -> None:
+        if self.is_srr:  # Reconstruct all elements in parallel
+            names = [self.current_isotope] + [
+                name for name in self.laser.isotopes if name != self.current_isotope
+            ]
+            self.planes.prefetch(
+                self.laser,
+                names,
+                self.graphics.options.calibrate,
+                layer=self.current_layer,
+            )
         self.graphics.drawLaser(
-            self.laser, self.current_isotope, layer=self.current_layer
+            self.laser,
+            self.current_isotope,
+            layer=self.current_layer,
+            planes=self.planes,
         )
         if self.graphics.widget is not None:
             self.graphics.widget.imageChanged(self.graphics.image, self.graphics.data)
@@ -398,6 +733,35 @@ class LaserWidget(_ViewWidget):
         self.laser.name = text
         self.modified = True
 
+    def sessionState(self, path: Path) -> dict:
+        """State of the tab for session `path`.
+
+        Modified lasers, or those that cannot be reloaded, are cached.
+        """
+        state = _laser_state(self.laser)
+        state.update(
+            {
+                "isotope": self.current_isotope,
+                "layer": self.combo_layers.currentIndex(),
+                "selection": session.mask_to_dict(self.graphics.selection),
+                "modified": self.modified,
+            }
+        )
+        if self.modified or not session.is_reloadable(self.laser.path):
+            state["data"] = _cache_laser(self.laser, path)
+        return state
+
+    def restoreSessionState(self, state: dict) -> None:
+        if state.get("isotope") in self.laser.isotopes:
+            self.current_isotope = state["isotope"]
+        self.combo_layers.setCurrentIndex(state.get("layer", 0))
+
+        mask = session.mask_from_dict(state.get("selection"))
+        if mask is not None:
+            self.refresh()
+            if mask.shape == self.graphics.data.shape:
+                self.graphics.drawSelectionImage(mask, [])
+
     # Other
     def labelEditDialog(self, name: str) -> QtWidgets.QInputDialog:
         dlg = QtWidgets.QInputDialog(self)
@@ -412,12 +776,30 @@ class LaserWidget(_ViewWidget):
         return dlg
 
     def renameIsotope(self, old: str, new: str) -> None:
-        self.laser.rename({old: new})
+        self.renameElements({old: new})
         self.modified = True
         self.populateIsotopes()
         self.current_isotope = new
         self.refresh()
 
+    def renameElements(self, rename: Dict[str, str]) -> None:
+        self.laser.rename(rename)
+        self.planes.rename(rename)
+        self.saved_names = {rename.get(k, k): v for k, v in self.saved_names.items()}
+        self.modified_elements = {rename.get(k, k) for k in self.modified_elements}
+
+    def setElementsModified(self, names: Iterable[str] = None) -> None:
+        """Marks elements as changed since the last save, default is all.
+
+        Drawn planes of the elements are invalidated and the widget is refreshed
+        when next shown.
+        """
+        if names is None:
+            names = self.laser.isotopes
+        self.planes.invalidate(names)
+        self.refresh_pending = True
+        self.modified_elements.update(names)
+
     def laserFilePath(self, ext: str = ".npz") -> Path:
         return self.laser.path.parent.joinpath(self.laser.name + ext)
 
@@ -450,7 +832,7 @@ class LaserWidget(_ViewWidget):
 
     def updateNames(self, rename: dict) -> None:
         current = self.current_isotope
-        self.laser.rename(rename)
+        self.renameElements(rename)
         self.populateIsotopes()
         current = rename[current]
         self.current_isotope = current
@@ -465,18 +847,10 @@ class LaserWidget(_ViewWidget):
             )
             return
 
-        mask = self.graphics.mask
-        if mask is None or np.all(mask == 0):  # pragma: no cover
+        selection = self.graphics.selection
+        if selection is None or selection.count == 0:  # pragma: no cover
             return
-        ix, iy = np.nonzero(mask)
-        x0, x1, y0, y1 = np.min(ix), np.max(ix) + 1, np.min(iy), np.max(iy) + 1
-
-        data = self.laser.data
-        new_data = np.empty((x1 - x0, y1 - y0), dtype=data.dtype)
-        for name in new_data.dtype.names:
-            new_data[name] = np.where(
-                mask[x0:x1, y0:y1], data[name][x0:x1, y0:y1], np.nan
-            )
+        new_data = SelectionView(self.laser.data, selection).crop()
 
         path = self.laser.path
         new_widget = self.view.addLaser(
@@ -498,10 +872,11 @@ class LaserWidget(_ViewWidget):
             return
         if flip is not None:
             axis = 1 if flip == "horizontal" else 0
-            self.laser.data = np.flip(self.laser.data, axis=axis)
+            self.laser.data = self.laser.data.flip(axis=axis).copy()
         if rotate is not None:
             k = 1 if rotate == "right" else 3 if rotate == "left" else 2
-            self.laser.data = np.rot90(self.laser.data, k=k, axes=(1, 0))
+            self.laser.data = self.laser.data.rot90(k=k, axes=(1, 0)).copy()
+        self.setElementsModified()
         self.modified = True
         self.refresh()
 
@@ -511,26 +886,59 @@ class LaserWidget(_ViewWidget):
         for isotope in calibrations:
             if isotope in self.laser.calibration:
                 self.laser.calibration[isotope] = copy.copy(calibrations[isotope])
+                self.planes.invalidate([isotope])
                 modified = True
         if modified:
             self.modified = True
-            self.refresh()
+            self.requestRefresh()
 
     def applyConfig(self, config: Config) -> None:
         # Only apply if the type of config is correct
         if isinstance(config, SRRConfig) == self.is_srr:
             self.laser.config = copy.copy(config)
+            self.planes.clear()
             self.modified = True
-            self.refresh()
+            self.requestRefresh()
 
     def saveDocument(self, path: Union[str, Path]) -> None:
         if isinstance(path, str):
             path = Path(path)
 
-        io.npz.save(path, self.laser)
+        if path.suffix.lower() == ".pew" and path == self.laser.path:
+            # Only write changes to the current store
+            modified = self.modified_elements.union(
+                set(self.laser.isotopes).difference(self.saved_names)
+            )
+            renamed = {v: k for k, v in self.saved_names.items() if k != v}
+            store.save(path, self.laser, modified=modified, renamed=renamed)
+        elif path.suffix.lower() == ".pew":
+            store.save(path, self.laser)
+        else:
+            io.npz.save(path, laser_snapshot(self.laser))
         self.laser.path = path
+        self.modified_elements.clear()
+        self.saved_names = {name: name for name in self.laser.isotopes}
         self.modified = False
 
+    def selectionData(self) -> np.ndarray:
+        """The displayed data cropped to the selection.
+
+        Unselected pixels are NaN, if there is no selection all data is returned.
+        """
+        data = np.ascontiguousarray(self.graphics.data)
+        view = data.view([(self.current_isotope, data.dtype)])
+        return SelectionView(view, self.graphics.selection).crop()[self.current_isotope]
+
+    def saveSelection(self, path: Union[str, Path]) -> None:
+        if isinstance(path, str):
+            path = Path(path)
+
+        data = self.selectionData()
+        if path.suffix.lower() == ".npy":
+            np.save(path, data)
+        else:
+            np.savetxt(path, data, fmt="%.10g")
+
     def actionCalibration(self) -> QtWidgets.QDialog:
         dlg = dialogs.CalibrationDialog(
             self.laser.calibration, self.current_isotope, parent=self
@@ -551,22 +959,23 @@ class LaserWidget(_ViewWidget):
         self.graphics.copyToClipboard()
 
     def actionCopySelectionText(self) -> None:
-        data = self.graphics.data[self.graphics.mask].ravel()
+        selection = self.graphics.selection
+        if selection is None:
+            data = self.graphics.data.ravel()
+        else:
+            data = self.graphics.data[selection.nonzero()]
 
-        html = (
-            '<meta http-equiv="content-type" content="text/html; charset=utf-8"/>'
-            "<table>"
-        )
-        text = ""
-        for x in data:
-            html += f"<tr><td>{x:.10g}</td></tr>"
-            text += f"{x:.10g}\n"
-        html += "</table>"
+        if data.size > self.max_clipboard_size:  # pragma: no cover
+            button = QtWidgets.QMessageBox.question(
+                self,
+                "Copy Selection",
+                f"The selection contains {data.size} values, save to file instead?",
+            )
+            if button == QtWidgets.QMessageBox.Yes:
+                self.actionSaveSelection()
+                return
 
-        mime = QtCore.QMimeData()
-        mime.setHtml(html)
-        mime.setText(text)
-        QtWidgets.QApplication.clipboard().setMimeData(mime)
+        QtWidgets.QApplication.clipboard().setMimeData(array_to_mimedata(data))
 
     def actionCropSelection(self) -> None:
         self.cropToSelection()
@@ -575,25 +984,43 @@ class LaserWidget(_ViewWidget):
         self.view.addLaser(copy.deepcopy(self.laser))
 
     def actionExport(self) -> QtWidgets.QDialog:
-        dlg = exportdialogs.ExportDialog(self, parent=self)
+        from pewpew.widgets.exportdialogs import ExportDialog
+
+        dlg = ExportDialog(self, parent=self)
         dlg.open()
         return dlg
 
     def actionSave(self) -> QtWidgets.QDialog:
         path = self.laser.path
-        if path.suffix.lower() == ".npz" and path.exists():
+        if path.suffix.lower() in [".npz", ".pew"] and path.exists():
             self.saveDocument(path)
             return None
         else:
             path = self.laserFilePath()
         dlg = QtWidgets.QFileDialog(
-            self, "Save File", str(path.resolve()), "Numpy archive(*.npz);;All files(*)"
+            self,
+            "Save File",
+            str(path.resolve()),
+            "Numpy archive(*.npz);;Pew store(*.pew);;All files(*)",
         )
         dlg.setAcceptMode(QtWidgets.QFileDialog.AcceptSave)
         dlg.fileSelected.connect(self.saveDocument)
         dlg.open()
         return dlg
 
+    def actionSaveSelection(self) -> QtWidgets.QDialog:
+        path = self.laserFilePath(f"_{self.current_isotope}_selection.csv")
+        dlg = QtWidgets.QFileDialog(
+            self,
+            "Save Selection",
+            str(path.resolve()),
+            "CSV Documents(*.csv);;Numpy Arrays(*.npy);;All files(*)",
+        )
+        dlg.setAcceptMode(QtWidgets.QFileDialog.AcceptSave)
+        dlg.fileSelected.connect(self.saveSelection)
+        dlg.open()
+        return dlg
+
     def actionSelectDialog(self) -> QtWidgets.QDialog:
         dlg = dialogs.SelectionDialog(self.graphics, parent=self)
         dlg.maskSelected.connect(self.graphics.drawSelectionImage)
@@ -602,14 +1029,15 @@ class LaserWidget(_ViewWidget):
         return dlg
 
     def actionStatistics(self, crop_to_selection: bool = False) -> QtWidgets.QDialog:
-        data = self.laser.get(calibrate=self.viewspace.options.calibrate, flat=True)
-        if crop_to_selection:
-            mask = self.graphics.mask
+        calibrate = self.viewspace.options.calibrate
+        if self.is_srr:
+            data = self.planes.structured(self.laser, calibrate)
         else:
-            mask = np.ones(data.shape, dtype=np.bool)
+            data = self.laser.get(calibrate=calibrate, flat=True)
+        mask = self.graphics.selection if crop_to_selection else None
 
         units = {}
-        if self.viewspace.options.calibrate:
+        if calibrate:
             units = {k: v.unit for k, v in self.laser.calibration.items()}
 
         dlg = dialogs.StatsDialog(
@@ -631,8 +1059,11 @@ class LaserWidget(_ViewWidget):
         return self.actionStatistics(True)
 
     def actionColocal(self, crop_to_selection: bool = False) -> QtWidgets.QDialog:
-        data = self.laser.get(flat=True)
-        mask = self.graphics.mask if crop_to_selection else None
+        if self.is_srr:
+            data = self.planes.structured(self.laser, False)
+        else:
+            data = self.laser.get(flat=True)
+        mask = self.graphics.selection if crop_to_selection else None
 
         dlg = dialogs.ColocalisationDialog(data, mask, parent=self)
         dlg.open()
@@ -650,6 +1081,7 @@ class LaserWidget(_ViewWidget):
 
         if self.graphics.posInSelection(event.pos()):
             menu.addAction(self.action_select_copy_text)
+            menu.addAction(self.action_select_save)
             menu.addAction(self.action_select_crop)
             menu.addSeparator()
             menu.addAction(self.action_select_statistics)
@@ -687,6 +1119,13 @@ class LaserWidget(_ViewWidget):
                 self.applyCalibration(calibrations)
         super().keyPressEvent(event)
 
+    def hideEvent(self, event: QtGui.QHideEvent) -> None:
+        self.hidden_since = time.monotonic()
+        super().hideEvent(event)
+
     def showEvent(self, event: QtGui.QShowEvent) -> None:
-        self.refresh()
+        self.hidden_since = None
+        # Only redraw if changed while hidden or the image was released
+        if self.refresh_pending or self.graphics.image is None:
+            self.refresh()
         super().showEvent(event)
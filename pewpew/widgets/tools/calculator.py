@@ -2,12 +2,9 @@ import numpy as np
 
 from PySide2 import QtCore, QtWidgets
 
-from pewlib.process.calc import normalise
-from pewlib.process.threshold import otsu
-
-from pewpew.lib import kmeans
+from pewpew.lib import calculator
 from pewpew.lib.pratt import Parser, ParserException, Reducer, ReducerException
-from pewpew.lib.pratt import BinaryFunction, UnaryFunction, TernaryFunction
+from pewpew.lib.profiler import timed
 
 # from pewpew.widgets.graphicses import LaserImagegraphics
 from pewpew.graphics.lasergraphicsview import LaserGraphicsView
@@ -68,52 +65,8 @@ class CalculatorFormula(ValidColorTextEdit):
 
 
 class CalculatorTool(ToolWidget):
-    parser_functions = {
-        "abs": (UnaryFunction("abs"), "(<x>)", "The absolute value of <x>."),
-        "kmeans": (
-            BinaryFunction("kmeans"),
-            "(<x>, <k>)",
-            "Returns lower bounds of 1 to <k> kmeans clusters.",
-        ),
-        "mean": (UnaryFunction("mean"), "(<x>)", "Returns the mean of <x>."),
-        "median": (
-            UnaryFunction("median"),
-            "(<x>)",
-            "Returns the median of <x>.",
-        ),
-        "nantonum": (UnaryFunction("nantonum"), "(<x>)", "Sets nan values to 0."),
-        "normalise": (
-            TernaryFunction("normalise"),
-            "(<x>, <min>, <max>)",
-            "Normalise <x> from from <min> to <max>.",
-        ),
-        "otsu": (
-            UnaryFunction("otsu"),
-            "(<x>)",
-            "Returns Otsu's threshold for <x>.",
-        ),
-        "percentile": (
-            BinaryFunction("percentile"),
-            "(<x>, <percent>)",
-            "Returns the <percent> percentile of <x>.",
-        ),
-        "threshold": (
-            BinaryFunction("threshold"),
-            "(<x>, <value>)",
-            "Sets <x> below <value> to NaN.",
-        ),
-    }
-    reducer_functions = {
-        "abs": (np.abs, 1),
-        "kmeans": (kmeans.thresholds, 2),
-        "mean": (np.nanmean, 1),
-        "median": (np.nanmedian, 1),
-        "nantonum": (np.nan_to_num, 1),
-        "normalise": (normalise, 3),
-        "otsu": (otsu, 1),
-        "percentile": (np.nanpercentile, 2),
-        "threshold": (lambda x, a: np.where(x > a, x, np.nan), 2),
-    }
+    parser_functions = calculator.parser_functions
+    reducer_functions = calculator.reducer_functions
 
     def __init__(self, widget: LaserWidget):
         super().__init__(widget, graphics_label="Preview")
@@ -181,6 +134,7 @@ class CalculatorTool(ToolWidget):
             self.widget.laser.data[name] = data
         else:
             self.widget.laser.add(self.lineedit_name.text(), data)
+        self.widget.setElementsModified([name])
         # Make sure to repop isotopes
         self.widget.populateIsotopes()
 
@@ -242,6 +196,7 @@ class CalculatorTool(ToolWidget):
             self.output.setText(str(e))
             return None
 
+    @timed(category="tool")
     def refresh(self) -> None:
         if not self.isComplete():  # Not ready for update to preview
             return
@@ -6,7 +6,9 @@ from PySide2.QtCharts import QtCharts
 from pewpew.charts.base import BaseChart
 from pewpew.charts.colors import light_theme, sequential
 
+from pewpew.lib.drift import fit_drift
 from pewpew.lib.numpyqt import array_to_polygonf
+from pewpew.lib.profiler import timed
 
 from pewpew.graphics.items import ResizeableRectItem
 from pewpew.graphics.options import GraphicsOptions
@@ -223,7 +225,7 @@ class DriftGraphicsView(LaserGraphicsView):
         x1, y1 = max(p1.x(), 0), max(p1.y(), 0)
         x2, y2 = min(p2.x(), self.data.shape[1]), min(p2.y(), self.data.shape[0])
 
-        drift = self.data[:, x1:x2].copy()
+        drift = self.data[:, x1:x2].astype(np.float64)
 
         if self.guide.trim_enabled:
             drift[y1:y2] = np.nan
@@ -310,8 +312,10 @@ class DriftTool(ToolWidget):
             names = [self.combo_isotope.currentText()]
 
         for name in names:
-            transpose = self.widget.laser.data[name].T
-            transpose /= self.drift / value
+            # Assigned, not divided in place, so that integer data is promoted
+            data = self.widget.laser.data[name]
+            self.widget.laser.data[name] = (data.T / (self.drift / value)).T
+        self.widget.setElementsModified(names)
 
         self.refresh()
 
@@ -326,24 +330,13 @@ class DriftTool(ToolWidget):
         return self.drift is not None
 
     def updateDrift(self) -> None:
-        ys = self.graphics.driftData()
-        ys = np.nanmean(ys, axis=1)
-
-        xs = np.arange(ys.size)
-
         data = self.graphics.driftData()
         ys = np.nanmean(data, axis=1)
         xs = np.arange(ys.size)
-        nans = np.isnan(ys)
 
         self.chart.drawDrift(xs, ys)
 
-        deg = self.spinbox_degree.value()
-        if deg == 0:
-            self.drift = ys
-        else:
-            coef = np.polynomial.polynomial.polyfit(xs[~nans], ys[~nans], deg)
-            self.drift = np.polynomial.polynomial.polyval(xs, coef)
+        self.drift = fit_drift(ys, self.spinbox_degree.value())
         self.chart.drawFit(xs, self.drift)
 
     def updateNormalise(self) -> None:
@@ -353,6 +346,7 @@ class DriftTool(ToolWidget):
             value = np.amin(self.drift)
         self.lineedit_normalise.setText(f"{value:.8g}")
 
+    @timed(category="tool")
     def refresh(self) -> None:
         isotope = self.combo_isotope.currentText()
 
@@ -2,9 +2,9 @@ import numpy as np
 
 from PySide2 import QtCore, QtWidgets
 
-from pewlib.process import filters
-
 from pewpew.graphics.lasergraphicsview import LaserGraphicsView
+from pewpew.lib import filters
+from pewpew.lib.profiler import timed
 from pewpew.widgets.ext import ValidColorLineEdit
 from pewpew.widgets.laser import LaserWidget
 from pewpew.widgets.tools import ToolWidget
@@ -14,63 +14,8 @@ from pewpew.validators import ConditionalLimitValidator
 from typing import Callable, List, Tuple
 
 
-# Filters
-def rolling_mean(x: np.ndarray, size: int, threshold: float) -> np.ndarray:
-    size = int(size)
-    return filters.rolling_mean(x, (size, size), threshold)
-
-
-def rolling_median(x: np.ndarray, size: int, threshold: float) -> np.ndarray:
-    size = int(size)
-    return filters.rolling_median(x, (size, size), threshold)
-
-
-# def simple_highpass(x: np.ndarray, limit: float, replace: float) -> np.ndarray:
-#     return np.where(x < limit, replace, x)
-
-
-# def simple_lowpass(x: np.ndarray, limit: float, replace: float) -> np.ndarray:
-#     return np.where(x > limit, replace, x)
-
-
 class FilteringTool(ToolWidget):
-    methods: dict = {
-        "Rolling Mean": {
-            "filter": rolling_mean,
-            "params": [
-                ("size", 5, (2.5, 99), lambda x: (x + 1) % 2 == 0),
-                ("σ", 3.0, (0.0, np.inf), None),
-            ],
-            "desc": ["Window size for local mean.", "Filter if > σ stddevs from mean."],
-        },
-        "Rolling Median": {
-            "filter": rolling_median,
-            "params": [
-                ("size", 5, (2.5, 99), lambda x: (x + 1) % 2 == 0),
-                ("M", 3.0, (0.0, np.inf), None),
-            ],
-            "desc": [
-                "Window size for local median.",
-                "Filter if > M medians from median.",
-            ],
-        },
-        # "Simple High-pass": {
-        #     "filter": simple_highpass,
-        #     "params": [
-        #         ("min", 1e3, (-np.inf, np.inf), None),
-        #         ("replace", 0.0, (-np.inf, np.inf), None),
-        #     ],
-        #     "desc": ["Filter if below this value.", "Value to replace with."],
-        # },
-        # "Simple Low-pass": {
-        #     "filter": simple_lowpass,
-        #     "params": [
-        #         ("max", 1e3, (-np.inf, np.inf), None),
-        #         ("replace", 0.0, (-np.inf, np.inf), None),
-        #     ],
-        #     "desc": ["Filter if above this value.", "Value to replace with."],
-        # },
-    }
+    methods = filters.methods
 
     def __init__(self, widget: LaserWidget):
         super().__init__(widget, graphics_label="Preview")
@@ -116,6 +61,7 @@ class FilteringTool(ToolWidget):
         self.modified = True
         name = self.combo_isotope.currentText()
         self.widget.laser.data[name] = self.graphics.data
+        self.widget.setElementsModified([name])
 
         self.initialise()
 
@@ -166,6 +112,7 @@ class FilteringTool(ToolWidget):
         filter_ = FilteringTool.methods[self.combo_filter.currentText()]["filter"]
         return filter_(data, *self.fparams)
 
+    @timed(category="tool")
     def refresh(self) -> None:
         if not self.isComplete():  # Not ready for update to preview
             return
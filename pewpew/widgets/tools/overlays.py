@@ -3,8 +3,6 @@ from pathlib import Path
 
 from PySide2 import QtCore, QtGui, QtWidgets
 
-from pewlib.process.calc import normalise
-
 from pewpew.actions import qAction, qToolButton
 
 from pewpew.graphics.options import GraphicsOptions
@@ -12,6 +10,9 @@ from pewpew.graphics.imageitems import ScaledImageItem
 from pewpew.graphics.overlaygraphics import OverlayScene, OverlayView
 from pewpew.graphics.overlayitems import MetricScaleBarOverlay
 
+from pewpew.lib.colorize import ColorizeBuffers, colorize_rgb
+from pewpew.lib.profiler import timed
+
 from pewpew.widgets.exportdialogs import _ExportDialogBase, PngOptionsBox
 from pewpew.widgets.ext import RangeSlider
 from pewpew.widgets.laser import LaserWidget
@@ -77,6 +78,7 @@ class RGBOverlayView(OverlayView):
     def __init__(self, options: GraphicsOptions, parent: QtWidgets.QWidget = None):
         self.options = options
         self.data: np.ndarray = None
+        self.buffers = ColorizeBuffers()
 
         self._scene = OverlayScene(0, 0, 640, 480)
         self._scene.setBackgroundBrush(QtGui.QBrush(QtCore.Qt.black))
@@ -242,41 +244,37 @@ class OverlayTool(ToolWidget):
             self.check_normalise.setEnabled(True)
         self.refresh()
 
-    def processRow(self, row: "OverlayItemRow") -> np.ndarray:
+    def processRow(
+        self, row: "OverlayItemRow"
+    ) -> Tuple[np.ndarray, Tuple[float, float], Tuple[int, int, int]]:
+        """The data, range and color of a row."""
         img = self.widget.laser.get(row.label_name.text(), calibrate=True, flat=True)
         vmin, vmax = row.getVmin(img), row.getVmax(img)
-
         r, g, b, _ = row.getColor().getRgb()
-        if self.model_type[self.rows.color_model] == "subtractive":
-            r, g, b = 255 - r, 255 - g, 255 - b
-
-        # Normalise to range
-        img = np.clip(img, vmin, vmax)
-        if vmin != vmax:
-            img = (img - vmin) / (vmax - vmin)
-        # Convert to separate rgb channels
-        img = (img[:, :, None] * np.array([r, g, b])).astype(np.uint8)
-
-        return img
+        return img, (vmin, vmax), (r, g, b)
 
+    @timed(category="tool")
     def refresh(self) -> None:
         rows = [row for row in self.rows if not row.hidden]
-        datas = [self.processRow(row) for row in rows]
-
-        if len(datas) == 0:
-            img = np.zeros((*self.widget.laser.shape[:2], 3), dtype=np.uint32)
-        else:
-            img = np.sum(datas, axis=0).astype(np.uint32)
-
-        if self.model_type[self.rows.color_model] == "subtractive":
-            img = np.full_like(img, 255) - img
-
-        if self.check_normalise.isChecked() and self.check_normalise.isEnabled():
-            img = normalise(img, 0, 255).astype(np.uint32)
-        else:
-            img = np.clip(img, 0, 255)
-
-        img = (255 << 24) + (img[:, :, 0] << 16) + (img[:, :, 1] << 8) + img[:, :, 2]
+        datas, ranges, colors = [], [], []
+        for row in rows:
+            data, vrange, color = self.processRow(row)
+            datas.append(data)
+            ranges.append(vrange)
+            colors.append(color)
+
+        subtractive = self.model_type[self.rows.color_model] == "subtractive"
+        normalise = (
+            self.check_normalise.isChecked() and self.check_normalise.isEnabled()
+        )
+        img = self.graphics.buffers.rgb(
+            datas,
+            ranges,
+            colors,
+            subtractive=subtractive,
+            normalise=normalise,
+            shape=self.widget.laser.shape[:2],
+        )
 
         x0, x1, y0, y1 = self.widget.laser.config.data_extent(img.shape)
         rect = QtCore.QRectF(x0, y0, x1 - x0, y1 - y0)
@@ -562,7 +560,9 @@ class OverlayExportDialog(_ExportDialogBase):
 
         if option.ext == ".png":
             if option.raw():
-                self.widget.graphics.image.image.save(str(path.absolute()))
+                # The image shares the graphics' reused buffers
+                image = self.widget.graphics.image.image.copy()
+                image.save(str(path.absolute()))
             else:
                 self.widget.graphics.saveToFile(str(path.absolute()))
         else:
@@ -573,13 +573,13 @@ class OverlayExportDialog(_ExportDialogBase):
         row = self.widget.rows[rowi]
 
         if option.ext == ".png":
-            img = self.widget.processRow(row).astype(np.uint32)
-
-            if OverlayTool.model_type[self.widget.rows.color_model] == "subtractive":
-                img = np.full_like(img, 255) - img
-
-            img = (
-                (255 << 24) + (img[:, :, 0] << 16) + (img[:, :, 1] << 8) + img[:, :, 2]
+            data, vrange, color = self.widget.processRow(row)
+            img = colorize_rgb(
+                [data],
+                [vrange],
+                [color],
+                subtractive=OverlayTool.model_type[self.widget.rows.color_model]
+                == "subtractive",
             )
 
             x0, x1, y0, y1 = self.widget.widget.laser.config.data_extent(img.shape)
@@ -9,6 +9,8 @@ from pewpew.graphics.lasergraphicsview import LaserGraphicsView
 from pewpew.graphics.items import ResizeableRectItem
 from pewpew.graphics.options import GraphicsOptions
 
+from pewpew.lib.profiler import timed
+
 from pewpew.validators import DoubleSignificantFiguresDelegate
 
 from pewpew.widgets.dialogs import CalibrationCurveDialog
@@ -179,6 +181,7 @@ class StandardsTool(ToolWidget):
     def isComplete(self) -> bool:
         return self.table.isComplete()
 
+    @timed(category="tool")
     def refresh(self) -> None:
         isotope = self.combo_isotope.currentText()
         if isotope not in self.widget.laser.isotopes:  # pragma: no cover
@@ -1,3 +1,5 @@
+from pathlib import Path
+
 from PySide2 import QtCore, QtGui, QtWidgets
 
 from pewpew.widgets.views import _ViewWidget
@@ -127,6 +129,9 @@ class ToolWidget(_ViewWidget):
         self.reject()
         return False
 
+    def sessionState(self, path: Path) -> dict:
+        return self.widget.sessionState(path)
+
     def showEvent(self, event: QtGui.QShowEvent) -> None:
         super().showEvent(event)
         if not self._shown:
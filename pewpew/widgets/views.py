@@ -1,3 +1,5 @@
+from pathlib import Path
+
 from PySide2 import QtCore, QtGui, QtWidgets
 
 from pewpew.actions import qAction, qToolButton
@@ -164,8 +166,66 @@ class ViewSpace(QtWidgets.QSplitter):
             new_size = (sum(new_splitter.sizes()) - new_splitter.handleWidth()) / 2.0
             new_splitter.setSizes([new_size, new_size])
 
+    def sessionState(self, path: Path) -> dict:
+        """The layout of splitters and views, see :mod:`pewpew.lib.session`."""
+
+        def splitter_state(splitter: QtWidgets.QSplitter) -> dict:
+            children = []
+            for i in range(splitter.count()):
+                widget = splitter.widget(i)
+                if isinstance(widget, QtWidgets.QSplitter):
+                    children.append(splitter_state(widget))
+                else:
+                    children.append(widget.sessionState(path))
+            return {
+                "orientation": int(splitter.orientation()),
+                "sizes": splitter.sizes(),
+                "children": children,
+            }
+
+        return splitter_state(self)
+
+    def restoreSessionState(self, state: dict, path: Path) -> bool:
+        """Replaces all views with those in `state`.
+
+        Every open widget is asked to close first, if any refuse then nothing
+        is restored.
+
+        Returns:
+            True if restored
+        """
+        for view in self.views:
+            for widget in view.widgets():
+                if not widget.requestClose():
+                    return False
+
+        for i in reversed(range(self.count())):
+            widget = self.widget(i)
+            widget.setParent(None)
+            widget.deleteLater()
+        self.views.clear()
+        self.active_view = None
+
+        def restore_splitter(splitter: QtWidgets.QSplitter, state: dict) -> None:
+            splitter.setOrientation(QtCore.Qt.Orientation(state["orientation"]))
+            for child in state["children"]:
+                if "children" in child:
+                    new_splitter = QtWidgets.QSplitter()
+                    new_splitter.setChildrenCollapsible(False)
+                    splitter.addWidget(new_splitter)
+                    restore_splitter(new_splitter, child)
+                else:
+                    view = self.createView()
+                    splitter.addWidget(view)
+                    view.restoreSessionState(child, path)
+            splitter.setSizes(state["sizes"])
+
+        restore_splitter(self, state)
+        self.numTabsChanged.emit()
+        return True
+
     def refresh(self, visible: bool = False) -> None:
-        """Resfresh all views"""
+        """Refresh all views, hidden widgets are refreshed when next shown."""
         for view in self.views:
             view.refresh(visible)
 
@@ -261,13 +321,26 @@ class View(QtWidgets.QWidget):
         self.tabs.setTabIcon(index, icon)
 
     def refresh(self, visible: bool = False) -> None:
+        """Refreshes the active widget, or all widgets.
+
+        Hidden widgets are refreshed when next shown.
+        """
         if visible:
             widget = self.activeWidget()
             if widget is not None:
                 widget.refresh()
         else:
             for widget in self.widgets():
-                widget.refresh()
+                widget.requestRefresh()
+
+    def sessionState(self, path: Path) -> dict:
+        return {
+            "current": self.tabs.currentIndex(),
+            "tabs": [widget.sessionState(path) for widget in self.widgets()],
+        }
+
+    def restoreSessionState(self, state: dict, path: Path) -> None:
+        self.tabs.setCurrentIndex(min(state["current"], self.tabs.count() - 1))
 
     def requestClose(self, index: int) -> None:
         if self.stack.widget(index).requestClose():
@@ -457,6 +530,8 @@ class _ViewWidget(QtWidgets.QWidget):
 
         self.editable = editable
         self._modified = False
+        # Refresh on the next show, see requestRefresh
+        self.refresh_pending = False
 
     @property
     def index(self) -> int:
@@ -476,14 +551,28 @@ class _ViewWidget(QtWidgets.QWidget):
         self.view.setTabModified(self.index, modified)
 
     def refresh(self) -> None:  # pragma: no cover
+        self.refresh_pending = False
         self.refreshed.emit()
 
+    def requestRefresh(self) -> None:
+        """Refreshes now if visible, otherwise when next shown.
+
+        Requests made while hidden are coalesced into a single refresh.
+        """
+        if self.isVisible():
+            self.refresh()
+        else:
+            self.refresh_pending = True
+
     def rename(self, text: str) -> None:  # pragma: no cover
         pass
 
     def requestClose(self) -> bool:
         return True
 
+    def sessionState(self, path: Path) -> dict:  # pragma: no cover
+        return {"name": self.name}
+
     def setActive(self) -> None:
         self.view.tabs.setCurrentIndex(self.index)
 
@@ -499,3 +588,8 @@ class _ViewWidget(QtWidgets.QWidget):
         if obj and event.type() == QtCore.QEvent.MouseButtonPress:  # pragma: no cover
             self.view.setActive(True)
         return False
+
+    def showEvent(self, event: QtGui.QShowEvent) -> None:
+        if self.refresh_pending:
+            self.refresh()
+        super().showEvent(event)
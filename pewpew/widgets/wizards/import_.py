@@ -12,6 +12,7 @@ from pewlib import io
 from pewlib.config import Config
 from pewlib.laser import Laser
 
+from pewpew.lib.columnar import ColumnarLaser, compact
 from pewpew.validators import DecimalValidatorNoZero
 from pewpew.widgets.dialogs import NameEditDialog
 from pewpew.widgets.wizards.options import PathAndOptionsPage
@@ -114,7 +115,14 @@ class ImportWizard(QtWidgets.QWizard):
             scantime=float(self.field("scantime")),
             speed=float(self.field("speed")),
         )
-        self.laserImported.emit(Laser(data, config=config, name=path.stem, path=path))
+        storage = ConfigPage.storage_types[self.field("storage")]
+        if storage == "float64":
+            laser = Laser(data, config=config, name=path.stem, path=path)
+        else:
+            laser = ColumnarLaser(
+                compact(data, storage), config=config, name=path.stem, path=path
+            )
+        self.laserImported.emit(laser)
         super().accept()
 
 
@@ -175,6 +183,13 @@ class FormatPage(QtWidgets.QWizardPage):
 
 
 class ConfigPage(QtWidgets.QWizardPage):
+    # Storage of elements, see pewpew.lib.columnar.compact
+    storage_types = {
+        "Float 64-bit": "float64",
+        "Float 32-bit": "float32",
+        "Integer": "integer",
+    }
+
     dataChanged = QtCore.Signal()
 
     def __init__(self, config: Config, parent: QtWidgets.QWidget = None):
@@ -205,6 +220,14 @@ class ConfigPage(QtWidgets.QWizardPage):
         self.lineedit_aspect = QtWidgets.QLineEdit()
         self.lineedit_aspect.setEnabled(False)
 
+        self.combo_storage = QtWidgets.QComboBox()
+        self.combo_storage.addItems(list(self.storage_types.keys()))
+        self.combo_storage.setToolTip(
+            "Type used to store data, 32-bit halves memory use. "
+            "Integer stores counts in the smallest type that holds them exactly, "
+            "other elements are unchanged."
+        )
+
         layout_isotopes = QtWidgets.QHBoxLayout()
         layout_isotopes.addWidget(QtWidgets.QLabel("Isotopes:"), 0, QtCore.Qt.AlignLeft)
         layout_isotopes.addWidget(self.label_isotopes, 1)
@@ -218,15 +241,22 @@ class ConfigPage(QtWidgets.QWizardPage):
         layout_config.addRow("Aspect:", self.lineedit_aspect)
         config_box.setLayout(layout_config)
 
+        layout_storage = QtWidgets.QFormLayout()
+        layout_storage.addRow("Storage:", self.combo_storage)
+
         layout = QtWidgets.QVBoxLayout()
         layout.addLayout(layout_isotopes)
         layout.addWidget(config_box)
+        layout.addLayout(layout_storage)
 
         self.setLayout(layout)
 
         self.registerField("spotsize", self.lineedit_spotsize)
         self.registerField("speed", self.lineedit_speed)
         self.registerField("scantime", self.lineedit_scantime)
+        self.registerField(
+            "storage", self.combo_storage, "currentText", "currentTextChanged"
+        )
 
         self.registerField("laserdata", self, "data_prop")
 
@@ -0,0 +1,88 @@
+"""Builds binary '.rcc' resources from the generated resource modules.
+
+The binary resources are registered by :func:`pewpew.resources.register` without
+importing the large generated modules. Sources for the modules are not part of
+the repository, so the data, names and tree of each module are written in the
+format of ``pyside2-rcc --binary``.
+"""
+import argparse
+import ast
+from pathlib import Path
+import struct
+import sys
+
+from typing import Dict, List
+
+resources_dir = Path(__file__).parent.parent.joinpath("pewpew", "resources")
+resource_names = ["icons", "app_icon"]
+
+RCC_VERSION = 3
+
+
+def read_resource_module(path: Path) -> Dict[str, bytes]:
+    """Reads the 'qt_resource_*' bytes of a generated module, without importing."""
+    tree = ast.parse(path.read_text())
+    values = {}
+    for node in tree.body:
+        if not isinstance(node, ast.Assign) or len(node.targets) != 1:
+            continue
+        target = node.targets[0]
+        if isinstance(target, ast.Name) and target.id.startswith("qt_resource_"):
+            values[target.id[12:]] = ast.literal_eval(node.value)
+    return values
+
+
+def module_to_rcc(path: Path) -> bytes:
+    """Converts a module generated by pyside2-rcc to a binary resource."""
+    values = read_resource_module(path)
+    data, names = values["data"], values["name"]
+    # Older modules contain both tree formats, version 3 uses that of version 2
+    tree = values.get("struct", values.get("struct_v2"))
+
+    header_size = 24
+    data_offset = header_size
+    names_offset = data_offset + len(data)
+    tree_offset = names_offset + len(names)
+    header = b"qres" + struct.pack(
+        ">IIIII", RCC_VERSION, tree_offset, data_offset, names_offset, 0
+    )
+    return header + data + names + tree
+
+
+def build_rcc(
+    names: List[str] = resource_names,
+    source: Path = resources_dir,
+    output: Path = resources_dir,
+) -> List[Path]:
+    """Writes '<name>.rcc' for each '<name>.py' in `source` to `output`."""
+    output.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name in names:
+        path = output.joinpath(name + ".rcc")
+        path.write_bytes(module_to_rcc(source.joinpath(name + ".py")))
+        paths.append(path)
+    return paths
+
+
+def parse_args(argv: List[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="build_rcc", description="Build binary resources for pewpew."
+    )
+    parser.add_argument(
+        "names", nargs="*", default=resource_names, help="Resources to build."
+    )
+    parser.add_argument(
+        "--output", type=Path, default=resources_dir, help="Output directory."
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str]) -> int:
+    args = parse_args(argv)
+    for path in build_rcc(args.names, output=args.output):
+        print(f"Wrote '{path}'.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,5 +1,7 @@
+import importlib.util
 from pathlib import Path
 from setuptools import setup, find_packages, Extension
+from setuptools.command.build_py import build_py
 import numpy
 
 with open("README.md") as fp:
@@ -17,6 +19,28 @@ polyext = Extension(
     include_dirs=[numpy.get_include()],
     define_macros=[("NPY_NO_DEPRECATED_API", "NPY_1_7_API_VERSION")],
 )
+filtersext = Extension(
+    "pewpew.lib.filtersext",
+    sources=["src/filtersextmodule.c"],
+    include_dirs=[numpy.get_include()],
+    define_macros=[("NPY_NO_DEPRECATED_API", "NPY_1_7_API_VERSION")],
+)
+
+
+class BuildPyWithResources(build_py):
+    """Also builds the binary '.rcc' resources into the package."""
+
+    def run(self):
+        super().run()
+        if not self.dry_run:
+            # Loaded from the file, 'scripts' is not a package
+            spec = importlib.util.spec_from_file_location(
+                "build_rcc", Path(__file__).parent.joinpath("scripts", "build_rcc.py")
+            )
+            build_rcc = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(build_rcc)
+            build_rcc.build_rcc(output=Path(self.build_lib, "pewpew", "resources"))
+
 
 setup(
     name="pewpew",
@@ -32,6 +56,7 @@ setup(
         "Source": "https://gtihub.com/djdt/pewpew",
     },
     packages=find_packages(include=["pewpew", "pewpew.*"]),
+    package_data={"pewpew.resources": ["*.rcc"]},
     install_requires=[
         "numpy!=1.19.4",
         "pewlib>=0.6.5",
@@ -39,5 +64,6 @@ setup(
     ],
     entry_points={"console_scripts": ["pewpew=pewpew.__main__:main"]},
     tests_require=["pytest", "pytest-qt"],
-    ext_modules=[polyext],
+    ext_modules=[polyext, filtersext],
+    cmdclass={"build_py": BuildPyWithResources},
 )
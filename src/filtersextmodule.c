@@ -0,0 +1,229 @@
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <numpy/arrayobject.h>
+
+/* Sliding histogram median (Huang, 1979) of uint32 levels.
+ *
+ * The histogram is a tree of counts with 256 bins per node, the finest level has a
+ * bin for every level. The k-th value is found by walking the top level from the
+ * previous position then scanning at most 256 bins of each lower level. The window
+ * moves in a snake pattern so that each step only adds and removes one row or
+ * column.
+ */
+
+#define EMPTY 0xFFFFFFFF /* Level of NaN, never counted */
+#define MAX_DEPTH 4
+#define BITS 8
+
+typedef struct {
+    int depth;
+    uint32_t* counts[MAX_DEPTH]; /* counts[depth - 1] is the finest */
+    npy_intp n; /* Number of values */
+    npy_intp c; /* Current top level bin */
+    npy_intp below; /* Number of values in top level bins below c */
+} Histogram;
+
+static int histogram_init(Histogram* h, npy_intp nlevels)
+{
+    h->depth = 1;
+    while (h->depth < MAX_DEPTH && (nlevels - 1) >> (BITS * h->depth) > 0)
+        h->depth++;
+    for (int d = 0; d < h->depth; ++d) {
+        npy_intp nbins = nlevels > 0 ? ((nlevels - 1) >> (BITS * (h->depth - 1 - d))) + 1 : 1;
+        h->counts[d] = PyMem_RawCalloc(nbins, sizeof(uint32_t));
+        if (h->counts[d] == NULL)
+            return -1;
+    }
+    h->n = 0;
+    h->c = 0;
+    h->below = 0;
+    return 0;
+}
+
+static void histogram_free(Histogram* h)
+{
+    for (int d = 0; d < MAX_DEPTH; ++d)
+        PyMem_RawFree(h->counts[d]);
+}
+
+static void histogram_update(Histogram* h, uint32_t level, int remove)
+{
+    if (level == EMPTY)
+        return;
+    int delta = remove ? -1 : 1;
+    for (int d = 0; d < h->depth; ++d)
+        h->counts[d][level >> (BITS * (h->depth - 1 - d))] += delta;
+    h->n += delta;
+    if ((npy_intp)(level >> (BITS * (h->depth - 1))) < h->c)
+        h->below += delta;
+}
+
+/* Level of the k-th (from 0) smallest value, k must be less than n. */
+static uint32_t histogram_kth(Histogram* h, npy_intp k)
+{
+    uint32_t* top = h->counts[0];
+    while (h->below > k) {
+        h->c--;
+        h->below -= top[h->c];
+    }
+    while (h->below + top[h->c] <= k) {
+        h->below += top[h->c];
+        h->c++;
+    }
+
+    npy_intp count = h->below;
+    npy_intp bin = h->c;
+    for (int d = 1; d < h->depth; ++d) {
+        uint32_t* counts = h->counts[d];
+        bin <<= BITS;
+        while (count + counts[bin] <= k) {
+            count += counts[bin];
+            bin++;
+        }
+    }
+    return (uint32_t)bin;
+}
+
+static void histogram_update_column(Histogram* h, PyArrayObject* x, npy_intp col,
+    npy_intp row0, npy_intp row1, int remove)
+{
+    if (col < 0 || col >= PyArray_DIM(x, 1))
+        return;
+    row0 = row0 < 0 ? 0 : row0;
+    row1 = row1 > PyArray_DIM(x, 0) ? PyArray_DIM(x, 0) : row1;
+    for (npy_intp i = row0; i < row1; ++i)
+        histogram_update(h, *(uint32_t*)PyArray_GETPTR2(x, i, col), remove);
+}
+
+static void histogram_update_row(Histogram* h, PyArrayObject* x, npy_intp row,
+    npy_intp col0, npy_intp col1, int remove)
+{
+    if (row < 0 || row >= PyArray_DIM(x, 0))
+        return;
+    col0 = col0 < 0 ? 0 : col0;
+    col1 = col1 > PyArray_DIM(x, 1) ? PyArray_DIM(x, 1) : col1;
+    for (npy_intp j = col0; j < col1; ++j)
+        histogram_update(h, *(uint32_t*)PyArray_GETPTR2(x, row, j), remove);
+}
+
+static PyObject* filtersext_rolling_median_levels(PyObject* self, PyObject* args)
+{
+    PyObject* in;
+    Py_ssize_t nlevels;
+    int size;
+
+    if (!PyArg_ParseTuple(args, "Oni", &in, &nlevels, &size))
+        return NULL;
+    if (size < 1) {
+        PyErr_SetString(PyExc_ValueError, "Size must be at least 1.");
+        return NULL;
+    }
+    if (nlevels < 0 || nlevels > (npy_intp)EMPTY
+        || (nlevels - 1) >> (BITS * MAX_DEPTH) > 0) {
+        PyErr_SetString(PyExc_ValueError, "Invalid number of levels.");
+        return NULL;
+    }
+
+    PyArrayObject* x
+        = (PyArrayObject*)PyArray_FROM_OTF(in, NPY_UINT32, NPY_ARRAY_IN_ARRAY);
+    if (x == NULL)
+        return NULL;
+    if (PyArray_NDIM(x) != 2) {
+        PyErr_SetString(PyExc_ValueError, "Levels must be two dimensional.");
+        Py_DECREF(x);
+        return NULL;
+    }
+
+    npy_intp rows = PyArray_DIM(x, 0), cols = PyArray_DIM(x, 1);
+    npy_intp r = size / 2;
+
+    uint32_t* px = (uint32_t*)PyArray_DATA(x);
+    for (npy_intp i = 0; i < rows * cols; ++i) {
+        if (px[i] != EMPTY && px[i] >= (uint32_t)nlevels) {
+            PyErr_SetString(PyExc_ValueError, "Level out of range.");
+            Py_DECREF(x);
+            return NULL;
+        }
+    }
+
+    PyArrayObject* lo = (PyArrayObject*)PyArray_SimpleNew(2, PyArray_DIMS(x), NPY_UINT32);
+    PyArrayObject* hi = (PyArrayObject*)PyArray_SimpleNew(2, PyArray_DIMS(x), NPY_UINT32);
+    Histogram h = { 0 };
+    if (lo == NULL || hi == NULL || histogram_init(&h, nlevels) < 0) {
+        Py_DECREF(x);
+        Py_XDECREF(lo);
+        Py_XDECREF(hi);
+        histogram_free(&h);
+        return PyErr_NoMemory();
+    }
+
+    Py_BEGIN_ALLOW_THREADS
+
+    for (npy_intp i = -r; i <= r; ++i)
+        histogram_update_row(&h, x, i, -r, r + 1, 0);
+
+    npy_intp col = 0;
+    for (npy_intp row = 0; row < rows; ++row) {
+        int forward = row % 2 == 0;
+        for (npy_intp step = 0; step < cols; ++step) {
+            if (step > 0) {
+                if (forward) {
+                    col++;
+                    histogram_update_column(&h, x, col - r - 1, row - r, row + r + 1, 1);
+                    histogram_update_column(&h, x, col + r, row - r, row + r + 1, 0);
+                } else {
+                    col--;
+                    histogram_update_column(&h, x, col + r + 1, row - r, row + r + 1, 1);
+                    histogram_update_column(&h, x, col - r, row - r, row + r + 1, 0);
+                }
+            }
+
+            uint32_t* plo = (uint32_t*)PyArray_GETPTR2(lo, row, col);
+            uint32_t* phi = (uint32_t*)PyArray_GETPTR2(hi, row, col);
+            if (h.n == 0) {
+                *plo = EMPTY;
+                *phi = EMPTY;
+            } else {
+                *plo = histogram_kth(&h, (h.n - 1) / 2);
+                *phi = h.n % 2 == 1 ? *plo : histogram_kth(&h, h.n / 2);
+            }
+        }
+        if (row + 1 < rows) { /* Move down */
+            histogram_update_row(&h, x, row - r, col - r, col + r + 1, 1);
+            histogram_update_row(&h, x, row + r + 1, col - r, col + r + 1, 0);
+        }
+    }
+
+    Py_END_ALLOW_THREADS
+
+    histogram_free(&h);
+    Py_DECREF(x);
+
+    return Py_BuildValue("NN", lo, hi);
+}
+
+static PyMethodDef filtersext_methods[] = {
+    { "rolling_median_levels",
+        filtersext_rolling_median_levels,
+        METH_VARARGS,
+        "Lower and upper median levels of each size x size window of uint32 levels." },
+    { NULL, NULL, 0, NULL }
+};
+
+static struct PyModuleDef filtersextmodule = {
+    PyModuleDef_HEAD_INIT,
+    "filtersext_module", "Filter extension module.",
+    -1,
+    filtersext_methods
+};
+
+PyMODINIT_FUNC
+PyInit_filtersext(void)
+{
+    PyObject* m;
+    m = PyModule_Create(&filtersextmodule);
+    import_array();
+    if (PyErr_Occurred())
+        return NULL;
+    return m;
+}
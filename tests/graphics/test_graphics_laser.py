@@ -4,6 +4,7 @@ from PySide2 import QtCore, QtGui
 
 from pewpew.graphics.options import GraphicsOptions
 from pewpew.graphics.lasergraphicsview import LaserGraphicsView
+from pewpew.lib.selection import RunMask
 
 
 def test_laser_graphics_selection(qtbot: QtBot):
@@ -72,6 +73,47 @@ def test_laser_graphics_selection(qtbot: QtBot):
     assert not graphics.posInSelection(graphics.mapFromScene(QtCore.QPoint(11, 11)))
 
 
+def test_laser_graphics_selection_modes(qtbot: QtBot):
+    graphics = LaserGraphicsView(GraphicsOptions())
+    qtbot.addWidget(graphics)
+
+    x = np.random.random((10, 10))
+    graphics.drawImage(x, QtCore.QRectF(0, 0, 100, 100), "x")
+    assert graphics.mask is None
+
+    a = np.zeros((10, 10), dtype=bool)
+    a[2:6, 2:6] = True
+    b = RunMask.from_rect((10, 10), (4, 8), (4, 8))
+
+    graphics.drawSelectionImage(a, [])
+    assert isinstance(graphics.selection, RunMask)
+    assert np.all(graphics.mask == a)
+    graphics.drawSelectionImage(b, ["add"])
+    assert np.all(graphics.mask == a | b.to_array())
+    graphics.drawSelectionImage(b, ["subtract"])
+    assert np.all(graphics.mask == a & ~b.to_array())
+    graphics.drawSelectionImage(a, ["intersect"])
+    assert np.all(graphics.mask == a & ~b.to_array())
+    graphics.drawSelectionImage(b, ["difference"])
+    expected = (a & ~b.to_array()) ^ b.to_array()
+    assert np.all(graphics.mask == expected)
+
+    # Overlay image is rasterised from the selection
+    image = graphics.selection_image.image
+    assert image.format() == QtGui.QImage.Format_Indexed8
+    assert all(
+        image.pixelIndex(j, i) == expected[i, j] for i in range(10) for j in range(10)
+    )
+
+    assert graphics.posInSelection(graphics.mapFromScene(QtCore.QPoint(25, 25)))
+    assert not graphics.posInSelection(graphics.mapFromScene(QtCore.QPoint(95, 95)))
+    assert graphics.posInSelection(graphics.mapFromScene(QtCore.QPoint(75, 75)))
+
+    graphics.mask = None
+    assert graphics.selection is None
+    assert not graphics.posInSelection(graphics.mapFromScene(QtCore.QPoint(25, 25)))
+
+
 def test_laser_graphics_widgets(qtbot: QtBot):
     graphics = LaserGraphicsView(GraphicsOptions())
     qtbot.addWidget(graphics)
@@ -145,3 +187,45 @@ def test_laser_graphics_zoom(qtbot: QtBot):
     assert 29.5 < rect.center().x() < 30.5
     assert 29.5 < rect.center().y() < 30.5
     assert 19.5 < rect.width() < 20.5 or 19.5 < rect.height() < 20.5
+
+
+def test_laser_graphics_overlay_cache(qtbot: QtBot):
+    graphics = LaserGraphicsView(GraphicsOptions())
+    qtbot.addWidget(graphics)
+    graphics.resize(400, 400)
+    graphics.show()
+    qtbot.waitForWindowShown(graphics)
+
+    graphics.drawImage(np.random.random((10, 10)), QtCore.QRectF(0, 0, 100, 100), "x")
+    graphics.updateForeground()
+    label, scalebar, colorbar = graphics.scene().overlayitems
+
+    def keys():
+        return [item.pixmap.cacheKey() for item in (label, scalebar, colorbar)]
+
+    # Only the scalebar depends on the scale, updates are coalesced
+    qtbot.waitUntil(lambda: not graphics.foreground_timer.isActive())
+    before = keys()
+    graphics.scale(2.0, 2.0)
+    graphics.viewScaleChanged.emit()
+    first = keys()
+    assert first[0] == before[0] and first[2] == before[2]
+    assert first[1] != before[1]
+    graphics.scale(2.0, 2.0)
+    graphics.viewScaleChanged.emit()
+    graphics.viewScaleChanged.emit()
+    assert keys() == first
+    qtbot.waitUntil(lambda: keys()[1] != first[1])
+    assert keys()[0] == first[0]
+
+    # The colorbar spans the view
+    graphics.resize(300, 400)
+    margin = 2 * colorbar.pixmap_margin
+    qtbot.waitUntil(
+        lambda: colorbar.pixmap.width() == graphics.viewport().width() + margin
+    )
+    assert keys()[0] == first[0]
+
+    # Items are composited
+    image = graphics.grab().toImage()
+    assert image.pixelColor(12, 20) != QtGui.QColor(QtCore.Qt.black)
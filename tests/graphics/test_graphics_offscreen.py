@@ -0,0 +1,58 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from pytestqt.qtbot import QtBot
+from PySide2 import QtCore, QtGui
+
+from pewlib.laser import Laser
+
+from pewpew.graphics.offscreen import overlay_items, render_laser
+from pewpew.graphics.options import GraphicsOptions
+
+from testing import linear_data
+
+
+def test_overlay_items(qtbot: QtBot):
+    options = GraphicsOptions()
+    options.items["scalebar"] = False
+    label, scalebar, colorbar = overlay_items("A1", "ppm", options)
+
+    assert label.item.text() == "A1"
+    assert not scalebar.item.isVisible()
+    assert colorbar.item.unit == "ppm"
+    assert label.anchor == QtCore.Qt.TopLeftCorner
+    assert colorbar.alignment & QtCore.Qt.AlignBottom
+
+
+def test_render_laser(qtbot: QtBot):
+    laser = Laser(linear_data(["A1", "B2"]))
+    options = GraphicsOptions()
+
+    raw = render_laser(laser, "A1", options, raw=True)
+    assert raw.size() == QtCore.QSize(10, 10)
+    assert raw.format() == QtGui.QImage.Format_Indexed8
+
+    image = render_laser(laser, "A1", options, size=QtCore.QSize(200, 100))
+    assert image.size() == QtCore.QSize(200, 100)
+    # Image is centered in the output
+    assert image.pixelColor(5, 50) == QtGui.QColor(QtCore.Qt.black)
+    assert image.pixelColor(100, 50) != QtGui.QColor(QtCore.Qt.black)
+
+    # Overlays change the output
+    options.items = {"label": False, "scalebar": False, "colorbar": False}
+    plain = render_laser(laser, "A1", options, size=QtCore.QSize(200, 100))
+    assert plain != image
+
+
+def test_render_laser_threaded(qtbot: QtBot):
+    laser = Laser(linear_data(["A1", "B2", "C3", "D4"]))
+    options = GraphicsOptions()
+
+    with ThreadPoolExecutor(4) as executor:
+        images = list(
+            executor.map(
+                lambda name: render_laser(laser, name, options), laser.isotopes
+            )
+        )
+
+    for name, image in zip(laser.isotopes, images):
+        assert image == render_laser(laser, name, options)
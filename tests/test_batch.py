@@ -0,0 +1,121 @@
+import json
+import logging
+import numpy as np
+from pathlib import Path
+import shutil
+import tempfile
+
+from pewlib import io
+from pewlib.laser import Laser
+
+from pewpew import batch
+from pewpew.__main__ import main
+
+from testing import linear_data
+
+
+def test_batch_steps():
+    laser = Laser(linear_data(["a", "b"]))
+    laser.data["a"] += 1.0
+    laser.data["b"] += 1.0
+
+    batch.step_calibration(
+        laser, {"calibration": {"a": {"gradient": 2.0, "unit": "ppm"}, "c": {}}}
+    )
+    assert laser.calibration["a"].gradient == 2.0
+    assert laser.calibration["a"].unit == "ppm"
+    assert "c" not in laser.calibration
+
+    batch.step_calculator(laser, {"name": "c", "formula": "a + b"})
+    assert np.all(laser.data["c"] == laser.data["a"] * 2.0)
+    batch.step_calculator(laser, {"name": "c", "formula": "a * 3"})
+    assert np.all(laser.data["c"] == laser.data["a"] * 3.0)
+
+    batch.step_drift(
+        laser, {"isotope": "a", "region": [0, 2], "degree": 1, "isotopes": ["a", "b"]}
+    )
+    assert np.allclose(laser.data["a"], 1.0)
+    assert np.allclose(laser.data["b"], 1.0)
+
+    laser.data["b"][5, 5] = 100.0
+    batch.step_filter(laser, {"method": "Rolling Median", "isotopes": ["b"]})
+    assert np.allclose(laser.data["b"], 1.0)
+
+
+def test_batch_run():
+    path = Path(__file__).parent.joinpath("data", "io")
+    inputs = [path.joinpath("npz", "test.npz"), path.joinpath("textimage", "csv.csv")]
+
+    pipeline = {
+        "steps": [{"type": "calculator", "name": "x", "formula": "_isotope_ * 2"}],
+        "exports": [
+            {"format": "npz"},
+            {"format": "csv", "isotopes": ["A1"]},
+            {"format": "png"},
+            {"format": "vti"},
+        ],
+    }
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        # Calculator fails on test.npz, no '_isotope_'
+        exported, failed = batch.run(inputs, pipeline, Path(tempdir), processes=1)
+        assert failed == [inputs[0]]
+        assert len(exported) == 4  # npz, vti and two png
+
+        pipeline["steps"] = [
+            {"type": "filter", "method": "Rolling Mean", "params": [3, 3.0]}
+        ]
+        exported, failed = batch.run(inputs, pipeline, Path(tempdir), processes=2)
+        assert len(failed) == 0
+        assert sorted(p.name for p in exported) == [
+            "Test.npz",
+            "Test.vti",
+            "Test_A1.csv",
+            "Test_A1.png",
+            "Test_B2.png",
+            "csv.npz",
+            "csv.vti",
+            "csv__isotope_.png",
+        ]
+        assert all(p.exists() for p in exported)
+        assert io.npz.load(Path(tempdir, "Test.npz")).isotopes == ("A1", "B2")
+
+
+def test_batch_same_names():
+    path = Path(__file__).parent.joinpath("data", "io", "npz", "test.npz")
+
+    assert batch.unique_suffixes(
+        [Path("a", "x.npz"), Path("b", "X.csv"), Path("y.npz"), Path("c", "x.npz")]
+    ) == ["", "_2", "", "_3"]
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        inputs = [Path(tempdir, "a", "test.npz"), Path(tempdir, "b", "test.npz")]
+        for input in inputs:
+            input.parent.mkdir()
+            shutil.copy(path, input)
+
+        output = Path(tempdir, "output")
+        exported, failed = batch.run(
+            inputs, {"exports": [{"format": "npz"}]}, output, processes=1
+        )
+        assert len(failed) == 0
+        assert sorted(p.name for p in exported) == ["Test.npz", "Test_2.npz"]
+
+
+def test_batch_main(caplog):
+    path = Path(__file__).parent.joinpath("data", "io", "npz", "test.npz")
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        pipeline = Path(tempdir, "pipeline.json")
+        with pipeline.open("w") as fp:
+            json.dump({"exports": [{"format": "csv"}]}, fp)
+
+        argv = ["batch", str(pipeline), str(path), "-o", tempdir, "-p", "1"]
+        handlers = list(logging.getLogger().handlers)
+        with caplog.at_level(logging.INFO):
+            assert main(argv) == 0
+            assert main(argv) == 0
+        assert logging.getLogger().handlers == handlers
+        assert "Exported 2 files, 0 inputs failed." in caplog.messages
+        assert Path(tempdir, "Test_A1.csv").exists()
+        assert Path(tempdir, "Test_B2.csv").exists()
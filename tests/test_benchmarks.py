@@ -0,0 +1,80 @@
+import json
+from pathlib import Path
+import tempfile
+
+import pytest
+from pytestqt.qtbot import QtBot
+
+benchmarks = pytest.importorskip("benchmarks.__main__")
+
+
+def test_benchmarks_discover():
+    names = [name for name, _, _ in benchmarks.discover()]
+    assert "bench_process.Filters.time_filter" in names
+    assert all(name.split(".")[2].startswith("time_") for name in names)
+    assert [name for name, _, _ in benchmarks.discover("Calculator")] == [
+        "bench_process.Calculator.time_parse",
+        "bench_process.Calculator.time_reduce",
+    ]
+
+
+def test_benchmarks_param_sets():
+    class A(object):
+        pass
+
+    class B(object):
+        params = [1, 2]
+
+    class C(object):
+        params = [[1, 2], ["a", "b"]]
+
+    assert benchmarks.param_sets(A) == [()]
+    assert benchmarks.param_sets(B) == [(1,), (2,)]
+    assert benchmarks.param_sets(C) == [(1, "a"), (1, "b"), (2, "a"), (2, "b")]
+    assert benchmarks.param_sets(C, quick=True) == [(1, "a")]
+
+
+def test_benchmarks_run(qtbot: QtBot):
+    results = benchmarks.run("bench_process.Calculator.time_parse", quick=True)
+    assert list(results.keys()) == ["bench_process.Calculator.time_parse(256)"]
+    assert results["bench_process.Calculator.time_parse(256)"]["min"] > 0.0
+
+    previous = {k: {"min": v["min"] / 2.0} for k, v in results.items()}
+    assert benchmarks.compare(results, results) == []
+    assert len(benchmarks.compare(results, previous, threshold=1.5)) == len(results)
+
+
+def test_benchmarks_run_teardown(monkeypatch):
+    calls = []
+
+    class A(object):
+        def setup(self):
+            raise ValueError
+
+        def teardown(self):
+            calls.append("teardown")
+
+        def time_a(self):
+            pass
+
+    def discover(filter: str = ""):
+        yield "bench_a.A.time_a", A, "time_a"
+
+    monkeypatch.setattr(benchmarks, "discover", discover)
+    with pytest.raises(ValueError):
+        benchmarks.run()
+    assert calls == ["teardown"]
+
+
+def test_benchmarks_main(qtbot: QtBot):
+    with tempfile.TemporaryDirectory() as tempdir:
+        argv = ["--quick", "--filter", "Calculator", "--output", tempdir]
+        assert benchmarks.main(argv) == 0
+        saved = list(Path(tempdir).iterdir())
+        assert len(saved) == 1
+        with saved[0].open() as fp:
+            data = json.load(fp)
+        assert data["quick"]
+        assert len(data["results"]) == 2
+
+        assert benchmarks.main(argv + ["--compare", str(saved[0])]) == 0
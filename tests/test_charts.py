@@ -63,8 +63,8 @@ def test_histogram_chart(qtbot: QtBot):
 
     data = np.random.random(100)
     chart.setHistogram(data, bins=20)
-    assert chart.series.barSets()[0].count() == 20
+    assert chart.bars.count() == 20 * 4
     chart.setHistogram(data, bins=100, max_bins=50)
-    assert chart.series.barSets()[0].count() == 50
+    assert chart.bars.count() == 50 * 4
     chart.setHistogram(data, bins=10, min_bins=50)
-    assert chart.series.barSets()[0].count() == 50
+    assert chart.bars.count() == 50 * 4
@@ -0,0 +1,120 @@
+import numpy as np
+
+from pewpew.lib.colorize import (
+    ColorizeBuffers,
+    aligned_empty,
+    colorize_indexed,
+    colorize_rgb,
+)
+from pewpew.lib.numpyqt import array_to_image
+
+
+def indexed_reference(data: np.ndarray, vmin: float, vmax: float) -> np.ndarray:
+    # Previous colortable_image and array_to_image
+    data = np.clip(data, vmin, vmax)
+    data = (data - vmin) / (vmax - vmin)
+    return (np.clip(data, 0.0, 1.0) * 255.0).astype(np.uint8)
+
+
+def rgb_reference(
+    datas: list, ranges: list, colors: list, subtractive: bool, normalise: bool
+) -> np.ndarray:
+    # Previous OverlayTool.processRow and refresh
+    imgs = []
+    for data, (vmin, vmax), (r, g, b) in zip(datas, ranges, colors):
+        if subtractive:
+            r, g, b = 255 - r, 255 - g, 255 - b
+        img = (np.clip(data, vmin, vmax) - vmin) / (vmax - vmin)
+        imgs.append((img[:, :, None] * np.array([r, g, b])).astype(np.uint8))
+    img = np.sum(imgs, axis=0).astype(np.int64)
+    if subtractive:
+        img = 255 - img
+    if normalise:
+        img = (img - img.min()) / (img.max() - img.min()) * 255.0
+    img = np.clip(img, 0, 255).astype(np.uint32)
+    return (255 << 24) + (img[:, :, 0] << 16) + (img[:, :, 1] << 8) + img[:, :, 2]
+
+
+def test_aligned_empty():
+    x = aligned_empty((5, 7), np.uint8)
+    assert x.shape == (5, 7)
+    assert x.strides[0] == 8
+    assert aligned_empty((5, 7), np.uint8, x) is x
+    assert aligned_empty((5, 8), np.uint8, x) is not x
+    assert aligned_empty((5, 7), np.float32, x).dtype == np.float32
+
+    # Padded arrays are imaged without copying
+    x[:] = np.arange(7)
+    image = array_to_image(x)
+    assert image.bytesPerLine() == 8
+    assert image.pixelIndex(6, 4) == 6
+
+
+def test_colorize_indexed():
+    np.random.seed(8723)
+    data = np.random.random((13, 17)) * 100.0
+
+    assert np.all(colorize_indexed(data, 10.0, 90.0) == indexed_reference(data, 10, 90))
+    assert np.all(colorize_indexed(data, 0.0, 100.0) == indexed_reference(data, 0, 100))
+
+    # Large offsets are not lost to float32 precision
+    x = np.array([[1e7, 1e7 + 0.25, 1e7 + 0.5, 1e7 + 1.0]])
+    assert np.all(colorize_indexed(x, 1e7, 1e7 + 1.0) == [0, 63, 127, 255])
+
+    # NaN is the lowest index
+    data[0, 0] = np.nan
+    assert colorize_indexed(data, 10.0, 90.0)[0, 0] == 0
+
+    # Equal range is a threshold
+    assert np.all(colorize_indexed(x, 1e7 + 0.5, 1e7 + 0.5) == [0, 0, 255, 255])
+
+
+def test_colorize_rgb():
+    np.random.seed(1102)
+    datas = [np.random.random((11, 9)) for _ in range(3)]
+    ranges = [(0.1, 0.9), (0.0, 1.0), (0.3, 0.6)]
+    colors = [(255, 0, 0), (0, 255, 0), (10, 20, 255)]
+
+    for subtractive in [False, True]:
+        for normalise in [False, True]:
+            assert np.all(
+                colorize_rgb(datas, ranges, colors, subtractive, normalise)
+                == rgb_reference(datas, ranges, colors, subtractive, normalise)
+            )
+
+    # NaN is black, or white when subtractive
+    datas[0][0, 0] = datas[1][0, 0] = datas[2][0, 0] = np.nan
+    assert colorize_rgb(datas, ranges, colors)[0, 0] == 255 << 24
+    assert colorize_rgb(datas, ranges, colors, subtractive=True)[0, 0] == 0xFFFFFFFF
+
+    # No data
+    assert np.all(colorize_rgb([], [], [], shape=(2, 3)) == 255 << 24)
+
+
+def test_colorize_buffers():
+    buffers = ColorizeBuffers()
+    assert buffers.nbytes == 0
+
+    a = np.random.random((10, 10))
+    b = np.random.random((10, 10))
+    c = np.random.random((7, 5))
+
+    x = buffers.indexed(a, 0.0, 1.0)
+    y = buffers.indexed(b, 0.0, 1.0)
+    assert x is y  # reused
+    assert np.all(y == indexed_reference(b, 0.0, 1.0))
+
+    # Different shape
+    z = buffers.indexed(c, 0.0, 1.0)
+    assert z is not y
+    assert z.shape == (7, 5)
+    assert np.all(z == indexed_reference(c, 0.0, 1.0))
+
+    # Different type
+    rgb = buffers.rgb([c], [(0.0, 1.0)], [(255, 255, 255)])
+    assert rgb.dtype == np.uint32
+    assert np.all(rgb == rgb_reference([c], [(0.0, 1.0)], [(255, 255, 255)], 0, 0))
+    assert buffers.nbytes > 0
+
+    buffers.clear()
+    assert buffers.nbytes == 0
@@ -0,0 +1,174 @@
+import copy
+
+import numpy as np
+import pytest
+
+from pewlib.calibration import Calibration
+from pewlib.laser import Laser
+
+from pewpew.lib.columnar import ColumnarData, ColumnarLaser, compact, compact_dtype
+from pewpew.lib.selection import SelectionView
+
+from testing import rand_data
+
+
+def test_columnar_data():
+    x = rand_data(["A1", "B2", "C3"])
+    data = ColumnarData.from_structured(x)
+    assert ColumnarData.from_structured(data) is data
+
+    assert data.dtype.names == ("A1", "B2", "C3")
+    assert data.shape == x.shape
+    assert data.ndim == 2
+    assert data.size == x.size
+    assert len(data) == len(x)
+    assert data.nbytes == x.nbytes
+    assert all(data[name].flags.c_contiguous for name in data.dtype.names)
+    assert np.all(data.to_structured() == x)
+    assert np.all(np.asarray(data) == x)
+
+    with pytest.raises(ValueError):
+        data["D4"]
+    with pytest.raises(ValueError):
+        ColumnarData({"A1": np.zeros((2, 2)), "B2": np.zeros((2, 3))})
+
+    # Views share memory
+    subset = data[["C3", "A1"]]
+    assert subset.dtype.names == ("C3", "A1")
+    assert subset["A1"] is data["A1"]
+
+    sliced = data[2:5, 1:]
+    assert sliced.shape == x[2:5, 1:].shape
+    assert np.shares_memory(sliced["B2"], data["B2"])
+    assert np.all(sliced.to_structured() == x[2:5, 1:])
+    assert data[data["A1"] > 0.5].shape == x[x["A1"] > 0.5].shape
+
+    copied = data.copy()
+    assert not np.shares_memory(copied["A1"], data["A1"])
+    copied["A1"] = 0.0
+    assert np.all(copied["A1"] == 0.0)
+    assert not np.all(data["A1"] == 0.0)
+
+    copied[0:2] = data[0:2]
+    assert np.all(copied["A1"][:2] == data["A1"][:2])
+    assert np.all(copied["A1"][2:] == 0.0)
+
+    # Transforms as numpy
+    assert np.all(data.flip(axis=1).to_structured() == np.flip(x, axis=1))
+    rotated = data.rot90(k=1, axes=(1, 0))
+    assert rotated.shape == (x.shape[1], x.shape[0])
+    assert np.all(rotated.to_structured() == np.rot90(x, k=1, axes=(1, 0)))
+
+
+def test_columnar_data_elements():
+    x = rand_data(["A1", "B2"])
+    data = ColumnarData.from_structured(x)
+    a1 = data["A1"]
+
+    data.add("C3", np.ones(x.shape))
+    assert data.dtype.names == ("A1", "B2", "C3")
+    assert data["A1"] is a1  # not copied
+    with pytest.raises(ValueError):
+        data.add("C3", np.ones(x.shape))
+    with pytest.raises(ValueError):
+        data.add("D4", np.ones((1, 1)))
+
+    data.rename({"B2": "b"})
+    assert data.dtype.names == ("A1", "b", "C3")
+
+    data.remove(["A1", "C3"])
+    assert data.dtype.names == ("b",)
+    assert np.all(data["b"] == x["B2"])
+
+
+def test_columnar_laser():
+    x = rand_data(["A1", "B2"])
+    laser = Laser(x, calibration={"A1": Calibration(1.0, 2.0)}, name="laser")
+    columnar = ColumnarLaser.from_laser(laser)
+    assert ColumnarLaser.from_laser(columnar) is columnar
+    assert isinstance(columnar.data, ColumnarData)
+    assert columnar.isotopes == ("A1", "B2")
+    assert columnar.calibration["A1"].gradient == 2.0
+
+    # Get as pewlib
+    assert np.all(columnar.get("A1", calibrate=True) == laser.get("A1", calibrate=True))
+    calibrated = columnar.get(calibrate=True)
+    assert isinstance(calibrated, ColumnarData)
+    assert np.all(calibrated.to_structured() == laser.get(calibrate=True))
+
+    # Structured arrays are converted
+    columnar.data = np.flip(columnar.data, axis=0)
+    assert isinstance(columnar.data, ColumnarData)
+    assert np.all(columnar.data["A1"] == x["A1"][::-1])
+
+    columnar.add("C3", np.zeros(x.shape), Calibration(0.0, 3.0))
+    assert columnar.isotopes == ("A1", "B2", "C3")
+    assert columnar.calibration["C3"].gradient == 3.0
+    columnar.rename({"C3": "c"})
+    assert columnar.calibration["c"].gradient == 3.0
+    columnar.remove("c")
+    assert columnar.isotopes == ("A1", "B2")
+    assert "c" not in columnar.calibration
+
+    structured = columnar.to_laser()
+    assert type(structured) == Laser
+    assert structured.data.dtype.names == ("A1", "B2")
+    assert np.all(structured.data["B2"] == columnar.data["B2"])
+
+    duplicate = copy.deepcopy(columnar)
+    assert not np.shares_memory(duplicate.data["A1"], columnar.data["A1"])
+
+
+def test_columnar_compact():
+    assert compact_dtype(np.array([0.0, 3.0, 255.0]), "integer") == np.uint8
+    assert compact_dtype(np.array([-1.0, 300.0]), "integer") == np.int16
+    assert compact_dtype(np.array([0.0, 70000.0]), "integer") == np.uint32
+    assert compact_dtype(np.array([1, 2], dtype=np.int64), "integer") == np.uint8
+    # Lossy values keep their type
+    assert compact_dtype(np.array([0.0, 0.5]), "integer") == np.float64
+    assert compact_dtype(np.array([np.nan, 1.0]), "integer") == np.float64
+    assert compact_dtype(np.array([np.inf, 1.0]), "integer") == np.float64
+    assert compact_dtype(np.array([1e20]), "integer") == np.float64
+    assert compact_dtype(np.array([0.5]), "float32") == np.float32
+    with pytest.raises(ValueError):
+        compact_dtype(np.array([0.5]), "float16")
+
+    x = rand_data(["A1", "B2"])
+    x["A1"] = np.round(x["A1"] * 100.0)
+    data = compact(x, "integer")
+    assert data.dtype["A1"] == np.uint8
+    assert data.dtype["B2"] == np.float64
+    assert np.all(data["A1"] == x["A1"])
+    assert data.astype(x.dtype).dtype == x.dtype
+
+    # Promoted when assigned values it cannot hold
+    a1 = data["A1"]
+    data["A1"] = np.ones(x.shape, dtype=np.uint8)
+    assert data["A1"] is a1
+    data["A1"] = x["B2"]
+    assert data["A1"].dtype == np.float64
+    assert np.all(data["A1"] == x["B2"])
+
+    # Calibration is applied lazily and not truncated
+    x["A1"] = 3.0
+    laser = ColumnarLaser(
+        compact(x, "integer"), calibration={"A1": Calibration(0.0, 2.0)}
+    )
+    assert np.all(laser.get("A1", calibrate=True) == 1.5)
+    assert np.all(laser.get(calibrate=True)["A1"] == 1.5)
+    assert laser.data["A1"].dtype == np.uint8
+
+
+def test_columnar_selection():
+    x = rand_data(["A1", "B2"])
+    mask = np.zeros(x.shape, dtype=bool)
+    mask[2, 3:6] = True
+    mask[4, 4] = True
+
+    columnar = SelectionView(ColumnarData.from_structured(x), mask)
+    structured = SelectionView(x, mask)
+    assert np.all(columnar["A1"] == structured["A1"])
+
+    crop = columnar.crop()
+    assert isinstance(crop, ColumnarData)
+    assert np.array_equal(crop["B2"], structured.crop()["B2"], equal_nan=True)
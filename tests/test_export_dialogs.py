@@ -1,3 +1,4 @@
+import numpy as np
 from pathlib import Path
 import tempfile
 
@@ -11,7 +12,7 @@ from pewpew.widgets.exportdialogs import (
     PngOptionsBox,
     VtiOptionsBox,
 )
-from pewpew.widgets.laser import LaserViewSpace
+from pewpew.widgets.laser import LaserPlaceholder, LaserViewSpace
 
 from testing import rand_data
 
@@ -26,6 +27,9 @@ def test_export_options(qtbot: QtBot):
     assert vti.lineedits[0].text() == "10.0"
     assert vti.spacing() == (10.0, 20.0, 30.0)
     assert vti.isComplete()
+    assert vti.compression() is None
+    vti.combo_compression.setCurrentText("zlib")
+    assert vti.compression() == "zlib"
 
     vti.lineedits[0].setText("10.0a")
     assert not vti.isComplete()
@@ -92,6 +96,39 @@ def test_export_dialog(qtbot: QtBot):
     dlg.close()
 
 
+def test_export_dialog_png_offscreen(qtbot: QtBot):
+    viewspace = LaserViewSpace()
+    qtbot.addWidget(viewspace)
+    view = viewspace.activeView()
+
+    widget = view.addLaser(Laser(rand_data(["A1", "B2"]), name="laser"))
+    widget.refresh()
+    data = widget.graphics.data
+
+    dlg = ExportDialog(widget)
+    with tempfile.TemporaryDirectory() as tempdir:
+        dlg.lineedit_directory.setText(tempdir)
+        dlg.lineedit_filename.setText("temp.png")
+        dlg.check_export_all.setChecked(True)
+        dlg.accept()
+        assert Path(tempdir, "temp_A1.png").exists()
+        assert Path(tempdir, "temp_B2.png").exists()
+
+    # The view is not redrawn for each element
+    assert widget.current_isotope == "A1"
+    assert widget.graphics.data is data
+
+    # Jobs export the state when they were created
+    dlg.lineedit_filename.setText("temp.png")
+    job = dlg.createJob(Path("temp.png"), "B2", None, widget)
+    widget.laser.data["B2"] = 0.0
+    widget.graphics.options.colortable = "grey"
+    assert job.laser.isotopes == ("B2",)
+    assert not np.all(job.laser.data["B2"] == 0.0)
+    assert job.options is not widget.graphics.options
+    assert job.options.colortable == "viridis"
+
+
 def test_export_dialog_names(qtbot: QtBot):
     viewspace = LaserViewSpace()
     qtbot.addWidget(viewspace)
@@ -160,8 +197,54 @@ def test_export_all_dialog(qtbot: QtBot):
     with tempfile.TemporaryDirectory() as tempdir:
         dlg.lineedit_directory.setText(tempdir)
         dlg.accept()
+        qtbot.waitUntil(lambda: not dlg.progress.scheduler.isRunning())
+        assert dlg.progress.model.rowCount() == 5
+        assert Path(tempdir, "01_export_manifest.json").exists()
         assert Path(tempdir, "01_laser1_A1.csv").exists()
         assert Path(tempdir, "01_laser2_B2.csv").exists()
         assert Path(tempdir, "01_laser3_C3.csv").exists()
         assert Path(tempdir, "01_laser4_B2.csv").exists()
         assert Path(tempdir, "01_laser4_C3.csv").exists()
+
+    dlg.options.setCurrentIndex(dlg.options.indexForExt(".png"))
+    assert dlg.lineedit_preview.text() == "01_<name>_<isotope>.png"
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        dlg.lineedit_directory.setText(tempdir)
+        dlg.accept()
+        qtbot.waitUntil(lambda: not dlg.progress.scheduler.isRunning())
+        assert Path(tempdir, "01_laser1_A1.png").exists()
+        assert Path(tempdir, "01_laser4_B2.png").exists()
+        assert Path(tempdir, "01_laser4_C3.png").exists()
+
+
+def test_export_all_dialog_placeholders(qtbot: QtBot):
+    viewspace = LaserViewSpace()
+    qtbot.addWidget(viewspace)
+    view = viewspace.activeView()
+
+    widgets = [
+        view.addLaser(
+            Laser(rand_data("A1"), name="laser1", path=Path("/home/user/laser1.npz"))
+        ),
+        view.addPlaceholder(
+            Laser(rand_data("B2"), name="laser2", path=Path("/home/user/laser2.npz"))
+        ),
+    ]
+    assert isinstance(widgets[1], LaserPlaceholder)
+
+    dlg = ExportAllDialog(widgets)
+    dlg.open()
+    assert [dlg.combo_isotope.itemText(i) for i in range(2)] == ["A1", "B2"]
+
+    dlg.options.setCurrentIndex(dlg.options.indexForExt(".png"))
+    dlg.check_export_all.click()
+    with tempfile.TemporaryDirectory() as tempdir:
+        dlg.lineedit_directory.setText(tempdir)
+        dlg.accept()
+        qtbot.waitUntil(lambda: not dlg.progress.scheduler.isRunning())
+        assert Path(tempdir, "laser1_A1.png").exists()
+        assert Path(tempdir, "laser2_B2.png").exists()
+
+    # Placeholder is not replaced by a widget
+    assert view.stack.widget(1) is widgets[1]
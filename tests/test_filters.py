@@ -0,0 +1,147 @@
+import numpy as np
+import pytest
+
+from pewlib.process import filters as pewlib_filters
+
+from pewpew.lib import filters
+
+
+def window_median(x: np.ndarray, size: int) -> np.ndarray:
+    r = size // 2
+    padded = np.pad(x.astype(float), r, constant_values=np.nan)
+    medians = np.full(x.shape, np.nan)
+    for i in range(x.shape[0]):
+        for j in range(x.shape[1]):
+            window = padded[i : i + size, j : j + size]
+            if np.any(~np.isnan(window)):
+                medians[i, j] = np.nanmedian(window)
+    return medians
+
+
+def test_quantise():
+    x = np.array([[3.0, 1.0, np.nan], [1.0, 2.0, 3.0]])
+    levels, values = filters.quantise(x)
+    assert levels.dtype == np.uint32
+    assert np.all(values == [1.0, 2.0, 3.0])
+    assert np.all(levels == [[2, 0, np.iinfo(np.uint32).max], [0, 1, 2]])
+
+
+@pytest.mark.parametrize("shape, size", [((10, 10), 3), ((13, 7), 5), ((6, 9), 15)])
+def test_sliding_median(shape, size):
+    np.random.seed(8721)
+    x = np.random.random(shape)
+    x[np.random.random(shape) < 0.2] = np.nan
+    assert np.allclose(
+        filters.sliding_median(x, size), window_median(x, size), equal_nan=True
+    )
+
+    # Integer data with repeated values
+    x = np.random.randint(0, 5, size=shape)
+    assert np.allclose(filters.sliding_median(x, size), window_median(x, size))
+
+    # Empty windows are NaN
+    assert np.all(np.isnan(filters.sliding_median(np.full(shape, np.nan), size)))
+
+    with pytest.raises(ValueError):
+        filters.sliding_median(x, 0)
+
+
+def test_rolling_median():
+    np.random.seed(9812)
+    x = np.random.poisson(20.0, size=(40, 30)).astype(float)
+    x[np.random.random(x.shape) < 0.05] *= 50.0
+    x[np.random.random(x.shape) < 0.1] = np.nan
+
+    for size in [3, 5, 9]:
+        assert np.array_equal(
+            filters.rolling_median(x, size, 3.0),
+            pewlib_filters.rolling_median(x, (size, size), 3.0),
+            equal_nan=True,
+        )
+
+    # Integer data is promoted
+    x = np.random.poisson(20.0, size=(20, 20))
+    x[5, 5] = 1000
+    filtered = filters.rolling_median(x, 5, 3.0)
+    assert filtered.dtype == np.float64
+    assert filtered[5, 5] < 100
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+def test_rolling_median_many_values():
+    # More unique values than fit in a 16 bit histogram
+    np.random.seed(1290)
+    x = np.random.normal(100.0, 10.0, size=(300, 300))
+    x[np.random.random(x.shape) < 0.01] *= 10.0
+    x[np.random.random(x.shape) < 0.05] = np.nan
+    assert np.unique(x[~np.isnan(x)]).size > 2**16
+
+    padded = np.pad(x, 2, constant_values=np.nan)
+    windows = np.lib.stride_tricks.sliding_window_view(padded, (5, 5))
+    assert np.array_equal(
+        filters.sliding_median(x, 5),
+        np.nanmedian(windows, axis=(2, 3)),
+        equal_nan=True,
+    )
+    assert np.array_equal(
+        filters.rolling_median(x, 5, 3.0),
+        pewlib_filters.rolling_median(x, (5, 5), 3.0),
+        equal_nan=True,
+    )
+
+
+def window_mean(x: np.ndarray, size: int, threshold: float) -> np.ndarray:
+    r = size // 2
+    padded = np.pad(x, r, constant_values=np.nan)
+    means = np.full(x.shape, np.nan)
+    stds = np.full(x.shape, np.nan)
+    for i in range(x.shape[0]):
+        for j in range(x.shape[1]):
+            window = padded[i : i + size, j : j + size].copy()
+            means[i, j] = np.nanmean(window)
+            window[r, r] = np.nan
+            stds[i, j] = np.nanstd(window)
+    outliers = np.abs(x - means) > threshold * stds
+    padded[r : r + x.shape[0], r : r + x.shape[1]][outliers] = np.nan
+    for i in range(x.shape[0]):
+        for j in range(x.shape[1]):
+            means[i, j] = np.nanmean(padded[i : i + size, j : j + size])
+    return np.where(np.logical_and(outliers, ~np.isnan(means)), means, x)
+
+
+def test_window_sums():
+    x = np.arange(20).reshape(4, 5)
+    sums = filters.window_sums(x, 3)
+    assert sums.shape == x.shape
+    assert sums[0, 0] == 0 + 1 + 5 + 6
+    assert sums[1, 1] == np.sum(x[:3, :3])
+    assert sums[3, 4] == 13 + 14 + 18 + 19
+    assert np.all(filters.window_sums(x, 1) == x)
+    assert np.all(filters.window_sums(x, 11) == x.sum())
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+@pytest.mark.parametrize("shape, size", [((10, 10), 3), ((13, 7), 5), ((6, 9), 15)])
+def test_local_mean(shape, size):
+    np.random.seed(2871)
+    x = np.random.poisson(30.0, size=shape).astype(float)
+    x[np.random.random(shape) < 0.1] *= 50.0
+    x[np.random.random(shape) < 0.1] = np.nan
+
+    filtered = filters.local_mean(x, size, 3.0)
+    assert np.allclose(filtered, window_mean(x, size, 3.0), equal_nan=True)
+    assert np.all(np.isnan(filtered) == np.isnan(x))
+
+    # Large offsets do not affect the variance
+    assert np.allclose(
+        filters.local_mean(x + 1e9, size, 3.0), filtered + 1e9, equal_nan=True
+    )
+
+    # Integer data is promoted
+    x = np.random.poisson(20.0, size=shape)
+    x[2, 2] = 1000
+    filtered = filters.local_mean(x, size, 3.0)
+    assert filtered.dtype == np.float64
+    assert filtered[2, 2] < 100
+
+    assert np.all(np.isnan(filters.local_mean(np.full(shape, np.nan), size, 3.0)))
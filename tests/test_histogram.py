@@ -0,0 +1,32 @@
+import numpy as np
+
+from pewpew.lib import histogram
+
+
+def test_sample():
+    x = np.arange(100)
+    assert np.all(histogram.sample(x, 1000) == x)
+    s = histogram.sample(x, 10)
+    assert s.size == 10
+    assert np.all(np.isin(s, x))
+
+
+def test_histogram():
+    np.random.seed(8714623)
+    x = np.random.random(10000)
+
+    hist, edges = histogram.histogram(x, bins=20)
+    assert hist.size == 20
+    assert np.isclose(edges[0], np.percentile(x, 5))
+    assert np.isclose(edges[-1], np.percentile(x, 95))
+    assert np.sum(hist) == np.count_nonzero((x >= edges[0]) & (x <= edges[-1]))
+
+    hist, edges = histogram.histogram(x, bins=100, max_bins=50)
+    assert hist.size == 50
+    hist, edges = histogram.histogram(x, bins=10, min_bins=50)
+    assert hist.size == 50
+
+    # Estimated from a sample
+    hist, edges = histogram.histogram(x, bins="auto", max_samples=1000)
+    assert 16 <= hist.size <= 128
+    assert np.sum(hist) > 8000
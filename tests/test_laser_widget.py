@@ -1,13 +1,22 @@
 import numpy as np
 from pathlib import Path
+import tempfile
 from pytestqt.qtbot import QtBot
 from PySide2 import QtCore, QtGui, QtWidgets
 
 from pewlib.laser import Laser
 from pewlib.config import Config
 from pewlib.calibration import Calibration
+from pewlib.srr import SRRConfig, SRRLaser
 
-from pewpew.widgets.laser import LaserViewSpace, LaserComboBox
+from pewpew.lib import store
+from pewpew.lib.columnar import ColumnarLaser
+from pewpew.widgets.laser import (
+    LaserComboBox,
+    LaserPlaceholder,
+    LaserViewSpace,
+    LaserWidget,
+)
 
 from testing import rand_data
 
@@ -120,6 +129,7 @@ def test_laser_widget(qtbot: QtBot):
     view = viewspace.activeView()
     view.addLaser(Laser(x))
     widget = view.activeWidget()
+    assert isinstance(widget.laser, ColumnarLaser)
 
     widget.applyConfig(Config(1.0, 1.0, 1.0))
     assert widget.laser.config.spotsize == 1.0
@@ -138,10 +148,190 @@ def test_laser_widget(qtbot: QtBot):
     assert np.all(widget.laser.get("A1") == y)
     widget.transform(rotate="right")
     assert np.all(widget.laser.get("A1") == np.rot90(y, k=1, axes=(1, 0)))
+    assert widget.laser.data["A1"].flags.c_contiguous
     widget.transform(rotate="left")
     assert np.all(widget.laser.get("A1") == y)
 
 
+def test_laser_widget_planes(qtbot: QtBot):
+    viewspace = LaserViewSpace()
+    qtbot.addWidget(viewspace)
+    viewspace.show()
+    viewspace.options.calibrate = True
+    view = viewspace.activeView()
+    widget = view.addLaser(Laser(rand_data(["A1", "B2"])))
+    widget.applyCalibration({"A1": Calibration(0.0, 2.0)})
+
+    widget.refresh()
+    data = widget.graphics.data
+    assert np.allclose(data, widget.laser.data["A1"] / 2.0)
+
+    # Colour changes reuse the plane
+    viewspace.options.colortable = "grey"
+    widget.refresh()
+    assert widget.graphics.data is data
+
+    widget.applyCalibration({"A1": Calibration(0.0, 4.0)})
+    assert np.allclose(widget.graphics.data, widget.laser.data["A1"] / 4.0)
+
+    # Tools mark modified elements
+    widget.laser.data["A1"] = np.ones(widget.laser.shape, dtype=np.int32)
+    widget.setElementsModified(["A1"])
+    widget.refresh()
+    assert np.all(widget.graphics.data == 0.25)
+
+    widget.transform(flip="horizontal")
+    assert np.all(widget.graphics.data == 0.25)
+    widget.applyConfig(Config(2.0, 2.0, 2.0))
+    assert widget.graphics.data is not data
+
+    widget.renameIsotope("A1", "C3")
+    assert all(key[0] != "A1" for key in widget.planes.planes)
+
+
+def test_laser_widget_planes_srr(qtbot: QtBot):
+    viewspace = LaserViewSpace()
+    qtbot.addWidget(viewspace)
+    viewspace.show()
+    view = viewspace.activeView()
+    laser = SRRLaser(
+        [rand_data(["A1", "B2"]), rand_data(["A1", "B2"])],
+        config=SRRConfig(warmup=0.0),
+    )
+    widget = view.addLaser(laser)
+
+    # All elements are reconstructed once
+    widget.refresh()
+    assert [key[:2] for key in widget.planes.planes] == [("B2", None), ("A1", None)]
+    assert np.allclose(widget.graphics.data, laser.get("A1", flat=True))
+    widget.current_isotope = "B2"
+    assert np.allclose(widget.graphics.data, laser.get("B2", flat=True))
+    assert len(widget.planes.planes) == 2
+
+    widget.combo_layers.setCurrentIndex(2)
+    assert np.all(widget.graphics.data == laser.get("B2", layer=1, flat=True))
+
+    dlg = widget.actionStatistics()
+    assert np.allclose(dlg.selection.data["A1"], laser.get("A1", flat=True))
+    dlg.close()
+    dlg = widget.actionColocal()
+    dlg.close()
+
+
+def test_laser_widget_refresh_hidden(qtbot: QtBot):
+    viewspace = LaserViewSpace()
+    qtbot.addWidget(viewspace)
+    viewspace.show()
+    view = viewspace.activeView()
+    hidden = view.addLaser(Laser(rand_data(["A1", "B2"])))
+    widget = view.addLaser(Laser(rand_data(["A1", "B2"])))
+    hidden.setActive()
+    widget.setActive()
+    image = hidden.graphics.image
+
+    viewspace.options.items["colorbar"] = False
+    viewspace.applyCalibration({"A1": Calibration(1.0, 2.0)})
+    viewspace.refresh()
+    viewspace.setCurrentIsotope("B2")
+    assert not widget.graphics.colorbar.isVisible()
+    assert hidden.graphics.image is image
+    assert hidden.refresh_pending
+
+    # Redrawn once, with the latest options
+    hidden.setActive()
+    assert hidden.graphics.image is not image
+    assert not hidden.graphics.colorbar.isVisible()
+    assert hidden.graphics.label.text() == "B2"
+    image = hidden.graphics.image
+
+    # Not redrawn if unchanged
+    widget.setActive()
+    hidden.setActive()
+    assert hidden.graphics.image is image
+
+    # Released images are redrawn
+    widget.setActive()
+    hidden.graphics.releaseImage()
+    hidden.setActive()
+    assert hidden.graphics.image is not None
+
+
+def test_laser_widget_save_modified(qtbot: QtBot):
+    viewspace = LaserViewSpace()
+    qtbot.addWidget(viewspace)
+    viewspace.show()
+    view = viewspace.activeView()
+    view.addLaser(Laser(rand_data(["A1", "B2", "C3"])))
+    widget = view.activeWidget()
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        path = Path(tempdir, "laser.pew")
+        widget.saveDocument(path)
+        assert widget.laser.path == path
+
+        reader = store.LaserStore(path)
+        b2_chunk = reader.element_path("B2").joinpath("0.0.0")
+        b2_chunk.write_bytes(b"unchanged")
+        c3_chunk = reader.element_path("C3").joinpath("0.0.0")
+        c3_chunk.write_bytes(b"unchanged")
+
+        widget.laser.data["A1"] = 1.0
+        widget.setElementsModified(["A1"])
+        widget.renameIsotope("B2", "B3")
+        widget.laser.add("D4", np.zeros(widget.laser.shape))
+        assert widget.modified_elements == {"A1"}
+
+        widget.saveDocument(path)
+        assert widget.modified_elements == set()
+        assert b2_chunk.read_bytes() == b"unchanged"
+        assert c3_chunk.read_bytes() == b"unchanged"
+
+        reader = store.LaserStore(path)
+        assert reader.names == ["A1", "B3", "C3", "D4"]
+        assert np.all(reader.read("A1") == 1.0)
+        assert np.all(reader.read("D4") == 0.0)
+
+        # Transforms modify all elements
+        widget.transform(flip="horizontal")
+        assert widget.modified_elements == set(widget.laser.isotopes)
+
+
+def test_laser_view_placeholders(qtbot: QtBot):
+    viewspace = LaserViewSpace()
+    qtbot.addWidget(viewspace)
+    viewspace.show()
+    view = viewspace.activeView()
+
+    for name in ["a", "b", "c"]:
+        view.addPlaceholder(Laser(rand_data([name.upper()]), name=name))
+
+    # Only the shown tab is created
+    qtbot.waitUntil(lambda: isinstance(view.stack.widget(0), LaserWidget))
+    assert isinstance(view.stack.widget(1), LaserPlaceholder)
+    assert isinstance(view.stack.widget(2), LaserPlaceholder)
+    assert viewspace.uniqueIsotopes() == ["A", "B", "C"]
+
+    view.tabs.setCurrentIndex(2)
+    qtbot.waitUntil(lambda: isinstance(view.stack.widget(2), LaserWidget))
+    assert isinstance(view.stack.widget(1), LaserPlaceholder)
+    assert view.activeWidget().laser.name == "c"
+
+    # Release the image of the hidden widget
+    widget = view.stack.widget(0)
+    assert widget.graphics.image is not None
+    # The image shares memory with the buffers
+    graphics = widget.graphics
+    assert graphics.imageBytes() == graphics.buffers.nbytes + graphics.data.nbytes
+    viewspace.image_memory_limit = 0
+    viewspace.release_after = 0.0
+    viewspace.releaseInactiveImages()
+    assert widget.graphics.image is None
+    assert view.activeWidget().graphics.image is not None
+
+    view.tabs.setCurrentIndex(0)
+    assert widget.graphics.image is not None
+
+
 def test_laser_widget_combo(qtbot: QtBot):
     box = LaserComboBox()
     qtbot.addWidget(box)
@@ -195,6 +385,48 @@ def test_laser_widget_actions(qtbot: QtBot):
     )
 
     widget.actionCopySelectionText()
+    assert QtWidgets.QApplication.clipboard().text().count("\n") == 99
+    dlg = widget.actionSaveSelection()
+    dlg.close()
+    with tempfile.TemporaryDirectory() as tempdir:
+        widget.saveSelection(Path(tempdir, "selection.csv"))
+        assert np.loadtxt(Path(tempdir, "selection.csv")).shape == (10, 10)
+        widget.saveSelection(str(Path(tempdir, "selection.npy")))
+        assert np.load(Path(tempdir, "selection.npy")).shape == (10, 10)
+
+        # Unselected pixels are NaN, no selection is everything
+        mask = np.ones((10, 10), dtype=bool)
+        mask[:5] = False
+        widget.graphics.mask = mask
+        widget.saveSelection(Path(tempdir, "selection.csv"))
+        data = np.loadtxt(Path(tempdir, "selection.csv"))
+        assert data.shape == (5, 10)
+        mask[:] = False
+        mask[2, 2:4] = True
+        widget.graphics.mask = mask
+        widget.saveSelection(Path(tempdir, "selection.csv"))
+        assert np.loadtxt(Path(tempdir, "selection.csv")).shape == (2,)
+        mask[3, 2] = True
+        widget.graphics.mask = mask
+        widget.saveSelection(Path(tempdir, "selection.csv"))
+        data = np.loadtxt(Path(tempdir, "selection.csv"))
+        assert np.isnan(data[1, 1]) and not np.isnan(data[1, 0])
+        widget.graphics.mask = None
+        widget.saveSelection(Path(tempdir, "selection.csv"))
+        assert np.loadtxt(Path(tempdir, "selection.csv")).shape == (10, 10)
+        widget.graphics.mask = np.ones((10, 10), dtype=np.bool)
+
+    # Only selected values are copied, as a column
+    mask = np.zeros((10, 10), dtype=bool)
+    mask[1, 2:4] = True
+    mask[5, 5] = True
+    widget.graphics.mask = mask
+    widget.actionCopySelectionText()
+    text = QtWidgets.QApplication.clipboard().text()
+    assert text.count("\n") == 2
+    assert np.allclose(np.array(text.split(), dtype=float), widget.graphics.data[mask])
+    widget.graphics.mask = np.ones((10, 10), dtype=np.bool)
+
     widget.actionCropSelection()
     dlg = widget.actionStatisticsSelection()
     dlg.close()
@@ -0,0 +1,47 @@
+import logging
+import threading
+
+from PySide2 import QtWidgets
+from pytestqt.qtbot import QtBot
+
+from pewpew.log import LoggingDialog
+
+
+def test_logging_dialog(qtbot: QtBot):
+    dlg = LoggingDialog(capacity=10)
+    qtbot.addWidget(dlg)
+    dlg.show()
+
+    logger = logging.getLogger("test_logging_dialog")
+    logger.addHandler(dlg.handler)
+    logger.setLevel(logging.INFO)
+
+    with qtbot.waitSignal(dlg.handler.signal.new_records) as blocker:
+        for i in range(5):
+            logger.info(f"<message> {i}")
+    # Batched
+    assert len(blocker.args[0]) == 5
+    assert dlg.textedit.toPlainText().split("\n")[0].endswith("<message> 0")
+
+    # From a thread, only the last records are kept
+    thread = threading.Thread(
+        target=lambda: [logger.warning(f"warning {i}") for i in range(100)]
+    )
+    with qtbot.waitSignal(dlg.handler.signal.new_records):
+        thread.start()
+        thread.join()
+
+    assert len(dlg.handler.records) == 10
+    assert dlg.handler.records[0].getMessage() == "warning 90"
+    assert dlg.textedit.blockCount() == 10
+    assert dlg.textedit.toPlainText().split("\n")[-1].endswith("warning 99")
+
+    logger.removeHandler(dlg.handler)
+
+
+def test_logging_dialog_parent(qtbot: QtBot):
+    parent = QtWidgets.QWidget()
+    qtbot.addWidget(parent)
+    dlg = LoggingDialog(parent)
+    assert dlg.parent() is parent
+    assert dlg.textedit.maximumBlockCount() == 10000
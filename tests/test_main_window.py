@@ -1,5 +1,7 @@
 from pytestqt.qtbot import QtBot
 from pathlib import Path
+import subprocess
+import sys
 
 from pewlib.laser import Laser
 
@@ -98,3 +100,18 @@ def test_main_window_apply_dialogs(qtbot: QtBot):
     dlg.intValueSelected.emit(5)
     dlg.close()
     assert window.viewspace.options.font.pointSize() == 5
+
+
+def test_main_window_lazy_imports():
+    # Slow imports are deferred until first use
+    proc = subprocess.run(
+        [sys.executable, "-c", "import sys, pewpew.mainwindow; print(*sys.modules)"],
+        cwd=Path(__file__).parents[1],
+        stdout=subprocess.PIPE,
+        check=True,
+    )
+    modules = proc.stdout.decode().split()
+    assert "pewpew.mainwindow" in modules
+    assert "PySide2.QtCharts" not in modules
+    assert "pewpew.widgets.tools" not in modules
+    assert "pewpew.widgets.wizards" not in modules
@@ -3,9 +3,17 @@ from pytestqt.qtbot import QtBot
 
 from PySide2 import QtCore, QtGui, QtWidgets
 
+from pathlib import Path
+
+from pewlib.laser import Laser
+
 from pewpew.lib.numpyqt import NumpyArrayTableModel
+from pewpew.models import ExportJobTableModel
+from pewpew.threads import ExportJob, ExportScheduler
 from pewpew.widgets.modelviews import BasicTableView, BasicTable
 
+from testing import rand_data
+
 
 def test_basic_table_view(qtbot: QtBot):
     view = BasicTableView()
@@ -89,3 +97,25 @@ def test_basic_table(qtbot: QtBot):
     table.contextMenuEvent(
         QtGui.QContextMenuEvent(QtGui.QContextMenuEvent.Mouse, QtCore.QPoint(0, 0))
     )
+
+
+def test_export_job_table_model(qtbot: QtBot):
+    laser = Laser(rand_data("A1"), name="laser")
+    scheduler = ExportScheduler(
+        [ExportJob(laser, Path("a.csv"), "A1"), ExportJob(laser, Path("b.npz"))]
+    )
+    model = ExportJobTableModel(scheduler)
+
+    assert model.rowCount() == 2
+    assert model.columnCount() == 5
+    assert model.headerData(4, QtCore.Qt.Horizontal, QtCore.Qt.DisplayRole) == "Status"
+    assert model.data(model.index(0, 1)) == "A1"
+    assert model.data(model.index(1, 1)) == ""
+    assert model.data(model.index(0, 4)) == "Queued"
+
+    scheduler.jobs[0].status = "Failed"
+    scheduler.jobs[0].error = "error"
+    with qtbot.waitSignal(model.dataChanged):
+        scheduler.jobChanged.emit(0)
+    assert model.data(model.index(0, 4)) == "Failed"
+    assert model.data(model.index(0, 0), QtCore.Qt.ToolTipRole) == "error"
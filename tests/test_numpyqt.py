@@ -6,7 +6,9 @@ from pytestqt.qtbot import QtBot
 
 from pewpew.lib.numpyqt import (
     array_to_image,
+    array_to_mimedata,
     array_to_polygonf,
+    array_to_text,
     polygonf_to_array,
     NumpyArrayTableModel,
 )
@@ -48,6 +50,28 @@ def test_array_to_image():
     assert i.pixel(9, 9) == (255 << 24) + (99 << 16) + (99 << 8) + 99
 
 
+def test_array_to_text():
+    x = np.array([1.0, 0.5, 1.23456789012])
+    assert array_to_text(x) == "1\n0.5\n1.23456789"
+    assert array_to_text(x, fmt="%.2f") == "1.00\n0.50\n1.23"
+
+    x = np.arange(4).reshape(2, 2)
+    assert array_to_text(x, fmt="%d") == "0\t1\n2\t3"
+    assert array_to_text(x, fmt="%d", delimiter=",") == "0,1\n2,3"
+
+
+def test_array_to_mimedata(qtbot: QtBot):
+    mime = array_to_mimedata(np.array([1.0, 2.0]))
+    assert mime.text() == "1\n2"
+    assert mime.html().endswith("<table><tr><td>1</td></tr><tr><td>2</td></tr></table>")
+
+    mime = array_to_mimedata(np.arange(4).reshape(2, 2), fmt="%d")
+    assert mime.text() == "0\t1\n2\t3"
+    assert mime.html().endswith(
+        "<table><tr><td>0</td><td>1</td></tr><tr><td>2</td><td>3</td></tr></table>"
+    )
+
+
 def test_array_to_polygonf():
     x = np.stack((np.arange(10), np.arange(10)), axis=1)
     poly = array_to_polygonf(x)
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from pewlib.calibration import Calibration
+from pewlib.laser import Laser
+from pewlib.srr import SRRConfig, SRRLaser
+
+from pewpew.lib.planecache import PlaneCache, flatten_srr, laser_plane
+
+from testing import rand_data
+
+
+def test_plane_cache():
+    laser = Laser(
+        rand_data(["A1", "B2"]),
+        calibration={"A1": Calibration(1.0, 2.0), "B2": Calibration()},
+    )
+    cache = PlaneCache()
+
+    plane = cache.get(laser, "A1", calibrate=True)
+    assert np.allclose(plane, (laser.data["A1"] - 1.0) / 2.0)
+    assert cache.get(laser, "A1", calibrate=True) is plane
+    assert cache.get(laser, "A1", calibrate=False) is not plane
+    assert cache.nbytes == 2 * plane.nbytes
+
+    # Read only, but uncalibrated data is shared
+    with pytest.raises(ValueError):
+        plane[0, 0] = 0.0
+    assert np.shares_memory(cache.get(laser, "B2", calibrate=True), laser.data)
+
+    # Changed calibrations are not reused
+    laser.calibration["A1"] = Calibration(0.0, 4.0)
+    assert np.allclose(cache.get(laser, "A1", calibrate=True), laser.data["A1"] / 4.0)
+
+    cache.invalidate(["A1"])
+    assert all(key[0] == "B2" for key in cache.planes)
+    cache.get(laser, "A1", calibrate=False)
+
+    cache.rename({"A1": "C3"})
+    assert ("C3", None, None) in cache.planes
+
+    cache.invalidate()
+    assert len(cache.planes) == 0
+
+
+def test_plane_cache_limit(monkeypatch):
+    monkeypatch.setattr(PlaneCache, "max_planes", 2)
+    laser = Laser(rand_data(["A1", "B2", "C3"]))
+    cache = PlaneCache()
+
+    cache.get(laser, "A1", calibrate=False)
+    cache.get(laser, "B2", calibrate=False)
+    cache.get(laser, "A1", calibrate=False)
+    cache.get(laser, "C3", calibrate=False)
+    assert [key[0] for key in cache.planes] == ["A1", "C3"]
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        SRRConfig(warmup=0.0),
+        SRRConfig(spotsize=10.0, speed=10.0, scantime=0.5, warmup=1.0),
+        SRRConfig(spotsize=20.0, speed=10.0, scantime=1.0, warmup=0.0),
+        SRRConfig(warmup=0.0, subpixel_offsets=[[0, 3], [1, 3], [2, 3]]),
+    ],
+)
+def test_flatten_srr(config: SRRConfig):
+    mag = int(config.magnification)
+    shape = (3, 10, config._warmup + 10 * mag, 2)
+    data = np.random.random(shape).view([("A1", float), ("B2", float)])[..., 0]
+    laser = SRRLaser(list(data), config=config)
+    for name in laser.isotopes:
+        assert np.allclose(flatten_srr(laser, name), laser.get(name, flat=True))
+        for layer in range(laser.layers):
+            assert np.all(
+                laser_plane(laser, name, calibrate=False, layer=layer)
+                == laser.get(name, layer=layer, flat=True)
+            )
+
+
+def test_plane_cache_srr(monkeypatch):
+    laser = SRRLaser(
+        [rand_data(["A1", "B2", "C3"]), rand_data(["A1", "B2", "C3"])],
+        calibration={"A1": Calibration(1.0, 2.0)},
+        config=SRRConfig(warmup=0.0),
+    )
+    cache = PlaneCache()
+
+    cache.prefetch(laser, ["B2", "A1", "C3"], calibrate=True)
+    assert [key[0] for key in cache.planes] == ["C3", "A1", "B2"]
+    assert np.allclose(
+        cache.get(laser, "A1", calibrate=True),
+        laser.get("A1", calibrate=True, flat=True),
+    )
+
+    data = cache.structured(laser, calibrate=True)
+    assert data.dtype.names == ("A1", "B2", "C3")
+    for name in data.dtype.names:
+        assert np.allclose(data[name], laser.get(name, calibrate=True, flat=True))
+
+    # Only planes within the memory limit are computed
+    cache.clear()
+    nbytes = cache.get(laser, "A1", calibrate=False).nbytes
+    monkeypatch.setattr(PlaneCache, "max_bytes", nbytes * 2)
+    cache.prefetch(laser, ["B2", "C3"], calibrate=False)
+    assert [key[0] for key in cache.planes] == ["B2", "A1"]
+    cache.get(laser, "C3", calibrate=False)
+    assert [key[0] for key in cache.planes] == ["A1", "C3"]
@@ -0,0 +1,129 @@
+import json
+from pathlib import Path
+import tempfile
+import time
+
+from PySide2 import QtCore
+import pytest
+from pytestqt.qtbot import QtBot
+
+from pewlib.laser import Laser
+
+from pewpew.lib.profiler import profile, profiler, timed
+from pewpew.log import PerformanceDialog
+from pewpew.widgets.laser import LaserViewSpace
+
+from testing import rand_data
+
+
+def test_profiler():
+    @timed(category="test")
+    def func(x: int) -> int:
+        time.sleep(0.001)
+        return x * 2
+
+    profiler.clear()
+    assert func(2) == 4
+    with profile("block", "test", value=1):
+        pass
+    assert len(profiler.events) == 0
+
+    profiler.enable(trace_memory=True)
+    try:
+        assert func(3) == 6
+        with profile("block", "test", value=1):
+            data = bytearray(100000)
+    finally:
+        profiler.disable()
+    del data
+
+    assert len(profiler.events) == 2
+    summary = profiler.summary()
+    name = "test_profiler.<locals>.func"
+    assert summary[name]["count"] == 1
+    assert summary[name]["max"] > 0.001
+    assert summary["block"]["memory_delta"] >= 100000
+
+    trace = profiler.chromeTrace()
+    assert [event["name"] for event in trace["traceEvents"]] == [name, "block"]
+    assert trace["traceEvents"][1]["args"]["value"] == 1
+
+    with tempfile.NamedTemporaryFile() as tf:
+        profiler.saveChromeTrace(tf.name)
+        assert json.load(Path(tf.name).open()) == json.loads(json.dumps(trace))
+
+    profiler.clear()
+    assert len(profiler.summary()) == 0
+
+
+def test_profiler_timed_slot(qtbot: QtBot):
+    class Emitter(QtCore.QObject):
+        changed = QtCore.Signal(int, str)
+
+    class Receiver(QtCore.QObject):
+        def __init__(self):
+            super().__init__()
+            self.calls = []
+
+        @timed(category="test")
+        def refresh(self) -> None:
+            self.calls.append(())
+
+        @timed(category="test")
+        def update(self, *args) -> None:
+            self.calls.append(args)
+
+    emitter = Emitter()
+    receiver = Receiver()
+    emitter.changed.connect(receiver.refresh)
+    emitter.changed.connect(receiver.update)
+
+    profiler.clear()
+    profiler.enable()
+    try:
+        emitter.changed.emit(1, "a")
+    finally:
+        profiler.disable()
+
+    # Extra arguments are only passed to functions taking *args
+    assert receiver.calls == [(), (1, "a")]
+    assert profiler.summary()["test_profiler_timed_slot.<locals>.Receiver.refresh"]
+
+    # Functions that are not slots are not truncated
+    @timed(category="test")
+    def func(x: int) -> int:
+        return x
+
+    with pytest.raises(TypeError):
+        func(1, 2)
+
+
+def test_performance_dialog(qtbot: QtBot):
+    viewspace = LaserViewSpace()
+    qtbot.addWidget(viewspace)
+    viewspace.show()
+
+    dlg = PerformanceDialog()
+    qtbot.addWidget(dlg)
+    dlg.show()
+
+    profiler.clear()
+    dlg.check_enabled.setChecked(True)
+    assert profiler.enabled
+    try:
+        viewspace.views[0].addLaser(Laser(rand_data(["A1", "B2"])))
+        viewspace.refresh()
+    finally:
+        dlg.check_enabled.setChecked(False)
+    assert not profiler.enabled
+
+    dlg.refresh()
+    assert dlg.table.rowCount() > 0
+    names = [dlg.table.item(i, 0).text() for i in range(dlg.table.rowCount())]
+    assert "LaserGraphicsView.drawLaser" in names
+
+    dlg.clear()
+    assert dlg.table.rowCount() == 0
+
+    export = dlg.dialogExportTrace()
+    export.close()
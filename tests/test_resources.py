@@ -0,0 +1,56 @@
+from pathlib import Path
+import tempfile
+
+import pytest
+from PySide2 import QtCore
+
+from pewpew import resources
+
+build_rcc = pytest.importorskip("scripts.build_rcc")
+
+
+def test_build_rcc():
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = build_rcc.build_rcc(output=Path(tmp))
+        assert [path.name for path in paths] == ["icons.rcc", "app_icon.rcc"]
+
+        for path in paths:
+            assert path.read_bytes()[:8] == b"qres\x00\x00\x00\x03"
+            assert QtCore.QResource.registerResource(str(path), "/test_rcc")
+
+        assert QtCore.QFile.exists(":/test_rcc/app.ico")
+        assert QtCore.QFile.exists(":/test_rcc/icons/breeze/index.theme")
+        svgs = QtCore.QDir(":/test_rcc/icons/breeze/actions/16").entryList()
+        assert len(svgs) > 0
+
+        # Same contents as the generated module
+        resources.register("icons")
+        path = "icons/breeze/actions/16/" + svgs[0]
+        with_rcc = QtCore.QFile(":/test_rcc/" + path)
+        with_module = QtCore.QFile(":/" + path)
+        assert with_rcc.open(QtCore.QIODevice.ReadOnly)
+        assert with_module.open(QtCore.QIODevice.ReadOnly)
+        assert with_rcc.readAll() == with_module.readAll()
+        with_rcc.close()
+        with_module.close()
+
+        for path in paths:
+            QtCore.QResource.unregisterResource(str(path), "/test_rcc")
+
+
+def test_register(monkeypatch):
+    registered = []
+    monkeypatch.setattr(resources, "_registered", set())
+    monkeypatch.setattr(
+        QtCore.QResource,
+        "registerResource",
+        lambda path: registered.append(Path(path).name) or True,
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        monkeypatch.setattr(resources, "__file__", str(Path(tmp, "__init__.py")))
+        build_rcc.build_rcc(["app_icon"], output=Path(tmp))
+
+        resources.register("app_icon")
+        resources.register("app_icon")
+        assert registered == ["app_icon.rcc"]
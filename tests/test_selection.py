@@ -0,0 +1,147 @@
+import numpy as np
+import pytest
+
+from pewpew.lib.selection import RunMask, SelectionView
+
+
+def test_run_mask():
+    mask = np.zeros((5, 6), dtype=bool)
+    mask[1, 2] = True
+    mask[2, 4:] = True
+    mask[3, :3] = True  # joins the run of row 2
+
+    runs = RunMask.from_array(mask)
+    assert runs.shape == (5, 6)
+    assert np.all(runs.edges == [8, 9, 16, 21])
+    assert runs.count == 6
+    assert runs.nbytes == 32
+    assert RunMask.from_array(runs) is runs
+    assert np.all(runs.to_array() == mask)
+    assert runs.to_array(np.uint8).dtype == np.uint8
+    assert np.all(np.asarray(runs) == mask)
+    assert all(np.all(a == b) for a, b in zip(runs.nonzero(), np.nonzero(mask)))
+
+    assert runs.contains(1, 2)
+    assert runs.contains(3, 0)
+    assert not runs.contains(1, 3)
+    assert not runs.contains(-1, 2)
+    assert not runs.contains(1, 8)
+
+    empty = RunMask((5, 6))
+    assert empty.count == 0
+    assert not np.any(empty.to_array())
+    assert empty.nonzero()[0].size == 0
+
+    # Part of a mask
+    runs = RunMask.from_array(mask[1:4, 2:], offset=(1, 2), shape=(5, 6))
+    assert np.all(runs.to_array() == mask & (np.arange(6) >= 2))
+
+
+def test_run_mask_rect():
+    runs = RunMask.from_rect((5, 6), (1, 3), (2, 5))
+    assert runs.edges.size == 4
+
+    mask = np.zeros((5, 6), dtype=bool)
+    mask[1:3, 2:5] = True
+    assert np.all(runs.to_array() == mask)
+
+    # Whole rows are a single run
+    runs = RunMask.from_rect((5, 6), (1, 3), (0, 6))
+    assert np.all(runs.edges == [6, 18])
+
+    # Clipped to the image
+    runs = RunMask.from_rect((5, 6), (-2, 2), (4, 10))
+    mask = np.zeros((5, 6), dtype=bool)
+    mask[:2, 4:] = True
+    assert np.all(runs.to_array() == mask)
+    assert RunMask.from_rect((5, 6), (2, 2), (0, 6)).count == 0
+
+    # Few runs in a large image are rasterised by slices
+    runs = RunMask.from_rect((64, 64), (8, 16), (4, 60))
+    mask = np.zeros((64, 64), dtype=bool)
+    mask[8:16, 4:60] = True
+    assert np.all(runs.to_array() == mask)
+    assert np.all(runs.to_array(np.uint8) == mask)
+
+
+def test_run_mask_set_operations():
+    np.random.seed(7312)
+    for _ in range(20):
+        a = np.random.random((7, 9)) > 0.5
+        b = np.random.random((7, 9)) > 0.3
+        ra, rb = RunMask.from_array(a), RunMask.from_array(b)
+
+        for runs, expected in [
+            (ra.union(rb), a | b),
+            (ra.intersection(rb), a & b),
+            (ra.difference(rb), a & ~b),
+            (ra.symmetric_difference(rb), a ^ b),
+            (ra | b, a | b),
+            (ra & rb, a & b),
+            (ra - rb, a & ~b),
+            (ra ^ rb, a ^ b),
+        ]:
+            assert np.all(runs.to_array() == expected)
+            assert np.all(np.diff(runs.edges) > 0)  # no empty or touching runs
+
+    with pytest.raises(ValueError):
+        ra.union(RunMask((9, 7)))
+
+
+def test_selection_view():
+    data = np.empty((5, 6), dtype=[("a", float), ("b", float)])
+    data["a"] = np.arange(30).reshape(5, 6)
+    data["b"] = -data["a"]
+
+    view = SelectionView(data)
+    assert view.names == ("a", "b")
+    assert view.bounds == (0, 5, 0, 6)
+    assert view.shape == (5, 6)
+    assert view.size == 30
+    assert view.mask is None
+    assert np.all(view["a"] == np.arange(30))
+
+    mask = np.zeros((5, 6), dtype=bool)
+    mask[1, 2] = True
+    mask[3, 1:4] = True
+
+    view = SelectionView(data, mask)
+    assert view.bounds == (1, 4, 1, 4)
+    assert view.shape == (3, 3)
+    assert view.size == 4
+    assert np.all(view.mask == mask)
+    assert np.all(view["a"] == [8, 19, 20, 21])
+    assert np.all(view.get("b") == [-8, -19, -20, -21])
+    assert view.get("a") is view.get("a")  # cached
+
+    crop = view.crop()
+    assert crop.shape == (3, 3)
+    assert np.count_nonzero(np.isnan(crop["a"])) == 5
+    assert np.all(crop["b"][~np.isnan(crop["b"])] == [-8, -19, -20, -21])
+    # Source is unchanged
+    assert not np.any(np.isnan(data["a"]))
+
+    view = SelectionView(data, np.zeros((5, 6), dtype=bool))
+    assert view.size == 0
+    assert view.shape == (0, 0)
+
+    view = SelectionView(data, RunMask.from_array(mask))
+    assert view.bounds == (1, 4, 1, 4)
+    assert np.all(view.mask == mask)
+    assert np.all(view["a"] == [8, 19, 20, 21])
+
+
+def test_selection_view_crop_integer():
+    data = np.zeros((4, 4), dtype=[("a", np.uint16), ("b", np.float32)])
+    data["a"] = np.arange(16).reshape(4, 4)
+    mask = np.zeros((4, 4), dtype=bool)
+    mask[1, 1:3] = True
+    mask[2, 1] = True
+
+    crop = SelectionView(data, mask).crop()
+    assert crop.dtype["a"] == np.float64  # promoted for NaN
+    assert crop.dtype["b"] == np.float32
+    assert np.array_equal(crop["a"], [[5, 6], [9, np.nan]], equal_nan=True)
+
+    # No selection is not promoted
+    assert SelectionView(data).crop().dtype == data.dtype
@@ -0,0 +1,165 @@
+import base64
+import numpy as np
+from pathlib import Path
+import tempfile
+from pytestqt.qtbot import QtBot
+
+from pewlib import io
+from pewlib.calibration import Calibration
+from pewlib.config import Config
+from pewlib.laser import Laser
+
+from pewpew.lib import session
+from pewpew.lib.selection import RunMask
+from pewpew.widgets.laser import LaserPlaceholder, LaserViewSpace, LaserWidget
+
+from testing import rand_data
+
+
+def test_session_mask():
+    mask = np.zeros((7, 9), dtype=bool)
+    assert session.mask_to_dict(mask) is None
+    assert session.mask_from_dict(None) is None
+
+    mask[2:5, 3:8] = True
+    state = session.mask_to_dict(RunMask.from_array(mask))
+    assert "edges" in state
+    runs = session.mask_from_dict(state)
+    assert isinstance(runs, RunMask)
+    assert np.all(runs.edges == RunMask.from_array(mask).edges)
+    assert np.all(session.mask_from_dict(session.mask_to_dict(mask)).to_array() == mask)
+    assert session.mask_to_dict(RunMask((7, 9))) is None
+
+    # Version 1 sessions store packed bits
+    bits = base64.b64encode(np.packbits(mask, axis=None)).decode()
+    runs = session.mask_from_dict({"shape": [7, 9], "bits": bits})
+    assert np.all(runs.to_array() == mask)
+
+
+def test_session_save_restore(qtbot: QtBot):
+    viewspace = LaserViewSpace()
+    qtbot.addWidget(viewspace)
+    viewspace.show()
+    viewspace.splitActiveHorizontal()
+
+    viewspace.options.colortable = "magma"
+    viewspace.options.set_colorrange("B2", (1.0, "95%"))
+    viewspace.applyConfig(Config(20.0, 40.0, 0.1))
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        # Saved and unsaved lasers
+        saved = Laser(rand_data(["A1", "B2"]), name="saved")
+        io.npz.save(Path(tempdir, "saved.npz"), saved)
+        saved = io.npz.load(Path(tempdir, "saved.npz"))
+
+        widget = viewspace.views[0].addLaser(saved)
+        widget.current_isotope = "B2"
+        mask = np.zeros((10, 10), dtype=bool)
+        mask[:5] = True
+        widget.graphics.drawSelectionImage(mask, [])
+        viewspace.views[0].addLaser(
+            Laser(rand_data(["C3"]), name="unsaved", path=Path(tempdir, "x.csv"))
+        )
+        viewspace.views[1].addLaser(
+            Laser(rand_data(["D4"]), name="other", path=Path(tempdir, "y.csv"))
+        )
+        viewspace.views[0].tabs.setCurrentIndex(1)
+
+        path = Path(tempdir, "test.pewsession")
+        viewspace.saveSession(path)
+
+        # Only unsaved lasers are cached
+        tabs = list(session.tab_states(session.load(path)["layout"]))
+        assert [tab["name"] for tab in tabs] == ["saved", "unsaved", "other"]
+        assert "data" not in tabs[0]
+        assert len(list(session.cache_dir(path).iterdir())) == 2
+
+        restored = LaserViewSpace()
+        qtbot.addWidget(restored)
+        restored.show()
+        restored.restoreSession(path)
+
+        assert len(restored.views) == 2
+        assert restored.config.speed == 40.0
+        assert restored.options.colortable == "magma"
+        assert restored.options.get_colorrange("B2") == (1.0, "95%")
+        assert restored.uniqueIsotopes() == ["A1", "B2", "C3", "D4"]
+
+        # Visible tabs are replaced, hidden tabs are not loaded
+        view = restored.views[0]
+        placeholder = view.stack.widget(0)
+        assert isinstance(placeholder, LaserPlaceholder)
+        assert not placeholder.is_loaded
+        qtbot.waitUntil(lambda: isinstance(view.stack.widget(1), LaserWidget))
+        assert view.stack.currentIndex() == 1
+        assert view.stack.widget(1).laser.name == "unsaved"
+
+        placeholder.applyCalibration({"A1": Calibration(2.0, 3.0)})
+        assert not placeholder.is_loaded
+        assert placeholder.modified
+
+        view.tabs.setCurrentIndex(0)
+        qtbot.waitUntil(lambda: isinstance(view.stack.widget(0), LaserWidget))
+        widget = view.stack.widget(0)
+        assert widget.modified
+        assert widget.current_isotope == "B2"
+        assert widget.laser.calibration["A1"].gradient == 3.0
+        assert np.all(widget.graphics.mask == mask)
+
+        # Resaving only caches the modified and unsaved lasers
+        restored.saveSession(path)
+        assert len(list(session.cache_dir(path).iterdir())) == 3
+
+
+def test_session_restore_refused(qtbot: QtBot, monkeypatch):
+    viewspace = LaserViewSpace()
+    qtbot.addWidget(viewspace)
+    viewspace.show()
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        path = Path(tempdir, "test.pewsession")
+        viewspace.views[0].addLaser(
+            Laser(rand_data(["A1"]), name="a", path=Path(tempdir, "a.csv"))
+        )
+        viewspace.saveSession(path)
+
+        widget = viewspace.views[0].addLaser(Laser(rand_data(["B2"]), name="b"))
+        viewspace.options.colortable = "grey"
+        monkeypatch.setattr(widget, "requestClose", lambda: False)
+
+        assert not viewspace.restoreSession(path)
+        assert viewspace.views[0].tabs.count() == 2
+        assert widget in viewspace.views[0].widgets()
+        assert viewspace.options.colortable == "grey"
+
+        monkeypatch.setattr(widget, "requestClose", lambda: True)
+        assert viewspace.restoreSession(path)
+        assert viewspace.views[0].tabs.count() == 1
+        assert viewspace.options.colortable == "viridis"
+
+
+def test_session_placeholder_load_error(qtbot: QtBot):
+    viewspace = LaserViewSpace()
+    qtbot.addWidget(viewspace)
+    viewspace.show()
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        laser = Laser(rand_data(["A1"]), name="saved")
+        io.npz.save(Path(tempdir, "saved.npz"), laser)
+        laser = io.npz.load(Path(tempdir, "saved.npz"))
+        viewspace.views[0].addLaser(laser)
+
+        path = Path(tempdir, "test.pewsession")
+        viewspace.saveSession(path)
+        Path(tempdir, "saved.npz").unlink()
+
+        restored = LaserViewSpace()
+        qtbot.addWidget(restored)
+        restored.restoreSession(path)
+        placeholder = restored.views[0].stack.widget(0)
+        assert isinstance(placeholder, LaserPlaceholder)
+
+        # Missing file closes the tab
+        assert placeholder.materialise() is None
+        assert restored.views[0].tabs.count() == 0
+        assert restored.activeWidget() is None
@@ -0,0 +1,158 @@
+from pathlib import Path
+import tempfile
+
+import numpy as np
+import pytest
+
+from pewlib.calibration import Calibration
+from pewlib.config import Config
+from pewlib.laser import Laser
+from pewlib.srr import SRRLaser, SRRConfig
+
+from pewpew.lib import store
+from pewpew.lib.columnar import ColumnarLaser
+from pewpew.threads import import_path
+
+from testing import rand_data
+
+
+def test_store_save_load():
+    laser = Laser(
+        rand_data(["A1", "B2", "C/3"]),
+        calibration={"A1": Calibration(1.0, 2.0, unit="ppm")},
+        config=Config(10.0, 20.0, 0.5),
+        name="laser",
+    )
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        path = Path(tempdir, "laser.pew")
+        store.save(path, laser, chunks=(4, 3))
+        assert store.is_valid_directory(path)
+
+        loaded = store.load(path)
+        assert loaded.name == "laser"
+        assert loaded.isotopes == laser.isotopes
+        assert np.all(loaded.data == laser.data)
+        assert loaded.config.speed == 20.0
+        assert loaded.calibration["A1"].gradient == 2.0
+        assert loaded.calibration["A1"].unit == "ppm"
+
+        # Partial reads
+        partial = store.load(path, names=["B2"])
+        assert partial.isotopes == ("B2",)
+        reader = store.LaserStore(path)
+        assert np.all(
+            reader.read("C/3", region=(3, 9, 2, 7)) == laser.data["C/3"][3:9, 2:7]
+        )
+
+        # Opened from directory or metadata
+        assert import_path(path, Config()).isotopes == laser.isotopes
+        assert import_path(path.joinpath("meta.json"), Config()).name == "laser"
+
+    with pytest.raises(FileNotFoundError):
+        store.LaserStore(Path(tempdir))
+
+
+def test_store_columnar():
+    laser = ColumnarLaser(rand_data(["A1", "B2"]), name="laser")
+    with tempfile.TemporaryDirectory() as tempdir:
+        path = Path(tempdir, "laser.pew")
+        store.save(path, laser, chunks=(4, 3))
+        assert store.LaserStore(path).meta["_class"] == "Laser"
+
+        loaded = store.load(path)
+        assert np.all(loaded.data == laser.data.to_structured())
+
+        # Unchanged elements are kept when saving again
+        keys = store.LaserStore(path).elements
+        laser.data["B2"] = 0.0
+        store.save(path, laser, modified=["B2"], chunks=(4, 3))
+        assert store.LaserStore(path).elements["A1"] == keys["A1"]
+        assert np.all(store.load(path).data["B2"] == 0.0)
+
+
+def test_store_save_incremental():
+    laser = Laser(rand_data(["A1", "B2", "C3"]), name="laser")
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        path = Path(tempdir, "laser.pew")
+        store.save(path, laser, chunks=(5, 5))
+
+        reader = store.LaserStore(path)
+        b2_chunk = reader.element_path("B2").joinpath("0.0.0")
+        b2_chunk.write_bytes(b"unchanged")
+
+        laser.data["A1"] += 1.0
+        laser.remove("C3")
+        laser.add("D4", np.ones(laser.shape))
+        store.save(path, laser, modified=["A1"], chunks=(5, 5))
+
+        # Unmodified element not written
+        assert b2_chunk.read_bytes() == b"unchanged"
+        assert not reader.element_path("C3").exists()
+
+        reader = store.LaserStore(path)
+        assert reader.names == ["A1", "B2", "D4"]
+        assert np.all(reader.read("A1") == laser.data["A1"])
+        assert np.all(reader.read("D4") == 1.0)
+
+        # Renamed elements keep their data
+        laser.rename({"B2": "B3"})
+        store.save(path, laser, modified=[], renamed={"B2": "B3"}, chunks=(5, 5))
+        assert b2_chunk.read_bytes() == b"unchanged"
+        assert store.LaserStore(path).element_path("B3").joinpath("0.0.0") == b2_chunk
+
+        # Incompatible shape rewrites everything
+        laser = Laser(rand_data(["A1"])[:5], name="laser")
+        store.save(path, laser, modified=[], chunks=(5, 5))
+        assert np.all(store.load(path).data == laser.data)
+
+
+def test_store_save_interrupted(monkeypatch):
+    laser = Laser(rand_data(["A1", "B2"]), name="laser")
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        path = Path(tempdir, "laser.pew")
+        store.save(path, laser, chunks=(5, 5))
+        previous = laser.data.copy()
+        a1_path = store.LaserStore(path).element_path("A1")
+
+        # Fail after writing chunks, before the metadata
+        def fail(*args, **kwargs):
+            raise OSError("interrupted")
+
+        laser.data["A1"] += 1.0
+        with monkeypatch.context() as m:
+            m.setattr(store.json, "dump", fail)
+            with pytest.raises(OSError):
+                store.save(path, laser, modified=["A1"], chunks=(5, 5))
+        assert np.all(store.load(path).data == previous)
+
+        # Incompatible shape
+        with monkeypatch.context() as m:
+            m.setattr(store.json, "dump", fail)
+            with pytest.raises(OSError):
+                store.save(path, Laser(rand_data(["A1"])[:5]), chunks=(5, 5))
+        assert np.all(store.load(path).data == previous)
+
+        # Next save cleans up
+        store.save(path, laser, modified=["A1"], chunks=(5, 5))
+        assert np.all(store.load(path).data == laser.data)
+        assert not a1_path.exists()
+        assert len(list(path.joinpath("elements").iterdir())) == 2
+
+
+def test_store_srr():
+    layers = [[np.random.random((5, 10)) for i in range(2)] for j in range(2)]
+    laser = SRRLaser.from_list(
+        ["A1", "B2"], layers, config=SRRConfig(10.0, 10.0, 0.5, warmup=0.0)
+    )
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        path = Path(tempdir, "srr.pew")
+        store.save(path, laser, chunks=(2, 4))
+        loaded = store.load(path)
+
+        assert isinstance(loaded, SRRLaser)
+        assert loaded.config.warmup == 0.0
+        assert all(np.all(a == b) for a, b in zip(loaded.data, laser.data))
@@ -1,9 +1,21 @@
 from pytestqt.qtbot import QtBot
 from pathlib import Path
+import json
+import tempfile
 
+import numpy as np
+
+from pewlib import io
 from pewlib.config import Config
+from pewlib.calibration import Calibration
+from pewlib.laser import Laser
+from pewlib.srr import SRRLaser
+
+from pewpew.graphics.options import GraphicsOptions
+from pewpew.lib.columnar import ColumnarLaser
+from pewpew.threads import ExportJob, ExportScheduler, ImportThread, laser_snapshot
 
-from pewpew.threads import ImportThread
+from testing import rand_data
 
 
 def test_import_thread(qtbot: QtBot):
@@ -24,9 +36,123 @@ def test_import_thread(qtbot: QtBot):
     with qtbot.waitSignals(signals):
         thread.run()
 
+    # Reduced storage
+    paths = [path.joinpath("textimage", "csv.csv"), path.joinpath("npz", "test.npz")]
+    lasers = []
+    thread = ImportThread(paths, Config(), storage="float32")
+    thread.importFinished.connect(lasers.append)
+    thread.run()
+    assert all(isinstance(laser, ColumnarLaser) for laser in lasers)
+    assert all(
+        x == np.float32 for laser in lasers for x, _ in laser.data.dtype.fields.values()
+    )
+
     # Failing import
     paths = [path.joinpath("fake", "data.npz")]
     thread = ImportThread(paths, Config())
 
     with qtbot.waitSignal(thread.importFailed):
         thread.run()
+
+
+def test_laser_snapshot():
+    laser = Laser(
+        rand_data(["A1", "B2"]),
+        calibration={"A1": Calibration(1.0, 2.0)},
+        config=Config(spotsize=10.0),
+        name="laser",
+    )
+    snapshot = laser_snapshot(laser)
+    assert snapshot.isotopes == ("A1", "B2")
+    assert snapshot.name == "laser"
+
+    single = laser_snapshot(laser, "B2")
+    assert single.isotopes == ("B2",)
+    assert single.data.itemsize == 8
+    assert np.all(single.data["B2"] == laser.data["B2"])
+
+    # Edits to the laser are not seen
+    laser.data["A1"] = 0.0
+    laser.calibration["A1"].gradient = 3.0
+    laser.config.spotsize = 20.0
+    assert not np.all(snapshot.data["A1"] == 0.0)
+    assert snapshot.calibration["A1"].gradient == 2.0
+    assert snapshot.config.spotsize == 10.0
+
+    # Columnar lasers are copied to pewlib lasers
+    columnar = laser_snapshot(ColumnarLaser.from_laser(laser), "B2")
+    assert type(columnar) == Laser
+    assert columnar.data.dtype.names == ("B2",)
+    assert np.all(columnar.data["B2"] == laser.data["B2"])
+
+    srr = SRRLaser([rand_data(["A1", "B2"]), rand_data(["A1", "B2"])])
+    single = laser_snapshot(srr, "A1")
+    assert isinstance(single, SRRLaser)
+    assert single.layers == 2
+    assert single.isotopes == ("A1",)
+
+
+def test_export_job():
+    laser = Laser(rand_data(["A1", "B2"]), name="laser")
+    with tempfile.TemporaryDirectory() as tempdir:
+        path = Path(tempdir, "laser_A1.csv")
+        ExportJob(laser, path, "A1", calibrate=False).run()
+        # Same as pewlib
+        io.textimage.save(Path(tempdir, "pewlib.csv"), laser.get("A1"))
+        assert path.read_text() == Path(tempdir, "pewlib.csv").read_text()
+        assert np.allclose(io.textimage.load(path), laser.get("A1"))
+
+        ExportJob(laser, Path(tempdir, "laser.npz")).run()
+        assert io.npz.load(Path(tempdir, "laser.npz")).isotopes == laser.isotopes
+
+        ExportJob(laser, Path(tempdir, "laser.pew")).run()
+        assert Path(tempdir, "laser.pew", "meta.json").exists()
+
+        ExportJob(laser, Path(tempdir, "laser.vti"), spacing=(1.0, 1.0, 1.0)).run()
+        assert Path(tempdir, "laser.vti").exists()
+
+        ExportJob(
+            laser, Path(tempdir, "laser.png"), "B2", options=GraphicsOptions()
+        ).run()
+        assert Path(tempdir, "laser.png").exists()
+
+
+def test_export_scheduler(qtbot: QtBot):
+    lasers = [Laser(rand_data(["A1", "B2"]), name=f"laser{i}") for i in range(5)]
+    with tempfile.TemporaryDirectory() as tempdir:
+        jobs = [
+            ExportJob(laser, Path(tempdir, f"{laser.name}_{isotope}.csv"), isotope)
+            for laser in lasers
+            for isotope in laser.isotopes
+        ]
+        # Unknown element fails
+        jobs.append(ExportJob(lasers[0], Path(tempdir, "failed.csv"), "C3"))
+
+        scheduler = ExportScheduler(jobs, max_workers=2)
+        assert scheduler.max_queued == 4
+        with qtbot.waitSignal(scheduler.finished, timeout=5000):
+            scheduler.start()
+
+        assert not scheduler.isRunning()
+        assert scheduler.completed() == 11
+        assert scheduler.count("Done") == 10
+        assert scheduler.count("Failed") == 1
+        assert jobs[-1].error != ""
+        assert all(job.path.exists() for job in jobs[:-1])
+
+        # Retry the failed job
+        lasers[0].add("C3", np.random.random(lasers[0].shape))
+        with qtbot.waitSignal(scheduler.finished, timeout=5000):
+            scheduler.retry()
+        assert scheduler.count("Done") == 11
+
+        scheduler.writeManifest(Path(tempdir, "manifest.json"))
+        manifest = json.loads(Path(tempdir, "manifest.json").read_text())
+        assert manifest["done"] == 11
+        assert manifest["jobs"][-1]["path"] == str(Path(tempdir, "failed.csv"))
+
+    # Cancel before any jobs are run
+    jobs = [ExportJob(lasers[0], Path(f"{i}.csv"), "A1") for i in range(4)]
+    scheduler = ExportScheduler(jobs, max_workers=1)
+    scheduler.cancel()
+    assert scheduler.count("Canceled") == 4
@@ -140,6 +140,36 @@ def test_view_tabs(qtbot: QtBot):
     assert len(view.widgets()) == 0
 
 
+def test_view_refresh_hidden(qtbot: QtBot):
+    viewspace = ViewSpace()
+    qtbot.addWidget(viewspace)
+    viewspace.show()
+    view = viewspace.activeView()
+    widgets = [_TestViewWidget(i, view) for i in range(2)]
+    refreshes = [0, 0]
+    for widget in widgets:
+        view.addTab(str(widget.idx), widget)
+        widget.refreshed.connect(
+            lambda i=widget.idx: refreshes.__setitem__(i, refreshes[i] + 1)
+        )
+
+    # Only the visible widget is refreshed, the hidden once when shown
+    viewspace.refresh()
+    viewspace.refresh()
+    assert refreshes == [2, 0]
+    assert widgets[1].refresh_pending
+
+    widgets[1].setActive()
+    assert refreshes == [2, 1]
+    assert not widgets[1].refresh_pending
+
+    widgets[0].setActive()
+    assert refreshes == [2, 1]
+
+    viewspace.refresh(visible=True)
+    assert refreshes == [3, 1]
+
+
 def test_view_tab_bar(qtbot: QtBot):
     viewspace = ViewSpace()
     qtbot.addWidget(viewspace)
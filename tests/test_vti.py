@@ -0,0 +1,90 @@
+from pathlib import Path
+import re
+import tempfile
+import zlib
+
+import numpy as np
+import pytest
+
+from pewlib import io
+from pewlib.calibration import Calibration
+from pewlib.laser import Laser
+from pewlib.srr import SRRLaser, SRRConfig
+
+from pewpew.lib import vti
+
+from testing import rand_data
+
+
+def read_zlib_arrays(path: Path) -> dict:
+    text = path.read_bytes()
+    header, data = text.split(b'<AppendedData encoding="raw">\n_', 1)
+    names = re.findall(rb'Name="(\w+)"', header)
+    offsets = [int(x) for x in re.findall(rb'offset="(\d+)"', header)]
+
+    arrays = {}
+    for name, offset in zip(names, offsets):
+        nblocks = int(np.frombuffer(data, np.uint64, 1, offset)[0])
+        sizes = np.frombuffer(data, np.uint64, 3 + nblocks, offset)
+        pos = offset + (3 + nblocks) * 8
+        raw = b""
+        for size in sizes[3:].astype(int):
+            raw += zlib.decompress(data[pos : pos + size])
+            pos += size
+        arrays[name.decode()] = np.frombuffer(raw, np.float64)
+    return arrays
+
+
+def test_vti_save():
+    laser = Laser(
+        rand_data(["A1", "B2"]),
+        calibration={"A1": Calibration(1.0, 2.0)},
+    )
+    spacing = (1.0, 2.0, -3.0)
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        # Same as pewlib
+        io.vtk.save(Path(tempdir, "pewlib.vti"), laser.get(calibrate=True), spacing)
+        vti.save(Path(tempdir, "raw.vti"), laser, spacing, block_size=80)
+        assert (
+            Path(tempdir, "raw.vti").read_bytes()
+            == Path(tempdir, "pewlib.vti").read_bytes()
+        )
+
+        # Compressed, multiple blocks
+        vti.save(
+            Path(tempdir, "zlib.vti"),
+            laser,
+            spacing,
+            calibrate=False,
+            compression="zlib",
+            block_size=240,
+        )
+        assert (
+            b'compressor="vtkZLibDataCompressor"'
+            in Path(tempdir, "zlib.vti").read_bytes()
+        )
+        arrays = read_zlib_arrays(Path(tempdir, "zlib.vti"))
+        for name in laser.isotopes:
+            assert np.all(arrays[name] == laser.data[name][::-1].ravel())
+
+        with pytest.raises(ValueError):
+            vti.save(Path(tempdir, "fail.vti"), laser, spacing, compression="fake")
+
+
+def test_vti_save_srr():
+    layers = [[np.random.random((5, 10)) for i in range(2)] for j in range(2)]
+    laser = SRRLaser.from_list(
+        ["A1", "B2"], layers, config=SRRConfig(10.0, 10.0, 0.5, warmup=0.0)
+    )
+    spacing = (1.0, 1.0, -10.0)
+
+    assert np.all(vti.element_volume(laser, "B2") == laser.get("B2"))
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        io.vtk.save(Path(tempdir, "pewlib.vti"), laser.get(calibrate=True), spacing)
+        vti.save(Path(tempdir, "raw.vti"), laser, spacing)
+        assert (
+            Path(tempdir, "raw.vti").read_bytes()
+            == Path(tempdir, "pewlib.vti").read_bytes()
+        )
@@ -1,7 +1,9 @@
+import numpy as np
 from pytestqt.qtbot import QtBot
 
 from pathlib import Path
 
+from pewpew.lib.columnar import ColumnarLaser
 from pewpew.widgets.wizards import ImportWizard
 
 path = Path(__file__).parent.joinpath("data", "io")
@@ -111,6 +113,16 @@ def test_wizard_import_text(qtbot: QtBot):
         wiz.accept()
         assert emit.args[0].shape == (5, 5)
 
+    # Integer storage
+    page.combo_storage.setCurrentText("Integer")
+    with qtbot.waitSignal(wiz.laserImported) as emit:
+        wiz.accept()
+    laser = emit.args[0]
+    assert isinstance(laser, ColumnarLaser)
+    name = laser.isotopes[0]
+    assert laser.data[name].dtype == np.uint8
+    assert laser.data[name][1, 0] == 7
+
 
 def test_wizard_import_thermo(qtbot: QtBot):
     wiz = ImportWizard(path.joinpath("thermo", "icap_columns.csv"))